@@ -0,0 +1,125 @@
+"""
+Benchmark: compare a run against a recorded baseline run.
+
+Run the pipeline once against the API to record a baseline, then rerun it
+after loader or plotting changes while replaying the recorded responses:
+
+    python main.py                                   # baseline, records llm_calls.jsonl
+    LLM_BACKEND=replay LLM_REPLAY_ARCHIVE=reports/<baseline>/llm_calls.jsonl python main.py
+    python benchmarks/compare_runs.py reports/<baseline> reports/<candidate>
+
+Prints the wall time per step of both runs (from timings.json), which
+prompts changed (from llm_calls.jsonl) and whether the summaries and the
+final report are identical.
+
+Usage:
+    python benchmarks/compare_runs.py BASELINE_RUN_DIR CANDIDATE_RUN_DIR
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.config import LLM_ARCHIVE_FILENAME  # noqa: E402
+from src.reporting.writer import read_artifact, resolve_artifact  # noqa: E402
+
+OUTPUTS = (
+    "sales_summary.json",
+    "models_by_year_summary.json",
+    "models_by_region_summary.json",
+    "report.md",
+    "section_answers.json",
+)
+
+
+def load_timings(run_dir: str) -> dict:
+    path = os.path.join(run_dir, "timings.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_calls(run_dir: str) -> list:
+    path = os.path.join(run_dir, LLM_ARCHIVE_FILENAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_output(run_dir: str, name: str):
+    path = os.path.join(run_dir, name)
+    if name.endswith(".json"):
+        # Summaries may be written as msgpack and/or compressed
+        return read_artifact(path) if resolve_artifact(path) else None
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        # The report carries its generation time
+        return [line for line in f if not line.startswith("*Report generated on")]
+
+
+def _seconds(value) -> str:
+    return f"{value:.3f}" if value is not None else "-"
+
+
+def compare_timings(baseline: dict, candidate: dict):
+    stages = list(
+        dict.fromkeys([*baseline.get("stages", {}), *candidate.get("stages", {})])
+    )
+    print(f"{'stage':<28}{'baseline s':>12}{'candidate s':>13}{'change':>9}")
+    rows = [
+        (s, baseline.get("stages", {}).get(s), candidate.get("stages", {}).get(s))
+        for s in stages
+    ]
+    rows.append(("total", baseline.get("total_s"), candidate.get("total_s")))
+    for stage, before, after in rows:
+        change = (
+            f"{(after - before) / before:+.0%}" if before and after is not None else "-"
+        )
+        print(f"{stage:<28}{_seconds(before):>12}{_seconds(after):>13}{change:>9}")
+
+
+def compare_calls(baseline: list, candidate: list):
+    before = {c["key"] for c in baseline}
+    after = {c["key"] for c in candidate}
+    print(
+        f"\nLLM calls: baseline {len(baseline)}, candidate {len(candidate)}, "
+        f"identical prompts {len(before & after)}, changed prompts {len(after - before)}"
+    )
+    for label, calls in (("baseline", baseline), ("candidate", candidate)):
+        latency = sum(c.get("latency_s") or 0 for c in calls)
+        tokens_in = sum(c.get("prompt_tokens") or 0 for c in calls)
+        tokens_out = sum(c.get("output_tokens") or 0 for c in calls)
+        print(
+            f"  {label:<10} LLM time {latency:8.2f}s  "
+            f"input tokens {tokens_in:>8}  output tokens {tokens_out:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    compare_timings(load_timings(args.baseline), load_timings(args.candidate))
+    compare_calls(load_calls(args.baseline), load_calls(args.candidate))
+
+    print("\nOutputs:")
+    for name in OUTPUTS:
+        before = read_output(args.baseline, name)
+        after = read_output(args.candidate, name)
+        if before is None or after is None:
+            status = "missing"
+        else:
+            status = "identical" if before == after else "DIFFERENT"
+        print(f"  {name:<34}{status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: pd.read_excel (openpyxl) vs the workbook reader on a multi-sheet file.
+
+A synthetic workbook with one sheet per region is written once, then read
+with the previous path (openpyxl, all sheets concatenated), and with
+``read_workbook`` per engine and number of worker processes.
+
+Usage:
+    python benchmarks/excel_reader.py --rows 500000 --workers 1 2 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic import make_synthetic_sales  # noqa: E402
+from src.data_processing.excel import read_workbook, resolve_engine  # noqa: E402
+
+
+def write_workbook(df, path):
+    """Write one sheet per region."""
+    with pd.ExcelWriter(path) as writer:
+        for region, rows in df.groupby("Region", sort=True):
+            rows.to_excel(writer, sheet_name=str(region)[:31], index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--workbook", help="Existing workbook to read instead")
+    args = parser.parse_args()
+
+    path = args.workbook
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "sales.xlsx")
+        start = time.perf_counter()
+        write_workbook(make_synthetic_sales(args.rows), path)
+        print(
+            f"rows={args.rows:,}  workbook written in {time.perf_counter() - start:.1f}s"
+        )
+
+    start = time.perf_counter()
+    sheets = pd.read_excel(path, sheet_name=None, engine="openpyxl")
+    expected = pd.concat(sheets.values(), ignore_index=True)
+    baseline = time.perf_counter() - start
+    print(f"pd.read_excel openpyxl: {baseline:.2f}s  ({len(sheets)} sheets)")
+
+    engines = ["openpyxl"]
+    if resolve_engine("auto") == "calamine":
+        engines.append("calamine")
+    for engine in engines:
+        for n_workers in args.workers:
+            start = time.perf_counter()
+            df = read_workbook(path, engine=engine, n_workers=n_workers)
+            elapsed = time.perf_counter() - start
+            status = "identical" if df.equals(expected) else "MISMATCH"
+            print(
+                f"{engine:<9} workers={n_workers:<3} {elapsed:.2f}s  "
+                f"speedup={baseline / elapsed:.2f}x  {status}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: serial pandas vs sharded multiprocess Region/Year/Model aggregation.
+
+Usage:
+    python benchmarks/parallel_aggregation.py --rows 5000000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic import make_synthetic_sales  # noqa: E402
+from src.data_processing.loader import summarize_models_by_region_year  # noqa: E402
+from src.data_processing.parallel import (  # noqa: E402
+    summarize_models_by_region_year_parallel,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    df = make_synthetic_sales(args.rows)
+    out_dir = tempfile.mkdtemp()
+
+    start = time.perf_counter()
+    expected = summarize_models_by_region_year(df, os.path.join(out_dir, "serial.json"))
+    serial = time.perf_counter() - start
+    print(f"rows={args.rows:,}  pandas serial: {serial:.2f}s")
+
+    for n_workers in args.workers:
+        start = time.perf_counter()
+        result = summarize_models_by_region_year_parallel(
+            df,
+            os.path.join(out_dir, "parallel.json"),
+            n_workers=n_workers,
+            min_rows_per_worker=1,
+        )
+        elapsed = time.perf_counter() - start
+        status = "identical" if result == expected else "MISMATCH"
+        print(
+            f"workers={n_workers:<3} {elapsed:.2f}s  "
+            f"speedup={serial / elapsed:.2f}x  {status}"
+        )
+
+
+if __name__ == "__main__":
+    main()
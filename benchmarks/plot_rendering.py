@@ -0,0 +1,96 @@
+"""
+Benchmark: per-figure render time of the report plots per renderer setting.
+
+Renders every report plot (sales by year/region, models over years, one
+plot per region, correlation vector) from synthetic data with:
+
+- tight+new: a new figure per plot and a tight bounding box (two draws
+  per figure), the rendering path the plotting functions used before the
+  FigureRenderer.
+- fixed+reuse: figures reused per kind, fixed margins (one draw).
+- fixed+reuse png1: as above, with PNG zlib compression level 1.
+- fixed+reuse svg: as above, saved as SVG.
+
+Usage:
+    python benchmarks/plot_rendering.py [--rows 200000] [--models 11] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic import make_synthetic_sales  # noqa: E402
+from src.data_processing.loader import (  # noqa: E402
+    explore_key_drivers_of_sales,
+    summarize_models_by_region_year,
+    summarize_models_by_year,
+    summarize_sales_by_region_year,
+)
+from src.plotting import plot_functions as pf  # noqa: E402
+from src.plotting.renderer import FigureRenderer  # noqa: E402
+
+RENDERERS = {
+    "tight+new": dict(layout="tight", reuse=False),
+    "fixed+reuse": dict(layout="fixed", reuse=True),
+    "fixed+reuse png1": dict(layout="fixed", reuse=True, png_compress_level=1),
+    "fixed+reuse svg": dict(layout="fixed", reuse=True, fmt="svg"),
+}
+
+
+def render_all(data: dict, out_dir: str, renderer: FigureRenderer) -> list:
+    """Render every report plot once; return the saved paths."""
+    paths = [
+        pf.plot_sales_by_year(data["sales"]["sales_by_year"], out_dir, renderer),
+        pf.plot_regions(data["sales"]["sales_by_region_year"], out_dir, renderer),
+        pf.plot_models_over_years(data["by_year"], out_dir, renderer=renderer),
+        pf.plot_correlation_vector(data["corr"], out_dir, renderer=renderer),
+    ]
+    for region, years in data["by_region"].items():
+        paths.append(
+            pf.plot_models_by_region_over_years(years, out_dir, region, renderer)
+        )
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--models", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_synthetic_sales(args.rows, n_models=args.models)
+    tmp = tempfile.mkdtemp()
+    data = {
+        "sales": summarize_sales_by_region_year(df, os.path.join(tmp, "s.json")),
+        "by_year": summarize_models_by_year(df, os.path.join(tmp, "y.json")),
+        "by_region": summarize_models_by_region_year(df, os.path.join(tmp, "r.json")),
+        "corr": explore_key_drivers_of_sales(df),
+    }
+
+    print(f"{'renderer':<20}{'ms/figure':>10}{'KB/figure':>11}")
+    baseline = None
+    for name, options in RENDERERS.items():
+        renderer = FigureRenderer(**options)
+        out_dir = os.path.join(tmp, name.replace(" ", "_").replace("+", "_"))
+        render_all(data, out_dir, renderer)  # warm-up (fonts, figure creation)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            paths = render_all(data, out_dir, renderer)
+        per_figure = (time.perf_counter() - start) / (args.repeat * len(paths))
+
+        size_kb = sum(os.path.getsize(p) for p in paths) / len(paths) / 1024
+        baseline = baseline or per_figure
+        print(
+            f"{name:<20}{per_figure * 1000:>10.1f}{size_kb:>11.1f}"
+            f"  speedup={baseline / per_figure:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: estimated prompt tokens of each summary payload per serialization format.
+
+Reads the JSON summaries of a run directory (defaults to the latest run
+under reports/) and prints the local token estimate for every format,
+and for the precomputed-facts digest that can replace the full table.
+
+Usage:
+    python benchmarks/prompt_formats.py [--run-dir reports/run_YYYY_MM_DD_HH_MM_SS]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.config import REPORTS_ROOT  # noqa: E402
+from src.data_processing.digest import (  # noqa: E402
+    digest_models_by_region,
+    digest_models_by_year,
+    digest_sales_summary,
+    digest_to_text,
+)
+from src.llm.agent import SALES_SUMMARY_LEVELS  # noqa: E402
+from src.llm.serializers import FORMATS, compare_formats  # noqa: E402
+from src.llm.utils import estimate_tokens  # noqa: E402
+
+PAYLOADS = {
+    "sales_summary.json": (SALES_SUMMARY_LEVELS, digest_sales_summary),
+    "models_by_year_summary.json": (["Year"], digest_models_by_year),
+    "models_by_region_summary.json": (["Region", "Year"], digest_models_by_region),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--run-dir", default=None)
+    args = parser.parse_args()
+
+    run_dir = args.run_dir or sorted(glob.glob(os.path.join(REPORTS_ROOT, "run_*")))[-1]
+    print(f"Run directory: {run_dir}\n")
+    columns = list(FORMATS) + ["digest"]
+    print(f"{'payload':<32}" + "".join(f"{name:>10}" for name in columns))
+
+    for filename, (levels, digest_fn) in PAYLOADS.items():
+        with open(os.path.join(run_dir, filename), encoding="utf-8") as f:
+            payload = json.load(f)
+        counts = compare_formats(payload, levels)
+        counts["digest"] = estimate_tokens(digest_to_text(digest_fn(payload)))
+        print(f"{filename:<32}" + "".join(f"{counts[c]:>10,}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
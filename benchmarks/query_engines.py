@@ -0,0 +1,88 @@
+"""
+Benchmark: the loader's summaries and correlations on each query engine.
+
+Usage:
+    python benchmarks/query_engines.py --rows 5000000 --engines pandas duckdb polars
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic import make_synthetic_sales  # noqa: E402
+from src.data_processing import loader  # noqa: E402
+from src.data_processing.engines import (  # noqa: E402
+    create_engine,
+    set_default_engine,
+)
+
+
+def run_all(df, out_dir):
+    """Time the three summaries and the correlations on the default engine."""
+    timings, results = {}, {}
+    steps = {
+        "sales_by_region_year": lambda: loader.summarize_sales_by_region_year(
+            df, os.path.join(out_dir, "sales.json")
+        ),
+        "models_by_year": lambda: loader.summarize_models_by_year(
+            df, os.path.join(out_dir, "models_by_year.json")
+        ),
+        "models_by_region_year": lambda: loader.summarize_models_by_region_year(
+            df, os.path.join(out_dir, "models_by_region.json")
+        ),
+        "correlations": lambda: loader.explore_key_drivers_of_sales(df),
+    }
+    for name, step in steps.items():
+        start = time.perf_counter()
+        results[name] = step()
+        timings[name] = time.perf_counter() - start
+    return timings, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--models", type=int, default=None)
+    parser.add_argument("--engines", nargs="+", default=["pandas", "duckdb", "polars"])
+    args = parser.parse_args()
+
+    df = make_synthetic_sales(args.rows, n_models=args.models)
+    out_dir = tempfile.mkdtemp()
+
+    set_default_engine(create_engine("pandas"))
+    base_timings, expected = run_all(df, out_dir)
+    print(f"rows={args.rows:,}")
+
+    for engine in args.engines:
+        set_default_engine(create_engine(engine))
+        timings, results = (
+            (base_timings, expected) if engine == "pandas" else run_all(df, out_dir)
+        )
+        summaries = all(
+            results[name] == expected[name]
+            for name in results
+            if name != "correlations"
+        )
+        corr_diff = float(
+            np.nanmax(
+                np.abs(results["correlations"].values - expected["correlations"].values)
+            )
+        )
+        total = sum(timings.values())
+        steps = "  ".join(f"{name}={t:.2f}s" for name, t in timings.items())
+        print(
+            f"{engine:<7} total={total:.2f}s  "
+            f"speedup={sum(base_timings.values()) / total:.2f}x  "
+            f"summaries {'identical' if summaries else 'MISMATCH'}  "
+            f"max corr diff={corr_diff:.1e}\n        {steps}"
+        )
+
+
+if __name__ == "__main__":
+    main()
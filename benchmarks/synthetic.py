@@ -0,0 +1,74 @@
+"""
+Synthetic BMW-like sales data for benchmarks.
+
+Generates frames with the same columns and dtypes as the Excel dataset,
+at any row count, so pipeline stages can be timed on large inputs.
+"""
+
+import numpy as np
+import pandas as pd
+
+MODELS = [
+    "3 Series",
+    "5 Series",
+    "7 Series",
+    "i3",
+    "i8",
+    "M3",
+    "M5",
+    "X1",
+    "X3",
+    "X5",
+    "X6",
+]
+REGIONS = [
+    "Africa",
+    "Asia",
+    "Europe",
+    "Middle East",
+    "North America",
+    "South America",
+]
+COLORS = ["Black", "Blue", "Grey", "Red", "Silver", "White"]
+FUEL_TYPES = ["Diesel", "Electric", "Hybrid", "Petrol"]
+TRANSMISSIONS = ["Automatic", "Manual"]
+
+
+def make_synthetic_sales(
+    n_rows: int, seed: int = 0, n_models: int = None
+) -> pd.DataFrame:
+    """
+    Build a random sales frame with ``n_rows`` rows.
+
+    Args:
+        n_rows: Number of rows to generate.
+        seed: Random seed.
+        n_models: Optional catalogue size; extra variants are named "<model> v<k>".
+
+    Returns:
+        pd.DataFrame with the columns of the BMW sales dataset.
+    """
+    rng = np.random.default_rng(seed)
+
+    models = list(MODELS)
+    k = 2
+    while n_models and len(models) < n_models:
+        models.extend(f"{m} v{k}" for m in MODELS)
+        k += 1
+    if n_models:
+        models = models[:n_models]
+
+    return pd.DataFrame(
+        {
+            "Model": rng.choice(models, n_rows),
+            "Year": rng.integers(2020, 2025, n_rows),
+            "Region": rng.choice(REGIONS, n_rows),
+            "Color": rng.choice(COLORS, n_rows),
+            "Fuel_Type": rng.choice(FUEL_TYPES, n_rows),
+            "Transmission": rng.choice(TRANSMISSIONS, n_rows),
+            "Engine_Size_L": rng.choice(np.arange(1.5, 5.1, 0.1).round(1), n_rows),
+            "Mileage_KM": rng.integers(0, 200000, n_rows),
+            "Price_USD": rng.integers(30000, 120000, n_rows),
+            "Sales_Volume": rng.integers(100, 10000, n_rows),
+        }
+    )
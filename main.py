@@ -3,29 +3,186 @@ Main script to perform BMW sales data analysis and generate a comprehensive
 markdown report.
 
 Workflow:
-- Load and preprocess sales data from Excel.
+- Load and preprocess sales data from Excel: every sheet of the workbook,
+  parsed in parallel with calamine when installed and concatenated with one
+  schema (see src.data_processing.excel and EXCEL_* in src.config).
 - Summarize sales by region and year.
+  The aggregations and correlations run on the QUERY_ENGINE (pandas, DuckDB
+  or Polars; see src.data_processing.engines), with identical summaries.
 - Summarize model sales by year and by region.
+- Pre-digest the summaries into compact facts (growth, shares, movers).
 - Explore key sales drivers using correlation and XGBoost analysis.
-- Generate analysis reports using LLM with embedded plots.
+  With MEMORY_AWARE=1 the stages share one normalized frame and one
+  encoded frame, freed after the XGBoost fit, the peak memory and RSS per
+  serial stage (the concurrent sections as one "sections" stage) are
+  written to timings.json, and MEMORY_LIMIT_MB fails the run early when its
+  projected footprint is too large (see src.data_processing.memory).
+- Generate analysis reports using LLM with embedded plots. All sections run
+  concurrently under asyncio on a single event loop: plots and the XGBoost
+  fit run in worker threads while other sections await the LLM.
 - Combine individual markdown reports into a final comprehensive report.
+  In the default hierarchical mode, each section is condensed into a short
+  digest as soon as it is written; the final LLM call
+  writes the executive summary and recommendations from the digests only,
+  and the full sections are spliced into the report locally.
+- Number and caption the figures locally, from the plot metadata.
 - Save the report and associated figures to a timestamped experiment folder.
+  Summaries and the report are written atomically (temporary file renamed
+  into place) by a background writer, optionally as orjson/msgpack and
+  gzip/zstd (see src.reporting.writer and ARTIFACT_* in src.config).
+- Deduplicate the folder into the content-addressed artifact store under
+  reports/objects and apply the retention policy (see
+  src.reporting.artifacts, ARTIFACT_STORE and RETENTION_* in src.config).
 
 Progress is indicated with a console spinner during long-running steps.
+The wall time of every step is written to timings.json in the run folder,
+and the tokens and cost of every LLM call, per section and for the run, to
+token_usage.json (see TOKEN_BUDGET in src.config for a hard budget).
+
+Set HEDGE_REQUESTS=1 to hedge the LLM calls: slow calls are raced by a
+duplicate request and empty answers, or answers missing figure embeds, are
+retried with an alternative prompt (see src.llm.hedging); the hedges fired
+and the call latencies are written to hedging.json, whose latencies set the
+hedge delay of each section in the next runs.
+
+Every section answer is validated locally (required headings, figure embeds
+resolving to files under figures/); broken embeds are fixed locally and only
+missing parts are requested again with a short repair prompt (see
+src.llm.validation and VALIDATE_SECTIONS). Problems are logged to
+validation.json.
+
+Set STRUCTURED_OUTPUT=1 to request compact JSON answers (findings and figure
+references per heading) instead of full markdown; the sections and the
+summary are rendered locally from templates (see src.llm.structured), and
+the answers are saved to section_answers.json.
+
+Every run writes sections.json, the fingerprints of the inputs of each figure
+and section with the section markdown. Set RERUN_FROM (a run folder, or
+"latest") for a differential re-run: sections whose inputs are unchanged are
+copied from that run with their figures, without plots or LLM calls, unchanged
+figures of changed sections are copied instead of drawn, and the final summary
+is regenerated only if a section changed (see src.reporting.incremental).
+
+Set SALES_CUBE=1 to also materialize the aggregate cube of the data (see
+src.data_processing.cube) under reports/cache, reused while the data is
+unchanged, for ad-hoc roll-ups and slices outside the report.
+
+Set MODEL_ROUTING=1 to route the calls by section to model tiers: a fast
+model for the section drafts, a stronger one for the final summary, with a
+fallback to the fast model while the strong one's latency SLO is at risk, and
+a probe of the strong model every ROUTING_PROBE_EVERY fallen-back calls (see
+src.llm.routing); the latency and tokens of every routed call are written to
+routing.json.
+
+Set LLM_BACKEND=template to run the whole flow offline with the local,
+deterministic LLM backend (see src.llm.backends). Every LLM call is recorded
+to llm_calls.jsonl in the run folder (LLM_RECORD=0 disables it); with
+LLM_BACKEND=replay and LLM_REPLAY_ARCHIVE pointing at such a file, a run
+replays the recorded responses without network access, and
+benchmarks/compare_runs.py compares its timings and outputs with the baseline.
 """
 
+import asyncio
+import atexit
+import json
 import os
+import src.data_processing.digest
+import src.data_processing.loader
+import src.llm.agent
+import src.llm.serializers
+import src.llm.structured
+import src.llm.validation
 from src.data_processing.loader import (
+    encode_features,
     load_dataset,
     summarize_sales_by_region_year,
     summarize_models_by_region_year,
     explore_key_drivers_of_sales,
     summarize_models_by_year,
     xgboost_key_drivers,
+    xgboost_key_drivers_bootstrap,
+)
+from src.data_processing.cube import SalesCube
+from src.data_processing.engines import create_engine, set_default_engine
+from src.data_processing.memory import check_memory_limit, normalize_sales_frame
+from src.data_processing.digest import (
+    digest_models_by_region,
+    digest_models_by_year,
+    digest_sales_summary,
+)
+from src.data_processing.parallel import summarize_models_by_region_year_parallel
+from src.config import (
+    ARTIFACT_COMPRESSION,
+    ARTIFACT_FORMAT,
+    ARTIFACT_STORE,
+    BACKGROUND_WRITES,
+    COMBINE_MODE,
+    CUBE_CACHE_PATH,
+    DATASET_PATH,
+    DIGEST_TOP_K,
+    EXCEL_ENGINE,
+    EXCEL_SHEETS,
+    EXCEL_WORKERS,
+    FIGURE_FORMAT,
+    FIGURE_PNG_COMPRESS_LEVEL,
+    HEDGE_INITIAL_DELAY_S,
+    HEDGE_MAX_ATTEMPTS,
+    HEDGE_PERCENTILE,
+    HEDGE_REQUESTS,
+    LLM_ARCHIVE_FILENAME,
+    LLM_BACKEND,
+    LLM_RECORD,
+    LLM_REPLAY_ARCHIVE,
+    LLM_REPLAY_LATENCY,
+    MEMORY_AWARE,
+    MEMORY_LIMIT_MB,
+    MODEL_MIN_SHARE,
+    MODEL_ROUTING,
+    MODEL_TOP_N,
+    PARALLEL_AGGREGATION,
+    PROMPT_DIGEST,
+    PROMPT_PAYLOAD_FORMAT,
+    QUERY_ENGINE,
+    REPORTS_ROOT,
+    RERUN_FROM,
+    RETENTION_KEEP_RUNS,
+    RETENTION_MAX_AGE_DAYS,
+    ROUTING_FAST_MODEL,
+    ROUTING_PROBE_EVERY,
+    ROUTING_SLO_PERCENTILE,
+    ROUTING_SLO_S,
+    ROUTING_STRONG_MODEL,
+    ROUTING_STRONG_SECTIONS,
+    SALES_CUBE,
+    STRUCTURED_OUTPUT,
+    TEMPLATE_LLM_LATENCY_S,
+    TOKEN_BUDGET,
+    TOKEN_BUDGET_MODE,
+    VALIDATE_SECTIONS,
+    XGBOOST_BOOTSTRAP,
+    XGBOOST_N_BOOTSTRAPS,
+    XGBOOST_ROW_BUDGET,
+    get_run_report_dir,
 )
-from src.config import DATASET_PATH, get_run_report_dir
+from src.plotting.renderer import FigureRenderer, set_default_renderer
 from src.llm.agent import LLMReportAgent
-from src.llm.utils import Spinner
+from src.llm.backends import create_backend
+from src.llm.hedging import HEDGE_LOG_FILENAME, HedgePolicy, load_hedge_history
+from src.llm.tools import figure_version
+from src.llm.routing import ROUTING_LOG_FILENAME, load_routing_history, tiered_router
+from src.llm.usage import UsageTracker
+from src.llm.utils import Spinner, StageTimer
+from src.llm.validation import embedded_figures
+from src.reporting.artifacts import ArtifactStore
+from src.reporting.incremental import (
+    MANIFEST_FILENAME,
+    RunCache,
+    find_previous_run,
+    fingerprint,
+    frame_fingerprint,
+    source_fingerprint,
+)
+from src.reporting.writer import ArtifactWriter, atomic_write, set_default_writer
 from src.reporting.markdown_builder import build_markdown_report
 
 
@@ -36,85 +193,454 @@ dataset_dir = DATASET_PATH
 experiment_dir = get_run_report_dir()
 figures_dir = os.path.join(experiment_dir, "figures")
 
-# Load data
-df = load_dataset(dataset_dir)
 
-# Preprocess data
-sales_summary = summarize_sales_by_region_year(
-    df, os.path.join(experiment_dir, "sales_summary.json")
+def store_run_artifacts():
+    """Deduplicate the run folder into the artifact store and apply retention."""
+    writer.close()
+    store = ArtifactStore(REPORTS_ROOT)
+    stats = store.ingest(experiment_dir)
+    removed = store.apply_retention(RETENTION_KEEP_RUNS, RETENTION_MAX_AGE_DAYS)
+    print(
+        f"Artifact store: {stats['deduplicated']}/{stats['files']} files "
+        f"deduplicated ({stats['bytes_saved'] / 1e6:.1f} MB saved), "
+        f"{len(removed['removed_runs'])} expired runs removed"
+    )
+
+
+# Registered first so it runs last at exit, after every file is written
+if ARTIFACT_STORE:
+    atexit.register(store_run_artifacts)
+
+# Summaries and the report are written atomically, in the background
+writer = ArtifactWriter(
+    ARTIFACT_FORMAT, ARTIFACT_COMPRESSION, background=BACKGROUND_WRITES
 )
+set_default_writer(writer)
 
-model_by_year_summary = summarize_models_by_year(
-    df, os.path.join(experiment_dir, "models_by_year_summary.json")
+# Wall time (and in memory-aware mode peak memory) per step, saved to timings.json
+timer = StageTimer(track_memory=MEMORY_AWARE)
+
+# Figure format of all plots
+set_default_renderer(
+    FigureRenderer(fmt=FIGURE_FORMAT, png_compress_level=FIGURE_PNG_COMPRESS_LEVEL)
 )
 
-model_by_region_summary = summarize_models_by_region_year(
-    df, os.path.join(experiment_dir, "models_by_region_summary.json")
+# Engine of the summary aggregations and correlations
+set_default_engine(create_engine(QUERY_ENGINE))
+
+# Fingerprints of this run, and the previous run to reuse unchanged sections from
+previous_run = (
+    find_previous_run(REPORTS_ROOT, experiment_dir, RERUN_FROM) if RERUN_FROM else None
 )
+if RERUN_FROM and previous_run is None:
+    print("No previous run with a section manifest: generating every section.")
+run_cache = RunCache(experiment_dir, previous_run, figure_version=figure_version())
+
+# Load data
+with timer.stage("load_dataset"):
+    df = load_dataset(
+        dataset_dir, sheets=EXCEL_SHEETS, engine=EXCEL_ENGINE, n_workers=EXCEL_WORKERS
+    )
+    # Input of the XGBoost fit, whose section is reused if the rows are unchanged
+    dataset_fingerprint = frame_fingerprint(df)
+    if MEMORY_AWARE or MEMORY_LIMIT_MB is not None:
+        # Fail now rather than halfway through the run
+        check_memory_limit(df, MEMORY_LIMIT_MB)
+    if MEMORY_AWARE:
+        # One normalized frame, shared read-only by every later stage
+        df = normalize_sales_frame(df)
+
+# Preprocess data
+with timer.stage("summaries"):
+    sales_summary = summarize_sales_by_region_year(
+        df, os.path.join(experiment_dir, "sales_summary.json")
+    )
+
+    model_by_year_summary = summarize_models_by_year(
+        df,
+        os.path.join(experiment_dir, "models_by_year_summary.json"),
+        top_n=MODEL_TOP_N,
+        min_share=MODEL_MIN_SHARE,
+    )
+
+    if PARALLEL_AGGREGATION and QUERY_ENGINE == "pandas":
+        model_by_region_summary = summarize_models_by_region_year_parallel(
+            df,
+            os.path.join(experiment_dir, "models_by_region_summary.json"),
+            top_n=MODEL_TOP_N,
+            min_share=MODEL_MIN_SHARE,
+        )
+    else:
+        model_by_region_summary = summarize_models_by_region_year(
+            df,
+            os.path.join(experiment_dir, "models_by_region_summary.json"),
+            top_n=MODEL_TOP_N,
+            min_share=MODEL_MIN_SHARE,
+        )
+
+# Pre-digest the summaries into compact facts for the LLM prompts
+with timer.stage("digests"):
+    if PROMPT_DIGEST:
+        sales_digest = digest_sales_summary(sales_summary)
+        model_by_year_digest = digest_models_by_year(
+            model_by_year_summary, DIGEST_TOP_K
+        )
+        model_by_region_digest = digest_models_by_region(
+            model_by_region_summary, DIGEST_TOP_K
+        )
+    else:
+        sales_digest = model_by_year_digest = model_by_region_digest = None
+
+# On demand: materialize (or refresh) the aggregate cube for ad-hoc roll-ups
+# between runs; the report itself does not read it
+if SALES_CUBE:
+    with timer.stage("sales_cube"):
+        SalesCube.load_or_build(df, CUBE_CACHE_PATH)
 
 # Explore key drivers of sales
-sales_drivers = explore_key_drivers_of_sales(df)
-
-# Explore XGBoost sales drivers
-xgboost_sales_drivers = xgboost_key_drivers(df)
-
-# Initiate gemini llm agent
-llm_agent = LLMReportAgent()
-
-# Step 1 — Sales trend analysis
-spinner = Spinner("Analyzing overall and regional sales trends")
-spinner.start()
-try:
-    sales_report_md = llm_agent.analyze_sales_trend(sales_summary, figures_dir)
-finally:
-    spinner.stop()
-
-# Step 2 — Model performance by years
-spinner = Spinner("Analyzing model performance trends across years")
-spinner.start()
-model_by_year_report_md = llm_agent.analyze_models_over_years_trend(
-    model_by_year_summary, figures_dir
-)
-spinner.stop()
-
-# Step 3 — Regional model performance
-spinner = Spinner("Analyzing regional model sales performance")
-spinner.start()
-try:
-    model_by_region_report_md = llm_agent.analyze_models_over_region_trend(
-        model_by_region_summary, figures_dir
+with timer.stage("correlations"):
+    # In memory-aware mode the encoded features are shared with the XGBoost fit
+    encoded_features = encode_features(df) if MEMORY_AWARE else None
+    sales_drivers = explore_key_drivers_of_sales(df, encoded=encoded_features)
+
+# Initiate llm agent on the configured backend
+if LLM_BACKEND == "template":
+    llm_backend = create_backend(LLM_BACKEND, latency_s=TEMPLATE_LLM_LATENCY_S)
+elif LLM_BACKEND == "replay":
+    llm_backend = create_backend(
+        LLM_BACKEND,
+        archive_path=LLM_REPLAY_ARCHIVE,
+        replay_latency=LLM_REPLAY_LATENCY,
     )
-finally:
-    spinner.stop()
-
-# Step 4 — Sales drivers
-spinner = Spinner("Analyzing key drivers of sales (correlations)")
-spinner.start()
-try:
-    drivers_report_md = llm_agent.analyze_correlation_matrix(sales_drivers, figures_dir)
-finally:
-    spinner.stop()
-
-# Step 5 — Combine all reports
-spinner = Spinner("Generating final report")
-spinner.start()
-try:
-    combined_md = llm_agent.combine_and_summarize_reports(
-        [
-            sales_report_md,
-            model_by_year_report_md,
-            model_by_region_report_md,
-            drivers_report_md,
-        ]
+else:
+    llm_backend = create_backend(LLM_BACKEND)
+
+# Record every prompt/response pair into the run folder
+if LLM_RECORD:
+    llm_backend = create_backend(
+        "record",
+        inner=llm_backend,
+        archive_path=os.path.join(experiment_dir, LLM_ARCHIVE_FILENAME),
     )
-finally:
-    spinner.stop()
-
-# Step 6 — Build final file
-combined_report_path = build_markdown_report(
-    [combined_md],
-    out_dir=experiment_dir,
-    report_title="BMW Sales Analysis Report",
+# Model tiers per section, judged on the latencies of the last runs too
+if MODEL_ROUTING:
+    model_router = tiered_router(
+        ROUTING_FAST_MODEL,
+        ROUTING_STRONG_MODEL,
+        strong_sections=ROUTING_STRONG_SECTIONS,
+        strong_slo_s=ROUTING_SLO_S,
+        percentile=ROUTING_SLO_PERCENTILE,
+        probe_every=ROUTING_PROBE_EVERY,
+    )
+    model_router.seed(load_routing_history(REPORTS_ROOT, experiment_dir))
+else:
+    model_router = None
+
+# Hedge delays per section, from the latencies of the last runs too
+if HEDGE_REQUESTS:
+    hedge_policy = HedgePolicy(
+        percentile=HEDGE_PERCENTILE,
+        initial_delay_s=HEDGE_INITIAL_DELAY_S,
+        max_attempts=HEDGE_MAX_ATTEMPTS,
+    )
+    hedge_policy.seed(load_hedge_history(REPORTS_ROOT, experiment_dir))
+else:
+    hedge_policy = None
+
+llm_agent = LLMReportAgent(
+    payload_format=PROMPT_PAYLOAD_FORMAT,
+    backend=llm_backend,
+    usage=UsageTracker(budget_tokens=TOKEN_BUDGET, budget_mode=TOKEN_BUDGET_MODE),
+    hedge=hedge_policy,
+    validate=VALIDATE_SECTIONS,
+    structured=STRUCTURED_OUTPUT,
+    router=model_router,
 )
 
+# Plots whose data is unchanged since the previous run are copied from it
+llm_agent.plot_tool.figure_cache = run_cache
+
+# Settings and code shaping the prompts and answers of every section
+section_settings = (
+    LLM_BACKEND,
+    model_router.summary()["policy"] if model_router else llm_agent.model_name,
+    PROMPT_PAYLOAD_FORMAT,
+    STRUCTURED_OUTPUT,
+    VALIDATE_SECTIONS,
+    # Figure format and plotting code: the sections embed the figures
+    run_cache.figure_version,
+    # Prompts, payloads and the XGBoost drivers of the feature importance
+    source_fingerprint(
+        src.llm.agent,
+        src.llm.structured,
+        src.llm.validation,
+        src.llm.serializers,
+        src.data_processing.digest,
+        src.data_processing.loader,
+    ),
+)
+
+# Token accounting is saved even if the run stops early (e.g. over budget)
+atexit.register(
+    llm_agent.usage.save, os.path.join(experiment_dir, "token_usage.json")
+)
+if model_router is not None:
+    atexit.register(
+        model_router.save, os.path.join(experiment_dir, ROUTING_LOG_FILENAME)
+    )
+
+
+def fit_xgboost_drivers():
+    """Fit the XGBoost sales drivers (CPU-bound; run in a worker thread)."""
+    global df, encoded_features  # pylint: disable=global-statement
+    # Runs alongside the section stages: its memory counts in "sections"
+    with timer.stage("xgboost_fit", track_memory=False):
+        if XGBOOST_BOOTSTRAP:
+            drivers = xgboost_key_drivers_bootstrap(
+                df,
+                row_budget=XGBOOST_ROW_BUDGET,
+                n_bootstraps=XGBOOST_N_BOOTSTRAPS,
+                encoded=encoded_features,
+            )
+        else:
+            drivers = xgboost_key_drivers(df, encoded=encoded_features)
+    if MEMORY_AWARE:
+        # Last stage that needs the rows: free the shared frames
+        df = encoded_features = None
+    return drivers
+
+
+async def feature_importance_report() -> str:
+    """Fit the XGBoost sales drivers off the event loop and analyze them."""
+    xgboost_sales_drivers = await asyncio.to_thread(fit_xgboost_drivers)
+    return await llm_agent.analyze_feature_importance_async(
+        xgboost_sales_drivers, figures_dir
+    )
+
+
+async def generate_sections() -> tuple:
+    """
+    Generate all section reports concurrently on one event loop.
+
+    Each section renders its plots in a worker thread and then awaits the
+    LLM, so plots, the XGBoost fit and LLM calls of different sections
+    overlap. In hierarchical mode each section is digested as soon as it
+    is written, and the final call summarizes the digests.
+
+    A section whose inputs are unchanged since the previous run (RERUN_FROM)
+    is copied from it with its figures and digest, and the final call is
+    skipped when no section changed.
+
+    Returns:
+        (section reports by title in report order, combined markdown)
+    """
+    digest_tasks = {}
+
+    async def digest(title: str, stage: str, markdown: str, reused) -> str:
+        if reused is not None and reused["digest"] is not None:
+            return reused["digest"]
+        text = await llm_agent.digest_section_report_async(title, markdown)
+        run_cache.set_digest(stage, text)
+        return text
+
+    async def section(title: str, stage: str, inputs, report) -> tuple:
+        key = fingerprint(section_settings, stage, inputs)
+        # Structured answers are keyed by the agent's section name
+        answer_key = stage.removesuffix("_report")
+        with timer.stage(stage, track_memory=False):
+            reused = run_cache.reuse_section(stage, key)
+            if reused is not None:
+                markdown = reused["markdown"]
+                llm_agent.plot_tool.captions.update(reused["captions"])
+                if reused["answer"] is not None:
+                    llm_agent.structured_answers[answer_key] = reused["answer"]
+            else:
+                markdown = await report()
+                captions = llm_agent.plot_tool.captions
+                figures = [f for f in embedded_figures(markdown) if f in captions]
+                run_cache.add_section(
+                    stage,
+                    key,
+                    markdown,
+                    figures=figures,
+                    captions={f: captions[f] for f in figures},
+                    answer=llm_agent.structured_answers.get(answer_key),
+                )
+        if COMBINE_MODE == "hierarchical":
+            digest_tasks[title] = asyncio.create_task(
+                digest(title, stage, markdown, reused)
+            )
+        return title, markdown
+
+    # Steps 1-5 — Sales trends, model performance, regional performance and
+    # sales drivers (correlations and XGBoost feature importance)
+    spinner = Spinner("Analyzing sales trends, model performance and sales drivers")
+    spinner.start()
+    try:
+        # One memory peak for the concurrent section stages
+        with timer.stage("sections"):
+            section_reports = dict(
+                await asyncio.gather(
+                    section(
+                        "Sales Trend Analysis",
+                        "sales_trend_report",
+                        (sales_summary, sales_digest),
+                        lambda: llm_agent.analyze_sales_trend_async(
+                            sales_summary, figures_dir, digest=sales_digest
+                        ),
+                    ),
+                    section(
+                        "Model Performance Across Years",
+                        "models_by_year_report",
+                        (model_by_year_summary, model_by_year_digest),
+                        lambda: llm_agent.analyze_models_over_years_trend_async(
+                            model_by_year_summary,
+                            figures_dir,
+                            digest=model_by_year_digest,
+                        ),
+                    ),
+                    section(
+                        "Regional Model Performance",
+                        "models_by_region_report",
+                        (model_by_region_summary, model_by_region_digest),
+                        lambda: llm_agent.analyze_models_over_region_trend_async(
+                            model_by_region_summary,
+                            figures_dir,
+                            digest=model_by_region_digest,
+                        ),
+                    ),
+                    section(
+                        "Key Drivers of Sales: Correlation Analysis",
+                        "correlation_report",
+                        sales_drivers,
+                        lambda: llm_agent.analyze_correlation_matrix_async(
+                            sales_drivers, figures_dir
+                        ),
+                    ),
+                    section(
+                        "Key Drivers of Sales: Feature Importance Analysis",
+                        "feature_importance_report",
+                        # The XGBoost fit is skipped when the rows are unchanged
+                        (
+                            dataset_fingerprint,
+                            XGBOOST_BOOTSTRAP,
+                            XGBOOST_ROW_BUDGET,
+                            XGBOOST_N_BOOTSTRAPS,
+                        ),
+                        feature_importance_report,
+                    ),
+                )
+            )
+    finally:
+        spinner.stop()
+
+    # Step 6 — Combine all reports
+    spinner = Spinner("Generating final report")
+    spinner.start()
+    try:
+        with timer.stage("combine_reports"):
+            if COMBINE_MODE == "hierarchical":
+                # Digests in report order, so the prompt does not depend on timing
+                section_digests = {
+                    title: await digest_tasks[title] for title in section_reports
+                }
+            combine_key = fingerprint(
+                section_settings, COMBINE_MODE, list(section_reports.items())
+            )
+            # Regenerated only if a section changed since the previous run
+            reused = run_cache.reuse_combined(combine_key)
+            if reused is not None:
+                combined_md = reused["markdown"]
+                if reused["answer"] is not None:
+                    llm_agent.structured_answers["combine"] = reused["answer"]
+            else:
+                if COMBINE_MODE == "hierarchical":
+                    combined_md = await llm_agent.summarize_section_digests_async(
+                        section_digests
+                    )
+                else:
+                    combined_md = await llm_agent.combine_and_summarize_reports_async(
+                        list(section_reports.values())
+                    )
+                run_cache.add_combined(
+                    combine_key,
+                    combined_md,
+                    answer=llm_agent.structured_answers.get("combine"),
+                )
+    finally:
+        spinner.stop()
+
+    return section_reports, combined_md
+
+
+section_reports, combined_md = asyncio.run(generate_sections())
+
+# Step 7 — Build final file
+with timer.stage("build_report"):
+    if COMBINE_MODE == "hierarchical":
+        # Full sections are spliced in locally, between summary and recommendations
+        combined_report_path = build_markdown_report(
+            [combined_md],
+            out_dir=experiment_dir,
+            report_title="BMW Sales Analysis Report",
+            section_markdowns=section_reports,
+            analysis_title="2. Analysis",
+            figure_captions=llm_agent.plot_tool.captions,
+        )
+    else:
+        combined_report_path = build_markdown_report(
+            [combined_md],
+            out_dir=experiment_dir,
+            report_title="BMW Sales Analysis Report",
+            figure_captions=llm_agent.plot_tool.captions,
+        )
+
+# Structured answers, for caching and diffing runs
+if llm_agent.structured:
+    writer.write_json(
+        llm_agent.structured_answers,
+        os.path.join(experiment_dir, "section_answers.json"),
+    )
+
+# Fingerprints and sections of this run, for a differential re-run
+writer.write_json(run_cache.manifest, os.path.join(experiment_dir, MANIFEST_FILENAME))
+
+# Wait for the pending background writes
+with timer.stage("flush_writes"):
+    writer.close()
+
+timer.save(os.path.join(experiment_dir, "timings.json"))
+
+if llm_agent.hedge is not None:
+    llm_agent.hedge.save(os.path.join(experiment_dir, HEDGE_LOG_FILENAME))
+    print(f"Hedged LLM requests: {llm_agent.hedge.summary()['hedges'] or 'none'}")
+
+if llm_agent.validate:
+    validation_path = os.path.join(experiment_dir, "validation.json")
+    atomic_write(validation_path, json.dumps(llm_agent.validation_log, indent=2))
+    if llm_agent.validation_log:
+        print(f"Repaired LLM answers: {len(llm_agent.validation_log)}")
+
+if model_router is not None:
+    fallbacks = sum(c["reason"] == "slo_fallback" for c in model_router.calls)
+    probes = sum(c["reason"] == "slo_probe" for c in model_router.calls)
+    print(
+        f"Model routing: {len(model_router.calls)} calls, "
+        f"{fallbacks} fallbacks to {ROUTING_FAST_MODEL}, {probes} probes"
+    )
+
+if previous_run is not None:
+    reuse = run_cache.summary()
+    print(
+        f"Reused from {reuse['previous_run']}: "
+        f"{len(reuse['reused_sections'])}/{len(section_reports)} sections, "
+        f"{reuse['reused_figures']} figures, "
+        f"final summary {'reused' if reuse['reused_combined'] else 'regenerated'}"
+    )
+
+if MEMORY_AWARE:
+    print(f"Peak traced memory per stage (MB): {timer.peak_memory_mb}")
+    print(f"Peak RSS after each stage (MB): {timer.peak_rss_mb}")
+
+print(llm_agent.usage.table())
 print(f"Final report saved to: {combined_report_path}")
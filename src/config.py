@@ -5,11 +5,150 @@ Configuration and path utilities for dataset and report directories.
 import os
 from datetime import datetime
 
+from dotenv import load_dotenv
+
+load_dotenv()  # environment overrides below may come from .env
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PARENT_DIR = os.path.dirname(BASE_DIR)  # one directory above the script location
 
 DATASET_PATH = os.path.join(PARENT_DIR, "datasets", "BMW sales data (2020-2024).xlsx")
 REPORTS_ROOT = os.path.join(PARENT_DIR, "reports")
+# Aggregate cube for ad-hoc roll-ups between runs (src.data_processing.cube);
+# the report does not use it, so it is only built on demand with SALES_CUBE=1
+SALES_CUBE = os.getenv("SALES_CUBE", "0") == "1"
+CUBE_CACHE_PATH = os.path.join(REPORTS_ROOT, "cache", "sales_cube.pkl")
+
+# Excel reader: "auto" uses calamine when python-calamine is installed, else
+# openpyxl. EXCEL_SHEETS is a comma-separated list of sheets to concatenate
+# (unset reads every sheet); sheets are parsed by up to EXCEL_WORKERS
+# processes (unset uses all cores)
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "auto")
+EXCEL_SHEETS = [
+    name.strip() for name in os.getenv("EXCEL_SHEETS", "").split(",") if name.strip()
+] or None
+EXCEL_WORKERS = int(os.getenv("EXCEL_WORKERS", "0")) or None
+
+# Run artifacts are written atomically (temp file + rename). JSON summaries
+# use ARTIFACT_FORMAT ("json", "orjson" or binary "msgpack") and optional
+# ARTIFACT_COMPRESSION ("gzip" or "zstd"); BACKGROUND_WRITES writes them on a
+# background thread so the pipeline does not wait for the disk
+ARTIFACT_FORMAT = os.getenv("ARTIFACT_FORMAT", "json")
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION") or None
+BACKGROUND_WRITES = True
+
+# Deduplicate each run directory into the content-addressed artifact store
+# under reports/objects (files become hard links to shared blobs)
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "1") == "1"
+# Retention applied after each run and by `python -m src.reporting.artifacts`:
+# keep the newest N runs and/or runs younger than N days (unset keeps all)
+RETENTION_KEEP_RUNS = int(os.getenv("RETENTION_KEEP_RUNS", "0")) or None
+RETENTION_MAX_AGE_DAYS = float(os.getenv("RETENTION_MAX_AGE_DAYS", "0")) or None
+
+# Shard the Region/Year/Model aggregation across a process pool on large data.
+# Off by default: enable it only where benchmarks/parallel_aggregation.py shows
+# a speedup on the target machine and data size
+PARALLEL_AGGREGATION = os.getenv("PARALLEL_AGGREGATION", "0") == "1"
+
+# Query engine of the loader's summaries and correlations: "pandas" (default),
+# "duckdb" or "polars" (multi-threaded; see src.data_processing.engines).
+# The Region/Year/Model shards of PARALLEL_AGGREGATION only apply to pandas
+QUERY_ENGINE = os.getenv("QUERY_ENGINE", "pandas")
+
+# Memory-aware pipeline: one normalized frame and one encoded frame shared
+# by all stages (freed after the XGBoost fit), with the peak memory and RSS of
+# each serial stage in timings.json (tracemalloc slows the run down). A run whose
+# projected footprint exceeds MEMORY_LIMIT_MB stops before building anything
+# (unset means unlimited).
+MEMORY_AWARE = os.getenv("MEMORY_AWARE", "0") == "1"
+MEMORY_LIMIT_MB = float(os.getenv("MEMORY_LIMIT_MB", "0")) or None
+
+# Collapse the model long tail into one "Other" series in the model summaries
+# (and so in plots, digests and prompts): keep the top-N models by total
+# sales and/or those with at least MODEL_MIN_SHARE of sales (None disables)
+MODEL_TOP_N = 12
+MODEL_MIN_SHARE = 0.01
+
+# Figure output: "png" or "svg" (no rasterization, smaller files);
+# PNG zlib level 0-9 (lower saves faster, None keeps matplotlib's default)
+FIGURE_FORMAT = "png"
+FIGURE_PNG_COMPRESS_LEVEL = None
+
+# Format of summary data embedded in LLM prompts: json, minjson, csv or matrix
+PROMPT_PAYLOAD_FORMAT = "matrix"
+
+# Send precomputed facts (growth, shares, top/bottom-k movers) instead of full tables
+PROMPT_DIGEST = True
+DIGEST_TOP_K = 3
+
+# LLM backend: "gemini" (API), "template" (local, deterministic, offline)
+# or "replay" (responses recorded in LLM_REPLAY_ARCHIVE)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+# Artificial latency per call of the template backend, in seconds
+TEMPLATE_LLM_LATENCY_S = float(os.getenv("TEMPLATE_LLM_LATENCY_S", "0"))
+
+# Record every prompt/response pair into the run directory
+LLM_RECORD = os.getenv("LLM_RECORD", "1") == "1"
+LLM_ARCHIVE_FILENAME = "llm_calls.jsonl"
+# Archive replayed by the "replay" backend, e.g. reports/run_.../llm_calls.jsonl
+LLM_REPLAY_ARCHIVE = os.getenv("LLM_REPLAY_ARCHIVE", "")
+# Replay sleeps for the recorded latency of each call
+LLM_REPLAY_LATENCY = os.getenv("LLM_REPLAY_LATENCY", "0") == "1"
+
+# Final combine step: "hierarchical" summarizes short section digests and
+# splices the full sections in locally; "full" sends all section reports
+COMBINE_MODE = "hierarchical"
+
+# Validate each section answer locally (required headings, figure embeds that
+# resolve to files under figures/) and repair only the faulty parts
+VALIDATE_SECTIONS = True
+
+# Structured output: the section calls and the final summary request compact
+# JSON (findings and figure references per heading, see src.llm.structured)
+# and the markdown is rendered locally; answers go to section_answers.json
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "0") == "1"
+
+# Tiered model routing (see src.llm.routing): the section drafts, digests and
+# repairs run on ROUTING_FAST_MODEL and the final summary on
+# ROUTING_STRONG_MODEL, falling back to the fast model while the strong model's
+# recent p90 latency (seeded from the last runs' routing.json) exceeds
+# ROUTING_SLO_S; every ROUTING_PROBE_EVERY-th fallen-back call still probes the
+# strong model, which is used again once a probe is within the SLO. Every
+# routed call is logged to routing.json
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "0") == "1"
+ROUTING_FAST_MODEL = os.getenv("ROUTING_FAST_MODEL", "gemini-2.5-flash-lite")
+ROUTING_STRONG_MODEL = os.getenv("ROUTING_STRONG_MODEL", "gemini-2.5-pro")
+ROUTING_STRONG_SECTIONS = ("combine",)
+ROUTING_SLO_S = float(os.getenv("ROUTING_SLO_S", "60"))
+ROUTING_SLO_PERCENTILE = 90
+ROUTING_PROBE_EVERY = int(os.getenv("ROUTING_PROBE_EVERY", "5"))
+
+# Differential re-run: reuse the figures and sections of a previous run whose
+# inputs are unchanged (see src.reporting.incremental). A run folder, or
+# "latest" for the newest run; unset generates everything
+RERUN_FROM = os.getenv("RERUN_FROM", "") or None
+
+# Hedged LLM calls: fire a duplicate request when a call is slower than the
+# HEDGE_PERCENTILE latency of its section in this and the last runs
+# (HEDGE_INITIAL_DELAY_S until enough calls of the section completed), and an
+# alternative one when an answer is empty or misses figure embeds; the first
+# valid answer wins
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "0") == "1"
+HEDGE_PERCENTILE = 90
+HEDGE_INITIAL_DELAY_S = 30.0
+HEDGE_MAX_ATTEMPTS = 3
+
+# Optional token budget (input + output) of a run; unset means unlimited.
+# "abort" stops before an over-budget call, "compact" first retries the
+# prompt with the precomputed facts instead of the full summary data. Calls
+# in flight hold their estimated tokens, so concurrent sections share it.
+TOKEN_BUDGET = int(os.getenv("TOKEN_BUDGET", "0")) or None
+TOKEN_BUDGET_MODE = os.getenv("TOKEN_BUDGET_MODE", "compact")
+
+# XGBoost driver analysis: bootstrap mode bounds each fit by a row budget
+XGBOOST_BOOTSTRAP = True
+XGBOOST_ROW_BUDGET = 50000
+XGBOOST_N_BOOTSTRAPS = 16
 
 
 # Make a timestamped folder for each run
@@ -0,0 +1,83 @@
+"""
+Top-N / threshold bucketing of the model long tail.
+
+With a catalogue of 100+ model variants, one line or one table row per
+model makes the plots unreadable and the LLM payloads large. The policy is
+applied once, when the model summaries are aggregated: models outside the
+top ``top_n`` by total sales, or below ``min_share`` of the sales, are
+collapsed into a single "Other" series. Plots, JSON summaries, digests and
+prompts all consume the bucketed summaries, so they stay consistent.
+"""
+
+from typing import Dict, List, Optional
+
+OTHER_LABEL = "Other"
+
+
+def bucket_long_tail(
+    year_records: Dict[str, List[dict]],
+    top_n: Optional[int] = None,
+    min_share: Optional[float] = None,
+    other_label: str = OTHER_LABEL,
+) -> Dict[str, List[dict]]:
+    """
+    Collapse the long tail of a {year: [{"Model", "Total_Sales"}]} summary.
+
+    Models are ranked by their total sales over all years. A model is kept if
+    it is within the ``top_n`` and has at least ``min_share`` of the total;
+    the others are summed per year into one ``other_label`` record, appended
+    after the kept models. Nothing is bucketed if fewer than two models would
+    be collapsed (a single model would only be renamed).
+
+    Args:
+        year_records: Model sales per year, sorted by sales descending.
+        top_n: Number of models to keep, or None for no limit.
+        min_share: Minimum share (0-1) of total sales to keep a model, or None.
+        other_label: Label of the collapsed series.
+
+    Returns:
+        dict: The summary with the same structure, possibly bucketed.
+    """
+    if top_n is None and min_share is None:
+        return year_records
+
+    totals: Dict[str, float] = {}
+    for records in year_records.values():
+        for entry in records:
+            model = entry["Model"]
+            totals[model] = totals.get(model, 0) + entry["Total_Sales"]
+
+    # Rank by total sales; ties broken by name so the kept set is deterministic
+    ranked = sorted(totals, key=lambda model: (-totals[model], model))
+    if top_n is not None:
+        ranked = ranked[:top_n]
+    grand_total = sum(totals.values())
+    if min_share is not None and grand_total > 0:
+        ranked = [m for m in ranked if totals[m] / grand_total >= min_share]
+
+    keep = set(ranked)
+    if len(totals) - len(keep) < 2:
+        return year_records
+
+    bucketed = {}
+    for year, records in year_records.items():
+        kept = [entry for entry in records if entry["Model"] in keep]
+        other = sum(
+            entry["Total_Sales"] for entry in records if entry["Model"] not in keep
+        )
+        if len(kept) < len(records):
+            kept.append({"Model": other_label, "Total_Sales": other})
+        bucketed[year] = kept
+    return bucketed
+
+
+def has_other_bucket(summary, other_label: str = OTHER_LABEL) -> bool:
+    """True if a (possibly nested) model summary contains the bucketed series."""
+    if isinstance(summary, dict):
+        return any(has_other_bucket(v, other_label) for v in summary.values())
+    if isinstance(summary, list):
+        return any(
+            isinstance(entry, dict) and entry.get("Model") == other_label
+            for entry in summary
+        )
+    return False
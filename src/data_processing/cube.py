@@ -0,0 +1,268 @@
+"""
+Materialized aggregate cube over the categorical dimensions of the sales data.
+
+The loader summaries are hard-coded cuts (Year, Region + Year, Region + Year +
+Model) and each one is a full pass over the rows. ``SalesCube`` aggregates the
+data once into a base cuboid over all dimensions (Model, Year, Region, Color,
+Fuel_Type, Transmission and a derived Price_Band), with sum, count and mean of
+Sales_Volume and Price_USD. Any roll-up or slice is then answered from the
+cube:
+
+- Every roll-up (cuboid) is derived from its smallest already-materialized
+  parent and cached, and query results are memoized, so repeated queries
+  are dictionary lookups.
+- ``materialize`` precomputes all cuboids up front.
+- The cube is persisted with a fingerprint of the source rows and reused by
+  ``load_or_build`` on later runs.
+"""
+
+import os
+import pickle
+from itertools import combinations
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = (
+    "Model",
+    "Year",
+    "Region",
+    "Color",
+    "Fuel_Type",
+    "Transmission",
+    "Price_Band",
+)
+MEASURES = ("Sales_Volume", "Price_USD")
+
+PRICE_BINS = (0, 40000, 60000, 80000, 100000, np.inf)
+PRICE_LABELS = ("<40k", "40k-60k", "60k-80k", "80k-100k", ">=100k")
+
+CUBE_FORMAT_VERSION = 1
+
+
+def add_price_band(
+    df: pd.DataFrame,
+    bins: Sequence[float] = PRICE_BINS,
+    labels: Sequence[str] = PRICE_LABELS,
+) -> pd.DataFrame:
+    """Return df with a categorical Price_Band column derived from Price_USD."""
+    bands = pd.cut(
+        pd.to_numeric(df["Price_USD"], errors="coerce"),
+        bins=list(bins),
+        labels=list(labels),
+        right=False,
+    )
+    return df.assign(Price_Band=bands.astype(str).where(bands.notna()))
+
+
+def _finalize(grouped: pd.DataFrame) -> pd.DataFrame:
+    """Add mean columns from the additive sum/count columns."""
+    for measure in MEASURES:
+        count = grouped[f"{measure}_count"]
+        grouped[f"{measure}_mean"] = grouped[f"{measure}_sum"] / count.where(count > 0)
+    return grouped
+
+
+class SalesCube:
+    """
+    Aggregate cube with sum/count/mean of Sales_Volume and Price_USD.
+
+    Cuboids are stored by their sorted dimension tuple. Only the additive
+    columns (sums and counts) are rolled up; means are recomputed from them.
+    Returned frames are cached objects shared between queries and must not
+    be modified in place.
+    """
+
+    def __init__(self, base: pd.DataFrame, dimensions: Sequence[str], fingerprint=None):
+        self.dimensions = tuple(dimensions)
+        self.fingerprint = fingerprint
+        self._cuboids: Dict[Tuple[str, ...], pd.DataFrame] = {
+            tuple(sorted(self.dimensions)): base
+        }
+        self._results: Dict[tuple, pd.DataFrame] = {}
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        dimensions: Optional[Sequence[str]] = None,
+    ) -> "SalesCube":
+        """Build the base cuboid from raw rows in a single groupby pass."""
+        # Fingerprint the rows as given, as load_or_build does
+        fingerprint = cls.fingerprint_of(df)
+        if "Price_Band" not in df.columns and "Price_USD" in df.columns:
+            df = add_price_band(df)
+
+        dimensions = [d for d in (dimensions or DIMENSIONS) if d in df.columns]
+        if not dimensions:
+            raise ValueError("None of the cube dimensions are present in the data.")
+
+        columns = {}
+        for measure in MEASURES:
+            values = pd.to_numeric(df[measure], errors="coerce")
+            columns[f"{measure}_sum"] = values.fillna(0)
+            columns[f"{measure}_count"] = values.notna().astype(np.int64)
+
+        base = (
+            pd.DataFrame(columns)
+            .groupby([df[d] for d in sorted(dimensions)], observed=True)
+            .sum()
+        )
+        return cls(_finalize(base), dimensions, fingerprint=fingerprint)
+
+    @staticmethod
+    def fingerprint_of(df: pd.DataFrame) -> str:
+        """
+        Order-insensitive fingerprint of the rows relevant to the cube.
+
+        Aggregates do not depend on row order, so reshuffled data reuses the cube.
+        """
+        columns = [c for c in (*DIMENSIONS, *MEASURES) if c in df.columns]
+        hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+        return f"{len(df)}-{int(hashes.sum(dtype=np.uint64)):016x}"
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def rollup(self, dimensions: Sequence[str] = (), **filters) -> pd.DataFrame:
+        """
+        Aggregate the cube to ``dimensions``, optionally sliced by ``filters``.
+
+        Args:
+            dimensions: Dimensions to keep, in the order of the result index.
+                An empty sequence returns the grand total.
+            **filters: Dimension values to slice on, a scalar or a list of
+                values, e.g. ``Region="Europe"`` or ``Year=[2023, 2024]``.
+
+        Returns:
+            pd.DataFrame indexed by ``dimensions`` with sum, count and mean
+            columns for Sales_Volume and Price_USD.
+
+        Example:
+            cube.rollup(["Fuel_Type", "Year"], Region="Europe")
+        """
+        dimensions = list(dimensions)
+        filters = {
+            dim: tuple(value) if isinstance(value, (list, tuple, set)) else (value,)
+            for dim, value in filters.items()
+        }
+        key = (tuple(dimensions), tuple(sorted(filters.items())))
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        unknown = set(dimensions).union(filters) - set(self.dimensions)
+        if unknown:
+            raise ValueError(
+                f"Unknown cube dimensions {sorted(unknown)}. "
+                f"Available: {list(self.dimensions)}"
+            )
+
+        result = self._query(dimensions, filters)
+        self._results[key] = result
+        return result
+
+    def _query(self, dimensions: list, filters: dict) -> pd.DataFrame:
+        """Answer a roll-up/slice from the smallest cuboid that covers it."""
+        cuboid = self.cuboid(set(dimensions).union(filters))
+
+        if filters:
+            mask = np.ones(len(cuboid), dtype=bool)
+            for dim, values in filters.items():
+                mask &= cuboid.index.get_level_values(dim).isin(values)
+            sliced = cuboid.loc[mask]
+            return self._aggregate(sliced, dimensions)
+
+        if not dimensions:
+            return self._aggregate(cuboid, dimensions)
+        if len(dimensions) > 1 and list(cuboid.index.names) != dimensions:
+            return cuboid.reorder_levels(dimensions).sort_index()
+        return cuboid
+
+    def cuboid(self, dimensions) -> pd.DataFrame:
+        """Return (and cache) the cuboid over a set of dimensions."""
+        key = tuple(sorted(dimensions))
+        cached = self._cuboids.get(key)
+        if cached is not None:
+            return cached
+
+        # Roll up from the smallest materialized superset
+        parents = [k for k in self._cuboids if set(key) <= set(k)]
+        parent = min(parents, key=lambda k: len(self._cuboids[k]))
+        cuboid = self._aggregate(self._cuboids[parent], list(key))
+
+        self._cuboids[key] = cuboid
+        return cuboid
+
+    def materialize(self, max_dimensions: Optional[int] = None) -> "SalesCube":
+        """Precompute every cuboid with up to ``max_dimensions`` dimensions."""
+        limit = len(self.dimensions) if max_dimensions is None else max_dimensions
+        # Largest first, so each cuboid is rolled up from a small parent
+        for size in range(min(limit, len(self.dimensions)), 0, -1):
+            for dims in combinations(sorted(self.dimensions), size):
+                self.cuboid(dims)
+        return self
+
+    @staticmethod
+    def _aggregate(frame: pd.DataFrame, dimensions: list) -> pd.DataFrame:
+        """Sum the additive columns of a cuboid down to ``dimensions``."""
+        additive = [c for c in frame.columns if not c.endswith("_mean")]
+        if dimensions:
+            grouped = frame[additive].groupby(level=dimensions, observed=True).sum()
+        else:
+            grouped = frame[additive].sum().to_frame(name="All").T
+        return _finalize(grouped)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path: str) -> str:
+        """Persist the cube (all materialized cuboids) to ``path``."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "version": CUBE_FORMAT_VERSION,
+            "dimensions": self.dimensions,
+            "fingerprint": self.fingerprint,
+            "cuboids": self._cuboids,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SalesCube":
+        """Load a cube saved with ``save``."""
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("version") != CUBE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported cube format in '{path}'.")
+
+        cube = cls.__new__(cls)
+        cube.dimensions = tuple(payload["dimensions"])
+        cube.fingerprint = payload["fingerprint"]
+        cube._cuboids = payload["cuboids"]
+        cube._results = {}
+        return cube
+
+    @classmethod
+    def load_or_build(
+        cls, df: pd.DataFrame, path: str, materialize: bool = True
+    ) -> "SalesCube":
+        """
+        Reuse the cube persisted at ``path`` if it was built from the same rows,
+        otherwise build it from df (materializing all cuboids) and save it.
+        """
+        if os.path.exists(path):
+            try:
+                cube = cls.load(path)
+                if cube.fingerprint == cls.fingerprint_of(df):
+                    return cube
+            except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+                print(f"Rebuilding cube, could not reuse '{path}': {e}")
+
+        cube = cls.from_dataframe(df)
+        if materialize:
+            cube.materialize()
+        cube.save(path)
+        return cube
@@ -0,0 +1,264 @@
+"""
+Statistical pre-digest of the sales summaries for LLM prompts.
+
+Instead of handing the LLM full year × model tables and asking it to find
+trends, this stage computes the facts it needs with vectorized pandas
+operations:
+
+- Year-over-year growth and CAGR (overall, per region, per model).
+- Share of the year's (or region's) sales and rank changes between the
+  first and last year.
+- Top-k / bottom-k models and the biggest movers.
+
+A bucketed "Other" series (see ``bucketing``) counts towards totals and
+shares but is not ranked as a model; its share is reported separately.
+
+The digests are small, fixed-size dicts (they grow with ``top_k``, not with
+the catalogue size). ``digest_to_text`` renders them as compact fact lines
+to embed in prompts in place of the full summaries.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing.bucketing import OTHER_LABEL
+
+
+def _pct(value) -> float:
+    """Round a ratio to a percentage with one decimal (NaN/inf become None)."""
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value) * 100, 1)
+
+
+def _cagr(first, last, periods: int):
+    """Compound annual growth rate between two values (vectorized)."""
+    if periods <= 0:
+        return np.nan * first
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (last / first) ** (1 / periods) - 1
+
+
+def _year_matrix(year_records: Dict[str, list]) -> pd.DataFrame:
+    """Build a models × years sales matrix from {year: [{"Model", "Total_Sales"}]}."""
+    rows = [
+        (int(year), entry["Model"], entry["Total_Sales"])
+        for year, entries in year_records.items()
+        for entry in entries
+    ]
+    long = pd.DataFrame(rows, columns=["Year", "Model", "Total_Sales"])
+    return long.pivot_table(
+        index="Model", columns="Year", values="Total_Sales", aggfunc="sum", fill_value=0
+    ).sort_index(axis=1)
+
+
+def _series_facts(values: pd.Series) -> dict:
+    """Growth facts of a single yearly series."""
+    years = values.index.tolist()
+    yoy = values.pct_change().iloc[1:]
+    return {
+        "years": f"{years[0]}-{years[-1]}",
+        "first": int(values.iloc[0]),
+        "last": int(values.iloc[-1]),
+        "cagr_pct": _pct(
+            _cagr(values.iloc[0], values.iloc[-1], int(years[-1]) - int(years[0]))
+        ),
+        "yoy_pct": {str(y): _pct(v) for y, v in yoy.items()},
+        "peak_year": int(values.idxmax()),
+        "trough_year": int(values.idxmin()),
+    }
+
+
+def _entries(series: pd.Series, key: str) -> List[dict]:
+    return [{"Model": model, key: value} for model, value in series.items()]
+
+
+def _model_facts(matrix: pd.DataFrame, top_k: int) -> dict:
+    """Top/bottom models, movers and rank changes of a models × years matrix."""
+    first_year, last_year = matrix.columns[0], matrix.columns[-1]
+    # Shares are of all sales, including the "Other" bucket, which is not ranked
+    last_total = matrix[last_year].sum()
+    other = matrix.loc[OTHER_LABEL] if OTHER_LABEL in matrix.index else None
+    matrix = matrix.drop(index=OTHER_LABEL, errors="ignore")
+
+    first, last = matrix[first_year], matrix[last_year]
+    k = min(top_k, len(matrix))
+
+    share = last / last_total if last_total else last * np.nan
+    ranks = matrix.rank(ascending=False, method="min").astype(int)
+    rank_change = ranks[first_year] - ranks[last_year]  # positive = climbed
+    change = _cagr(first.replace(0, np.nan), last, int(last_year) - int(first_year))
+
+    # Largest single year-over-year moves across all models
+    yoy = matrix.pct_change(axis=1).iloc[:, 1:].replace([np.inf, -np.inf], np.nan)
+    yoy_long = yoy.stack().dropna()
+
+    # Models in the top-k of every year
+    in_top_k = (ranks <= k).all(axis=1)
+
+    def sales_entries(models):
+        return [
+            {
+                "Model": model,
+                "Sales": int(last[model]),
+                "Share_pct": _pct(share[model]),
+            }
+            for model in models
+        ]
+
+    facts = {
+        "n_models": int(len(matrix)),
+        "top_k_last_year": sales_entries(last.nlargest(k).index),
+        "bottom_k_last_year": sales_entries(last.nsmallest(k).index),
+        "consistent_top_k": sorted(in_top_k[in_top_k].index.tolist()),
+        "top_growth_cagr_pct": _entries(change.nlargest(k).map(_pct), "CAGR_pct"),
+        "top_decline_cagr_pct": _entries(change.nsmallest(k).map(_pct), "CAGR_pct"),
+        "rank_climbers": _entries(rank_change[rank_change > 0].nlargest(k), "Ranks"),
+        "rank_fallers": _entries((-rank_change[rank_change < 0]).nlargest(k), "Ranks"),
+        "largest_yoy_jumps": [
+            {"Model": model, "Year": int(year), "YoY_pct": _pct(value)}
+            for (model, year), value in yoy_long.nlargest(k).items()
+        ],
+        "largest_yoy_drops": [
+            {"Model": model, "Year": int(year), "YoY_pct": _pct(value)}
+            for (model, year), value in yoy_long.nsmallest(k).items()
+        ],
+    }
+    if other is not None:
+        facts["other_share_last_year_pct"] = _pct(
+            other[last_year] / last_total if last_total else np.nan
+        )
+    return facts
+
+
+def digest_sales_summary(sales_summary: dict) -> dict:
+    """
+    Digest the output of ``summarize_sales_by_region_year``.
+
+    Returns:
+        dict with "overall" growth facts and, per region, growth facts plus
+        share of total sales in the last year and the rank change.
+    """
+    overall = pd.Series(
+        {int(y): v for y, v in sales_summary["sales_by_year"].items()}
+    ).sort_index()
+
+    regions = pd.DataFrame(
+        {
+            region: {int(y): v for y, v in years.items()}
+            for region, years in sales_summary["sales_by_region_year"].items()
+        }
+    ).T.sort_index(axis=1)
+    regions = regions.fillna(0)
+
+    last_year = regions.columns[-1]
+    share = regions[last_year] / regions[last_year].sum()
+    ranks = regions.rank(ascending=False, method="min").astype(int)
+
+    region_facts = {}
+    for region in regions.index:
+        facts = _series_facts(regions.loc[region])
+        facts["share_of_all_sales_last_year_pct"] = _pct(share[region])
+        facts["rank_first_to_last"] = (
+            f"{ranks.loc[region, regions.columns[0]]}->{ranks.loc[region, last_year]}"
+        )
+        region_facts[region] = facts
+
+    return {"overall": _series_facts(overall), "regions": region_facts}
+
+
+def digest_models_by_year(year_model_summary: dict, top_k: int = 3) -> dict:
+    """
+    Digest the output of ``summarize_models_by_year``.
+
+    Returns:
+        dict with total-market growth facts and the top/bottom models,
+        biggest movers and rank changes, each limited to ``top_k`` entries.
+    """
+    matrix = _year_matrix(year_model_summary)
+    return {
+        "market": _series_facts(matrix.sum()),
+        **_model_facts(matrix, top_k),
+    }
+
+
+def digest_models_by_region(region_model_summary: dict, top_k: int = 3) -> dict:
+    """
+    Digest the output of ``summarize_models_by_region_year``.
+
+    Returns:
+        dict per region with the region's growth facts, its share of all
+        sales in the last year, and top-k/bottom-k models and movers, where
+        model shares are shares of the region's sales.
+    """
+    matrices = {
+        region: _year_matrix(years) for region, years in region_model_summary.items()
+    }
+    totals = pd.DataFrame({region: m.sum() for region, m in matrices.items()}).T
+    totals = totals.fillna(0)
+    last_year = totals.columns[-1]
+    region_share = totals[last_year] / totals[last_year].sum()
+
+    digest = {}
+    for region, matrix in matrices.items():
+        digest[region] = {
+            "region": _series_facts(matrix.sum()),
+            "share_of_all_sales_last_year_pct": _pct(region_share[region]),
+            **_model_facts(matrix, top_k),
+        }
+    return digest
+
+
+def _inline(value) -> str:
+    """Inline rendering of a scalar, a list of scalars or a flat dict."""
+    if isinstance(value, dict):
+        return "/".join(f"{k}:{v}" for k, v in value.items())
+    if isinstance(value, list):
+        return "|".join(str(v) for v in value) or "-"
+    return str(value)
+
+
+def _is_flat(value) -> bool:
+    """True for values that fit on one line (no records, no nested dicts)."""
+    if isinstance(value, dict):
+        return all(not isinstance(v, (dict, list)) for v in value.values())
+    if isinstance(value, list):
+        return all(not isinstance(v, (dict, list)) for v in value)
+    return True
+
+
+def digest_to_text(digest: dict, prefix: str = "") -> str:
+    """
+    Render a digest as compact fact lines.
+
+    Nested keys are joined with dots, a group of plain facts is written on
+    one line (``Asia.region: first=2407513, cagr_pct=6.4, yoy_pct=2021:13.1/...``),
+    and a list of records is written once with its field names, e.g.
+    ``top_k_last_year [Model|Sales|Share_pct]: X6|1836396|10.5; X3|1664449|9.5``.
+    """
+    lines = []
+    scalars = []
+    for key, value in digest.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            fields = list(value[0])
+            rows = "; ".join("|".join(str(e[f]) for f in fields) for e in value)
+            lines.append(f"{name} [{'|'.join(fields)}]: {rows}")
+        elif isinstance(value, dict) and not all(_is_flat(v) for v in value.values()):
+            lines.append(digest_to_text(value, prefix=f"{name}."))
+        elif isinstance(value, dict) and any(
+            isinstance(v, dict) for v in value.values()
+        ):
+            facts = ", ".join(f"{k}={_inline(v)}" for k, v in value.items())
+            lines.append(f"{name}: {facts}")
+        elif isinstance(value, dict):
+            lines.append(f"{name}: {_inline(value)}")
+        else:
+            scalars.append(f"{key}={_inline(value)}")
+
+    if scalars:
+        # Plain facts of this level share one line
+        lines.insert(0, f"{prefix.rstrip('.') or 'facts'}: {', '.join(scalars)}")
+    return "\n".join(lines)
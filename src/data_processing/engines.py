@@ -0,0 +1,392 @@
+"""
+Query engines for the loader's summary and driver-statistics computations.
+
+The summary functions in ``loader`` only need two primitives from the
+data, which a ``QueryEngine`` provides:
+
+- ``group_totals``: Sales_Volume summed per combination of key columns
+  (Year, Region+Year, Year+Model, Region+Year+Model).
+- ``sales_correlations``: the Pearson correlation of every feature of
+  ``encode_features`` (numeric columns and one-hot dummies, Year included)
+  with Sales_Volume.
+
+The summary dicts are then built from the small aggregated frames with the
+same pandas code for every engine, so all engines produce identical
+summaries. Engines:
+
+- ``PandasEngine``: single-threaded pandas groupbys and ``DataFrame.corr``
+  (the reference implementation).
+- ``DuckDBEngine``: in-process DuckDB SQL over the frame, multi-threaded.
+- ``PolarsEngine``: Polars lazy group-bys and correlations, multi-threaded.
+
+DuckDB and Polars are optional dependencies, imported when their engine is
+created. Both convert the columns of the last frame they were given once
+(text as categories for DuckDB, as Polars strings built from the distinct
+values for Polars), as the loader runs several aggregations over the same
+frame.
+"""
+
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SALES = "Sales_Volume"
+
+
+def categorical_columns(df: pd.DataFrame) -> List[str]:
+    """Columns one-hot encoded by ``encode_features``: text columns and Year."""
+    return [
+        name
+        for name in df.columns
+        if name == "Year"
+        or (
+            name != SALES
+            and (
+                pd.api.types.is_object_dtype(df[name])
+                or pd.api.types.is_string_dtype(df[name])
+                or isinstance(df[name].dtype, pd.CategoricalDtype)
+            )
+        )
+    ]
+
+
+def encode_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One-hot encode categorical variables (including Year) and coerce
+    Sales_Volume to numeric, as used by the key-driver analyses.
+
+    The result can be computed once and passed as ``encoded`` to the
+    key-driver functions, which otherwise encode ``df`` themselves.
+    """
+    df = df.copy(deep=False)
+
+    # Ensure Sales_Volume is numeric
+    df[SALES] = pd.to_numeric(df[SALES], errors="coerce").fillna(0)
+
+    # Treat Year as categorical
+    df["Year"] = df["Year"].astype(str)
+
+    # One-hot encode categorical variables
+    return pd.get_dummies(df, columns=categorical_columns(df), drop_first=True)
+
+
+def feature_layout(df: pd.DataFrame) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Columns of ``encode_features(df)`` without building it.
+
+    Returns:
+        (numeric columns, [(column, value) of each dummy]), in the column
+        order of ``encode_features``: kept columns first, then the dummies of
+        each categorical column with its first value dropped.
+    """
+    categorical = categorical_columns(df)
+    numeric = [name for name in df.columns if name not in categorical]
+    dummies = []
+    for name in categorical:
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = [str(v) for v in series.cat.categories]
+        else:
+            values = sorted(series.dropna().astype(str).unique())
+        dummies.extend((name, value) for value in values[1:])
+    return numeric, dummies
+
+
+def _sales_as_float(df: pd.DataFrame) -> pd.DataFrame:
+    """Shallow copy with Sales_Volume numeric and missing values as 0."""
+    df = df.copy(deep=False)
+    df[SALES] = pd.to_numeric(df[SALES], errors="coerce").fillna(0).astype(float)
+    return df
+
+
+class QueryEngine(ABC):
+    """Aggregations of the sales rows behind the loader's summaries."""
+
+    name = ""
+
+    def group_totals(self, df: pd.DataFrame, keys: Sequence[str]) -> pd.DataFrame:
+        """
+        Total Sales_Volume per combination of ``keys``.
+
+        Rows with a missing key are left out, as in a pandas groupby.
+
+        Args:
+            df: Sales rows with numeric Sales_Volume (missing as 0).
+            keys: Key columns, e.g. ["Region", "Year"].
+
+        Returns:
+            pd.DataFrame: The key columns (text keys as str) and a float
+            Sales_Volume column, sorted by the keys.
+        """
+        keys = list(keys)
+        totals = self._group_totals(df, keys)
+        for key in keys:
+            if not pd.api.types.is_numeric_dtype(df[key]):
+                totals[key] = totals[key].astype(str)
+        totals[SALES] = totals[SALES].astype(float)
+        return totals.sort_values(keys, kind="stable").reset_index(drop=True)
+
+    @abstractmethod
+    def _group_totals(self, df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """Unsorted ``group_totals`` of the engine (keys and Sales_Volume columns)."""
+
+    @abstractmethod
+    def sales_correlations(
+        self, df: pd.DataFrame, encoded: Optional[pd.DataFrame] = None
+    ) -> pd.Series:
+        """
+        Pearson correlation of every encoded feature with Sales_Volume.
+
+        Args:
+            df: Sales rows.
+            encoded: ``encode_features(df)``, if already computed (engines
+                that do not need it ignore it).
+
+        Returns:
+            pd.Series: Correlations indexed by the ``encode_features`` column
+            names, in their order (Sales_Volume itself included).
+        """
+
+
+class _ConvertedColumns:
+    """
+    Columns of the last frame an engine was given, converted once.
+
+    The loader runs several aggregations over the same frame, so each of its
+    columns is converted on first use and reused until a different frame (or
+    one whose columns or length changed) is given. The source frame itself is
+    not kept alive.
+
+    Args:
+        convert: Converts a pandas column for the engine.
+        build: Builds the engine's frame from a dict of converted columns.
+    """
+
+    def __init__(self, convert: Callable, build: Callable):
+        self._convert = convert
+        self._build = build
+        self._source = None
+        self._shape = None
+        self._columns: Dict[str, object] = {}
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def frame(self, df: pd.DataFrame, names: Sequence[str]):
+        """
+        Engine frame of the converted columns of ``df``, ``names`` included.
+
+        The same frame object is returned until a column is added to it.
+        """
+        shape = (tuple(df.columns), len(df))
+        with self._lock:
+            if self._source is None or self._source() is not df or self._shape != shape:
+                self._source = weakref.ref(df)
+                self._shape = shape
+                self._columns = {}
+                self._frame = None
+            missing = [name for name in names if name not in self._columns]
+            for name in missing:
+                self._columns[name] = self._convert(df[name])
+            if missing or self._frame is None:
+                self._frame = self._build(self._columns)
+            return self._frame
+
+
+class PandasEngine(QueryEngine):
+    """Reference engine: pandas groupbys and ``DataFrame.corr``."""
+
+    name = "pandas"
+
+    def _group_totals(self, df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        return df.groupby(keys, observed=True)[SALES].sum().reset_index()
+
+    def sales_correlations(
+        self, df: pd.DataFrame, encoded: Optional[pd.DataFrame] = None
+    ) -> pd.Series:
+        encoded = encode_features(df) if encoded is None else encoded
+        return encoded.corr(method="pearson")[SALES]
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class DuckDBEngine(QueryEngine):
+    """In-process DuckDB: SQL aggregations over the frame, on all cores."""
+
+    name = "duckdb"
+
+    def __init__(self, threads: Optional[int] = None):
+        import duckdb  # pylint: disable=import-outside-toplevel
+
+        self.threads = threads
+        self._con = duckdb.connect()
+        if threads:
+            self._con.execute(f"SET threads = {int(threads)}")
+        # DuckDB scans categories much faster than pandas strings
+        self._converted = _ConvertedColumns(
+            lambda s: s if pd.api.types.is_numeric_dtype(s) else s.astype("category"),
+            pd.DataFrame,
+        )
+        self._registered = None
+        # The connection and its registered frame are shared by all queries
+        self._lock = threading.Lock()
+
+    def _run(self, frame: pd.DataFrame, sql: str, fetch):
+        """Run ``sql`` over ``frame`` (as table "sales") and fetch the result."""
+        with self._lock:
+            if frame is not self._registered:
+                self._con.register("sales", frame)
+                self._registered = frame
+            return fetch(self._con.execute(sql))
+
+    def _group_totals(self, df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        selected = ", ".join(
+            (
+                _quote(k)
+                if pd.api.types.is_numeric_dtype(df[k])
+                else f"CAST({_quote(k)} AS VARCHAR) AS {_quote(k)}"
+            )
+            for k in keys
+        )
+        groups = ", ".join(str(i + 1) for i in range(len(keys)))
+        not_null = " AND ".join(f"{_quote(k)} IS NOT NULL" for k in keys)
+        sql = (
+            f"SELECT {selected}, CAST(SUM({_quote(SALES)}) AS DOUBLE) "
+            f"AS {_quote(SALES)} FROM sales WHERE {not_null} GROUP BY {groups}"
+        )
+        frame = self._converted.frame(df, [*keys, SALES])
+        return self._run(frame, sql, lambda result: result.df())
+
+    def sales_correlations(
+        self, df: pd.DataFrame, encoded: Optional[pd.DataFrame] = None
+    ) -> pd.Series:
+        frame = _sales_as_float(df)
+        numeric, dummies = feature_layout(frame)
+        target = _quote(SALES)
+        columns = [
+            f"corr(CAST({_quote(name)} AS DOUBLE), {target})" for name in numeric
+        ] + [
+            f"corr(CAST(COALESCE(CAST({_quote(name)} AS VARCHAR) = {_literal(value)}, "
+            f"false) AS DOUBLE), {target})"
+            for name, value in dummies
+        ]
+        sql = f"SELECT {', '.join(columns)} FROM sales"
+        # Only Sales_Volume differs from the columns of ``df``
+        others = [name for name in df.columns if name != SALES]
+        converted = self._converted.frame(df, others)[others].assign(
+            **{SALES: frame[SALES]}
+        )
+        row = self._run(converted, sql, lambda result: result.fetchone())
+        names = numeric + [f"{name}_{value}" for name, value in dummies]
+        return pd.Series(
+            [float("nan") if v is None else v for v in row], index=names, name=SALES
+        )
+
+
+class PolarsEngine(QueryEngine):
+    """Polars: multi-threaded group-bys and correlations."""
+
+    name = "polars"
+
+    def __init__(self):
+        import polars  # pylint: disable=import-outside-toplevel
+
+        self._pl = polars
+        self._converted = _ConvertedColumns(self._to_series, polars.DataFrame)
+
+    def _to_series(self, series: pd.Series):
+        """Polars series from a pandas column (no pyarrow needed)."""
+        pl = self._pl
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            return pl.Series(
+                series.name, series.to_numpy(), nan_to_null=True, strict=False
+            )
+        # Text: convert the distinct values only and gather them by code
+        codes, uniques = pd.factorize(series)
+        positions = pl.Series(
+            np.where(codes < 0, np.nan, codes), nan_to_null=True
+        ).cast(pl.UInt32)
+        values = pl.Series(series.name, [str(v) for v in uniques], pl.String)
+        return values.gather(positions)
+
+    def _group_totals(self, df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        pl = self._pl
+        totals = (
+            self._converted.frame(df, [*keys, SALES])
+            .lazy()
+            .select(keys + [SALES])
+            .drop_nulls(keys)
+            .group_by(keys)
+            .agg(pl.col(SALES).cast(pl.Float64).sum())
+            .collect()
+        )
+        return pd.DataFrame(totals.to_dict(as_series=False))
+
+    def sales_correlations(
+        self, df: pd.DataFrame, encoded: Optional[pd.DataFrame] = None
+    ) -> pd.Series:
+        pl = self._pl
+        frame = _sales_as_float(df)
+        numeric, dummies = feature_layout(frame)
+        target = pl.col(SALES)
+        exprs = [
+            pl.corr(pl.col(name).cast(pl.Float64), target).alias(name)
+            for name in numeric
+        ] + [
+            pl.corr(
+                (pl.col(name).cast(pl.String) == value)
+                .fill_null(False)
+                .cast(pl.Float64),
+                target,
+            ).alias(f"{name}_{value}")
+            for name, value in dummies
+        ]
+        # Only Sales_Volume differs from the columns of ``df``
+        others = [name for name in df.columns if name != SALES]
+        columns = (
+            self._converted.frame(df, others)
+            .select(others)
+            .with_columns(self._to_series(frame[SALES]))
+        )
+        row = columns.select(exprs).row(0)
+        names = numeric + [f"{name}_{value}" for name, value in dummies]
+        return pd.Series(
+            [float("nan") if v is None else v for v in row], index=names, name=SALES
+        )
+
+
+ENGINES: Dict[str, type] = {
+    "pandas": PandasEngine,
+    "duckdb": DuckDBEngine,
+    "polars": PolarsEngine,
+}
+
+
+def create_engine(name: str = "pandas", **kwargs) -> QueryEngine:
+    """Instantiate a query engine by name with engine-specific keyword arguments."""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown query engine '{name}'. Available: {list(ENGINES)}")
+    return ENGINES[name](**kwargs)
+
+
+_default_engine: QueryEngine = PandasEngine()
+
+
+def get_default_engine() -> QueryEngine:
+    """Engine used by the loader's summary functions when none is passed."""
+    return _default_engine
+
+
+def set_default_engine(engine: QueryEngine) -> None:
+    """Replace the engine used by the loader's summary functions by default."""
+    global _default_engine  # pylint: disable=global-statement
+    _default_engine = engine
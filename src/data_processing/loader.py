@@ -2,28 +2,87 @@
 Data loading and preprocessing utilities for BMW sales analysis.
 
 This module provides helper functions to:
-- Load the dataset from Excel.
+- Load the dataset from Excel (every sheet, see ``excel.read_workbook``).
 - Summarize sales trends by region and year.
 - Summarize BMW model performance by year and by region.
 - Explore key drivers of sales using both Pearson correlation
-    and XGBoost-based feature importance analysis.
+    and XGBoost-based feature importance analysis, optionally with
+    bootstrapped confidence intervals on row-budgeted subsamples.
 
 These functions generate structured summaries that can be consumed by
 LLM-powered reporting agents or analytics pipelines.
 """
 
-import json
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 import xgboost as xgb
+from joblib import Parallel, delayed
 from sklearn.model_selection import train_test_split
 
+from src.data_processing.bucketing import bucket_long_tail
+from src.data_processing.engines import (
+    QueryEngine,
+    encode_features,
+    get_default_engine,
+)
+from src.data_processing.excel import Sheets, read_workbook
+from src.reporting.writer import get_default_writer
+
+
+def load_dataset(
+    path: str,
+    sheets: Sheets = None,
+    engine: str = "auto",
+    n_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Load BMW sales dataset from Excel.
+
+    All sheets are read (one per market in regional workbooks), in parallel
+    and with the fastest available engine, and concatenated with a
+    consistent schema; see ``excel.read_workbook`` for the arguments.
+    """
+    df = read_workbook(path, sheets=sheets, engine=engine, n_workers=n_workers)
+    return df
 
-def load_dataset(path: str) -> pd.DataFrame:
-    """Load BMW sales dataset from Excel."""
-    df = pd.read_excel(path)
+
+def _with_sales_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame with Year as int and Sales_Volume numeric (missing as 0).
+
+    An already normalized frame (see ``memory.normalize_sales_frame``) is
+    returned as is; otherwise only the two columns are replaced, in a
+    shallow copy, so the other columns are not copied.
+    """
+    sales = df["Sales_Volume"]
+    if (
+        pd.api.types.is_integer_dtype(df["Year"])
+        and pd.api.types.is_numeric_dtype(sales)
+        and not sales.isna().any()
+    ):
+        return df
+    df = df.copy(deep=False)
+    df["Year"] = df["Year"].astype(int)
+    df["Sales_Volume"] = pd.to_numeric(sales, errors="coerce").fillna(0)
     return df
 
 
+def _ranked_models(totals: pd.DataFrame) -> list:
+    """[{"Model", "Total_Sales"}] of one group's model totals, by sales descending."""
+    model_sales = (
+        totals.set_index("Model")["Sales_Volume"]
+        .sort_values(ascending=False)
+        .astype(int)
+    )
+    return (
+        model_sales.reset_index()
+        .rename(columns={"Sales_Volume": "Total_Sales"})
+        .to_dict(orient="records")
+    )
+
+
 def summarize_sales_by_region_year(df: pd.DataFrame, output_path: str):
     """
     Summarize total sales by Region, and by Region + Year.
@@ -49,18 +108,22 @@ def summarize_sales_by_region_year(df: pd.DataFrame, output_path: str):
     }
     """
     # Ensure correct types
-    df = df.copy()
-    df["Year"] = df["Year"].astype(int)
-    df["Sales_Volume"] = pd.to_numeric(df["Sales_Volume"], errors="coerce")
-    df["Sales_Volume"] = df["Sales_Volume"].fillna(0)
+    df = _with_sales_types(df)
+    engine = get_default_engine()
 
     # Summarize sales by year (overall)
-    sales_by_year = df.groupby("Year")["Sales_Volume"].sum().astype(int).to_dict()
+    sales_by_year = (
+        engine.group_totals(df, ["Year"])
+        .set_index("Year")["Sales_Volume"]
+        .astype(int)
+        .to_dict()
+    )
 
     # Summarize sales by region and year
-    sales_by_region_year_df = (
-        df.groupby(["Region", "Year"])["Sales_Volume"].sum().astype(int).reset_index()
-    )
+    sales_by_region_year_df = engine.group_totals(df, ["Region", "Year"])
+    sales_by_region_year_df["Sales_Volume"] = sales_by_region_year_df[
+        "Sales_Volume"
+    ].astype(int)
 
     # Convert to nested dict Region -> Year -> Sales
     sales_by_region_year = {}
@@ -77,17 +140,24 @@ def summarize_sales_by_region_year(df: pd.DataFrame, output_path: str):
     }
 
     # Save to JSON file
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
+    get_default_writer().write_json(summary, output_path)
 
     return summary
 
 
-def summarize_models_by_year(df: pd.DataFrame, output_path: str):
+def summarize_models_by_year(
+    df: pd.DataFrame,
+    output_path: str,
+    top_n: Optional[int] = None,
+    min_share: Optional[float] = None,
+):
     """
     For each Year, list all models sorted by total sales descending,
     combining sales from all regions.
 
+    With ``top_n`` and/or ``min_share`` the long tail of models is collapsed
+    into one "Other" entry per year (see ``bucketing.bucket_long_tail``).
+
     Output Structure:
     {
         "2020": [
@@ -99,46 +169,41 @@ def summarize_models_by_year(df: pd.DataFrame, output_path: str):
     }
     """
 
-    df = df.copy()
-
     # Ensure correct types
-    df["Year"] = df["Year"].astype(int)
-    df["Sales_Volume"] = pd.to_numeric(df["Sales_Volume"], errors="coerce").fillna(0)
+    df = _with_sales_types(df)
+
+    # Aggregate model sales per year
+    totals = get_default_engine().group_totals(df, ["Year", "Model"])
 
     summary = {}
 
     # Group by Year
-    for year, df_year in df.groupby("Year"):
-        year_str = str(year)
-
-        # Aggregate and sort models by total sales descending
-        model_sales = (
-            df_year.groupby("Model")["Sales_Volume"]
-            .sum()
-            .sort_values(ascending=False)
-            .astype(int)
-        )
+    for year, df_year in totals.groupby("Year"):
+        summary[str(year)] = _ranked_models(df_year)
 
-        # Convert to list of dicts
-        all_models = (
-            model_sales.reset_index()
-            .rename(columns={"Sales_Volume": "Total_Sales"})
-            .to_dict(orient="records")
-        )
-
-        summary[year_str] = all_models
+    summary = bucket_long_tail(summary, top_n=top_n, min_share=min_share)
 
     # Save JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
+    get_default_writer().write_json(summary, output_path)
 
     return summary
 
 
-def summarize_models_by_region_year(df: pd.DataFrame, output_path: str):
+def summarize_models_by_region_year(
+    df: pd.DataFrame,
+    output_path: str,
+    top_n: Optional[int] = None,
+    min_share: Optional[float] = None,
+    engine: Optional[QueryEngine] = None,
+):
     """
     For each Region and Year, list all models sorted by sales descending.
 
+    With ``top_n`` and/or ``min_share`` the long tail of models is collapsed
+    into one "Other" entry per region and year; the kept models are chosen
+    per region. ``engine`` overrides the default query engine (e.g. the
+    sharded engine of ``src.data_processing.parallel``).
+
     Output Structure:
     {
         "Europe": {
@@ -153,82 +218,59 @@ def summarize_models_by_region_year(df: pd.DataFrame, output_path: str):
     }
     """
 
-    df = df.copy()
-
     # Ensure correct types
-    df["Year"] = df["Year"].astype(int)
-    df["Sales_Volume"] = pd.to_numeric(df["Sales_Volume"], errors="coerce").fillna(0)
+    df = _with_sales_types(df)
+
+    # Aggregate model sales per region and year
+    engine = engine or get_default_engine()
+    totals = engine.group_totals(df, ["Region", "Year", "Model"])
 
     summary = {}
 
     # Group by Region first
-    for region, df_region in df.groupby("Region"):
+    for region, df_region in totals.groupby("Region"):
         summary[region] = {}
 
         # Then by Year within Region
         for year, df_region_year in df_region.groupby("Year"):
-            year_str = str(year)
-
-            # Aggregate and sort models by sales descending
-            model_sales = (
-                df_region_year.groupby("Model")["Sales_Volume"]
-                .sum()
-                .sort_values(ascending=False)
-                .astype(int)
-            )
+            summary[region][str(year)] = _ranked_models(df_region_year)
 
-            # Convert to list of dicts
-            all_models = (
-                model_sales.reset_index()
-                .rename(columns={"Sales_Volume": "Total_Sales"})
-                .to_dict(orient="records")
-            )
-
-            summary[region][year_str] = all_models
+        summary[region] = bucket_long_tail(
+            summary[region], top_n=top_n, min_share=min_share
+        )
 
     # Save JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
+    get_default_writer().write_json(summary, output_path)
 
     return summary
 
 
-def explore_key_drivers_of_sales(df: pd.DataFrame) -> pd.DataFrame:
+def explore_key_drivers_of_sales(
+    df: pd.DataFrame, encoded: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
     """
     Compute the Pearson correlation values between all features
     (after encoding categorical variables, including Year)
     and Sales_Volume. Year is treated as a categorical variable.
 
+    Args:
+        df: BMW sales dataset.
+        encoded: ``encode_features(df)``, if already computed (used by the
+            pandas engine).
+
     Returns:
         pd.DataFrame: A sorted dataframe of correlations vs Sales_Volume.
     """
 
-    df = df.copy()
-
-    # Ensure Sales_Volume is numeric
-    df["Sales_Volume"] = pd.to_numeric(df["Sales_Volume"], errors="coerce").fillna(0)
-
-    # --- Treat Year as categorical ---
-    df["Year"] = df["Year"].astype(
-        str
-    )  # convert to string so it becomes a categorical column
-
-    # Identify categorical columns
-    categorical_cols = df.select_dtypes(include=["object"]).columns.tolist()
-
-    # One-hot encode categorical variables (including Year)
-    df_encoded = pd.get_dummies(df, columns=categorical_cols, drop_first=True)
-
-    # Compute Pearson correlation matrix
-    corr_matrix = df_encoded.corr(method="pearson")
-
-    # Extract correlations with Sales_Volume
-    sales_corr = corr_matrix["Sales_Volume"].sort_values(ascending=False)
+    # Pearson correlation of every encoded feature (Year as categorical)
+    # with Sales_Volume, computed by the configured query engine
+    sales_corr = get_default_engine().sales_correlations(df, encoded)
+    sales_corr = sales_corr.sort_values(ascending=False)
 
     return sales_corr.to_frame(name="Correlation_with_Sales_Volume")
 
 
-def xgboost_key_drivers(df):
+def xgboost_key_drivers(df, encoded=None):
     """
     Compute feature importance scores for sales drivers using an XGBoost regressor.
 
@@ -241,6 +283,8 @@ def xgboost_key_drivers(df):
     ----------
     df : pd.DataFrame
         BMW sales dataset with Sales_Volume and related features.
+    encoded : pd.DataFrame, optional
+        ``encode_features(df)``, if already computed.
 
     Returns
     -------
@@ -249,19 +293,7 @@ def xgboost_key_drivers(df):
         descending order.
     """
 
-    df = df.copy()
-
-    # Ensure Sales_Volume is numeric
-    df["Sales_Volume"] = pd.to_numeric(df["Sales_Volume"], errors="coerce").fillna(0)
-
-    # Treat Year as categorical
-    df["Year"] = df["Year"].astype(str)
-
-    # Identify categorical columns
-    categorical_cols = df.select_dtypes(include=["object"]).columns.tolist()
-
-    # One-hot encode categorical variables
-    df_encoded = pd.get_dummies(df, columns=categorical_cols, drop_first=True)
+    df_encoded = encode_features(df) if encoded is None else encoded
 
     # Features and target
     X = df_encoded.drop(columns=["Sales_Volume"])
@@ -285,3 +317,138 @@ def xgboost_key_drivers(df):
     ).sort_values(by="importance", ascending=False)
 
     return importance_df
+
+
+def _fit_gain_importance(X, y, n_features, row_idx, seed):
+    """Fit one single-threaded XGBoost model on a subsample and return its gains."""
+    model = xgb.XGBRegressor(objective="reg:squarederror", random_state=seed, n_jobs=1)
+    model.fit(X[row_idx], y[row_idx])
+    gains = model.get_booster().get_score(importance_type="gain")
+
+    # Booster names numpy columns f0..fN; unused features contribute no gain
+    return np.array([gains.get(f"f{i}", 0.0) for i in range(n_features)])
+
+
+def _allocate_rows(sizes, total: int) -> np.ndarray:
+    """
+    Split ``total`` rows across strata in proportion to their sizes.
+
+    Largest-remainder allocation: every stratum gets the floor of its quota
+    and the rows left go to the largest fractional parts, so the counts sum
+    to exactly ``total``.
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    quotas = total * sizes / sizes.sum()
+    counts = np.floor(quotas).astype(int)
+    # Stable sort: ties go to the first strata
+    order = np.argsort(-(quotas - counts), kind="stable")
+    counts[order[: total - counts.sum()]] += 1
+    return counts
+
+
+def xgboost_key_drivers_bootstrap(
+    df: pd.DataFrame,
+    row_budget: int = 50000,
+    n_bootstraps: int = 16,
+    confidence: float = 0.95,
+    stratify_cols=("Region", "Year"),
+    n_jobs: int = -1,
+    random_state: int = 42,
+    encoded: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Estimate XGBoost gain importances with bootstrap confidence intervals.
+
+    Instead of a single fit on the full training split, ``n_bootstraps``
+    models are fitted in parallel, each on a stratified resample of at most
+    ``row_budget`` rows. Strata are the combinations of ``stratify_cols``,
+    sampled in proportion to their size, so every replicate keeps the
+    Region/Year mix of the full data. Fit time is bounded by the row budget
+    rather than by the dataset size.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        BMW sales dataset with Sales_Volume and related features.
+    row_budget : int
+        Maximum number of rows used by each bootstrap fit.
+    n_bootstraps : int
+        Number of bootstrap replicates.
+    confidence : float
+        Confidence level of the percentile intervals.
+    stratify_cols : tuple of str
+        Columns defining the sampling strata (missing columns are ignored).
+    n_jobs : int
+        Number of parallel fits (-1 uses all cores).
+    random_state : int
+        Seed for the resampling and the models.
+    encoded : pd.DataFrame, optional
+        ``encode_features(df)``, if already computed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Features indexed by name with columns ``importance`` (mean gain),
+        ``std``, ``ci_lower`` and ``ci_upper``, sorted by importance descending.
+    """
+    if row_budget <= 0 or n_bootstraps <= 0:
+        raise ValueError("row_budget and n_bootstraps must be positive.")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1.")
+
+    df_encoded = encode_features(df) if encoded is None else encoded
+    feature_names = [c for c in df_encoded.columns if c != "Sales_Volume"]
+    X = df_encoded[feature_names].to_numpy(dtype=np.float32)
+    y = df_encoded["Sales_Volume"].to_numpy(dtype=np.float32)
+    del df_encoded
+
+    # Group row positions by stratum
+    strata_cols = [c for c in stratify_cols if c in df.columns]
+    if strata_cols:
+        strata = (
+            df.groupby(strata_cols, sort=False, dropna=False, observed=True)
+            .ngroup()
+            .to_numpy()
+        )
+    else:
+        strata = np.zeros(len(df), dtype=int)
+    strata_rows = [np.flatnonzero(strata == code) for code in np.unique(strata)]
+
+    # Proportional allocation of the row budget across strata
+    n_rows = min(row_budget, len(df))
+    per_stratum = _allocate_rows([len(rows) for rows in strata_rows], n_rows)
+
+    rng = np.random.default_rng(random_state)
+    samples = [
+        np.concatenate(
+            [
+                rng.choice(rows, size=size, replace=True)
+                for rows, size in zip(strata_rows, per_stratum)
+                if size
+            ]
+        )
+        for _ in range(n_bootstraps)
+    ]
+
+    # XGBoost releases the GIL while training, so threads share X without copies
+    gains = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_fit_gain_importance)(X, y, X.shape[1], idx, random_state + i)
+        for i, idx in enumerate(samples)
+    )
+    gains = np.vstack(gains)
+
+    alpha = (1 - confidence) / 2
+    importance_df = pd.DataFrame(
+        {
+            "importance": gains.mean(axis=0),
+            "std": gains.std(axis=0, ddof=1) if n_bootstraps > 1 else 0.0,
+            "ci_lower": np.quantile(gains, alpha, axis=0),
+            "ci_upper": np.quantile(gains, 1 - alpha, axis=0),
+        },
+        index=feature_names,
+    )
+
+    # Drop features that never produced a split, matching xgboost_key_drivers
+    importance_df = importance_df[importance_df["importance"] > 0]
+
+    return importance_df.sort_values(by="importance", ascending=False)
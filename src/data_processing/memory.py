@@ -0,0 +1,161 @@
+"""
+Memory-aware pipeline helpers.
+
+The summaries, the correlation analysis and the XGBoost fit used to hold
+the raw frame plus one full copy per summary function and one one-hot
+encoded expansion per driver analysis, so the peak memory was several times
+the dataset size. In the memory-aware mode (``MEMORY_AWARE`` in
+``src.config``) the pipeline instead:
+
+- Normalizes the dataset once (``normalize_sales_frame``): Year as int,
+  Sales_Volume numeric, text columns as categoricals. The summary functions
+  use this frame as is; it is shared read-only and never copied.
+- Encodes the features once and shares the encoded frame between the
+  correlation analysis and the XGBoost fit, then frees both frames as soon
+  as the fit is done.
+- Checks the projected peak footprint against ``MEMORY_LIMIT_MB`` before
+  anything is built (``check_memory_limit``), failing early with a clear
+  message instead of swapping or being killed halfway through the run.
+
+Peak memory per stage is recorded by ``StageTimer(track_memory=True)``.
+"""
+
+from typing import Dict, Optional
+
+import pandas as pd
+
+_MB = 1e6
+
+
+class MemoryLimitExceeded(RuntimeError):
+    """Raised when the projected footprint of a run exceeds the memory limit."""
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memory used by a frame, including the Python objects of text columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def normalize_sales_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalized frame shared by the summaries and the key-driver analyses.
+
+    Year becomes int, Sales_Volume numeric (missing as 0), and text columns
+    categoricals, which store each distinct value once. The summary
+    functions use a frame normalized this way without copying it.
+
+    Args:
+        df: Raw BMW sales dataset.
+
+    Returns:
+        pd.DataFrame: The normalized frame (a new frame; ``df`` is unchanged).
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if name == "Year":
+            series = series.astype(int)
+        elif name == "Sales_Volume":
+            series = pd.to_numeric(series, errors="coerce").fillna(0)
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(
+            series
+        ):
+            series = series.astype("category")
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def encoded_width(df: pd.DataFrame) -> Dict[str, int]:
+    """Number of numeric and one-hot columns of ``encode_features(df)``."""
+    numeric = dummies = 0
+    for name in df.columns:
+        series = df[name]
+        if name == "Sales_Volume" or (
+            name != "Year" and pd.api.types.is_numeric_dtype(series)
+        ):
+            numeric += 1
+        else:
+            dummies += max(series.nunique(dropna=True) - 1, 0)
+    return {"numeric": numeric, "dummies": dummies}
+
+
+def projected_footprint(df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Projected memory of the memory-aware pipeline for a raw dataset, in bytes.
+
+    Components:
+
+    - ``dataset``: the raw frame as loaded.
+    - ``normalized``: the shared normalized frame.
+    - ``encoded``: the shared one-hot encoded frame (1 byte per dummy,
+      8 bytes per numeric column and row).
+    - ``correlation``: the float64 matrix built by the Pearson correlation.
+    - ``xgboost``: the float32 feature matrix of the XGBoost fit.
+    - ``peak``: the largest total alive at once (raw and normalized frames
+      while normalizing, or normalized and encoded frames plus the larger
+      of the two matrices).
+
+    Args:
+        df: Raw BMW sales dataset.
+
+    Returns:
+        dict: Bytes per component.
+    """
+    n_rows = len(df)
+    width = encoded_width(df)
+    n_features = width["numeric"] + width["dummies"]
+
+    dataset = frame_bytes(df)
+    normalized = int(df.index.memory_usage())
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_numeric_dtype(series) or name in ("Year", "Sales_Volume"):
+            normalized += n_rows * 8
+        else:
+            # Codes plus the distinct values
+            distinct = series.drop_duplicates()
+            normalized += n_rows * 2 + int(distinct.memory_usage(deep=True))
+    encoded = n_rows * (width["dummies"] + 8 * width["numeric"])
+    correlation = n_rows * n_features * 8
+    xgboost = n_rows * n_features * 4
+
+    return {
+        "dataset": dataset,
+        "normalized": normalized,
+        "encoded": encoded,
+        "correlation": correlation,
+        "xgboost": xgboost,
+        "peak": max(
+            dataset + normalized,
+            normalized + encoded + max(correlation, xgboost),
+        ),
+    }
+
+
+def check_memory_limit(df: pd.DataFrame, limit_mb: Optional[float]) -> Dict[str, int]:
+    """
+    Fail early if the projected footprint of a run exceeds ``limit_mb``.
+
+    Args:
+        df: Raw BMW sales dataset, just loaded.
+        limit_mb: Memory limit in MB, or None for no limit.
+
+    Returns:
+        dict: The projected footprint (see ``projected_footprint``).
+
+    Raises:
+        MemoryLimitExceeded: If the projected peak exceeds the limit.
+    """
+    footprint = projected_footprint(df)
+    if limit_mb is not None and footprint["peak"] > limit_mb * _MB:
+        parts = ", ".join(
+            f"{name} {size / _MB:.0f} MB"
+            for name, size in footprint.items()
+            if name != "peak"
+        )
+        raise MemoryLimitExceeded(
+            f"Projected peak memory {footprint['peak'] / _MB:.0f} MB exceeds "
+            f"MEMORY_LIMIT_MB={limit_mb:g} ({len(df)} rows; {parts}). "
+            "Raise the limit or run on a sample of the dataset."
+        )
+    return footprint
@@ -0,0 +1,134 @@
+"""
+Multiprocess aggregation of model sales by Region, Year and Model.
+
+``loader.summarize_models_by_region_year`` runs a single-threaded pandas
+groupby. For very large histories this module shards the grouping itself
+across a process pool instead:
+
+- The rows are split into contiguous ranges, one per worker. Where the
+  ``fork`` start method is available the workers inherit the frame from the
+  parent (copy-on-write), so no rows are pickled; elsewhere each worker
+  receives its slice of the key and Sales_Volume columns.
+- Each worker runs the pandas groupby (hashing the text keys and summing
+  Sales_Volume) on its rows and returns the small per-group partial sums.
+- The partial sums are added up per group and formatted by the loader, so
+  the returned summary dict is identical to the serial one.
+
+Only the groupby of the shards runs in parallel; the parent does no work
+per row beyond the dtype check of ``loader._with_sales_types``. Compare the
+two paths on your data with ``benchmarks/parallel_aggregation.py`` before
+enabling ``PARALLEL_AGGREGATION``.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing import loader
+from src.data_processing.engines import SALES, PandasEngine
+
+# Below this many rows per worker, process start-up costs more than it saves
+MIN_ROWS_PER_WORKER = 250000
+
+# Frame inherited by forked workers (set only while a pool is running)
+_SHARED_FRAME: Optional[pd.DataFrame] = None
+
+
+def _shard_totals(
+    keys: List[str], start: int, stop: int, rows: Optional[pd.DataFrame] = None
+) -> pd.Series:
+    """
+    Worker entry point: Sales_Volume summed per group of ``keys``.
+
+    Args:
+        keys: Group key columns.
+        start, stop: Row range of the shared frame (forked workers).
+        rows: The rows themselves (spawned workers), instead of the range.
+    """
+    if rows is None:
+        rows = _SHARED_FRAME.iloc[start:stop]
+    return rows.groupby(keys, observed=True, sort=False)[SALES].sum()
+
+
+class ShardedPandasEngine(PandasEngine):
+    """
+    Pandas engine whose group totals are computed on row shards in parallel.
+
+    Args:
+        n_workers: Worker processes (default: all cores), capped so each
+            worker gets at least ``min_rows_per_worker`` rows; with a single
+            worker the rows are grouped in-process.
+        min_rows_per_worker: Smallest shard worth a process.
+    """
+
+    name = "pandas-sharded"
+
+    def __init__(
+        self,
+        n_workers: Optional[int] = None,
+        min_rows_per_worker: int = MIN_ROWS_PER_WORKER,
+    ):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.min_rows_per_worker = max(min_rows_per_worker, 1)
+
+    def _group_totals(self, df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        global _SHARED_FRAME
+        n_workers = max(1, min(self.n_workers, len(df) // self.min_rows_per_worker))
+        if n_workers == 1:
+            return super()._group_totals(df, keys)
+
+        bounds = np.linspace(0, len(df), n_workers + 1, dtype=int)
+        ranges = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        forked = "fork" in multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if forked else None)
+        columns = df[keys + [SALES]]
+        _SHARED_FRAME = columns if forked else None
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+                futures = [
+                    pool.submit(
+                        _shard_totals,
+                        keys,
+                        start,
+                        stop,
+                        None if forked else columns.iloc[start:stop],
+                    )
+                    for start, stop in ranges
+                ]
+                partials = [future.result() for future in futures]
+        finally:
+            _SHARED_FRAME = None
+
+        # A group split across shards is summed once more
+        totals = pd.concat(partials).groupby(level=keys, observed=True).sum()
+        return totals.reset_index()
+
+
+def summarize_models_by_region_year_parallel(
+    df: pd.DataFrame,
+    output_path: str,
+    n_workers: Optional[int] = None,
+    min_rows_per_worker: int = MIN_ROWS_PER_WORKER,
+    top_n: Optional[int] = None,
+    min_share: Optional[float] = None,
+):
+    """
+    Parallel equivalent of ``loader.summarize_models_by_region_year``.
+
+    Rows are sharded by range across ``n_workers`` processes (default: all
+    cores, capped so each worker gets at least ``min_rows_per_worker`` rows),
+    each grouping its own rows. Small inputs are grouped in-process. The
+    returned dict and the JSON written to output_path are identical to the
+    serial summary, including the optional top-N/"Other" bucketing.
+    """
+    return loader.summarize_models_by_region_year(
+        df,
+        output_path,
+        top_n=top_n,
+        min_share=min_share,
+        engine=ShardedPandasEngine(n_workers, min_rows_per_worker),
+    )
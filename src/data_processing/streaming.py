@@ -0,0 +1,322 @@
+"""
+Streaming (one-pass) correlation statistics for BMW sales data.
+
+The in-memory key-driver analysis one-hot encodes the full dataset before
+calling ``DataFrame.corr``. This module computes the same Pearson correlations
+against Sales_Volume from row chunks, so it works on data that never fits in RAM:
+
+- ``CorrelationAccumulator`` keeps the sufficient statistics per encoded
+  feature (counts, means, centered sums of squares and cross-products) and
+  merges partial results with Chan's parallel update, so chunks or worker
+  processes can be reduced in any order.
+- ``iter_dataset_chunks`` reads CSV files or the sheets of Excel workbooks
+  chunk by chunk.
+- ``explore_key_drivers_of_sales_streaming`` ties both together and returns
+  the same frame as ``loader.explore_key_drivers_of_sales``.
+"""
+
+import os
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing.excel import Sheets, select_sheets
+
+NUMERIC = "numeric"
+DUMMY = "dummy"
+
+
+class CorrelationAccumulator:
+    """
+    Accumulate Pearson correlation statistics between encoded features and a target.
+
+    Categorical columns (and Year, treated as categorical) are one-hot encoded
+    on the fly; categories first seen in later chunks are added as new features.
+    Numeric columns use pairwise-complete observations like ``DataFrame.corr``,
+    so every feature keeps its own count, target mean and target sum of squares.
+    """
+
+    def __init__(self, target: str = "Sales_Volume", year_as_category: bool = True):
+        self.target = target
+        self.year_as_category = year_as_category
+
+        self.n_rows = 0
+        self.features = []  # encoded feature names, in first-seen order
+        self.kinds = {}  # feature name -> NUMERIC or DUMMY
+        self.categories = {}  # categorical column -> set of seen values
+
+        # Per-feature sufficient statistics (centered, for numerical stability)
+        self.n = np.zeros(0)
+        self.mean_x = np.zeros(0)
+        self.mean_y = np.zeros(0)
+        self.m2_x = np.zeros(0)
+        self.m2_y = np.zeros(0)
+        self.c_xy = np.zeros(0)
+
+        # Target statistics over all rows (used to fill absent dummies)
+        self.target_mean = 0.0
+        self.target_m2 = 0.0
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    def update(self, chunk: pd.DataFrame) -> "CorrelationAccumulator":
+        """Ingest one chunk of raw rows and merge its statistics."""
+        if chunk.empty:
+            return self
+        if self.target not in chunk.columns:
+            raise ValueError(f"Chunk is missing target column '{self.target}'.")
+
+        return self.merge(self._from_chunk(chunk))
+
+    def _from_chunk(self, chunk: pd.DataFrame) -> "CorrelationAccumulator":
+        """Compute the statistics of a single chunk as a new accumulator."""
+        y = pd.to_numeric(chunk[self.target], errors="coerce").fillna(0)
+        y = y.to_numpy(dtype=float)
+
+        names, kinds, columns = [], [], []
+        part = CorrelationAccumulator(self.target, self.year_as_category)
+
+        for col in chunk.columns:
+            series = chunk[col]
+            if col == self.target:
+                values = y
+            elif (col == "Year" and self.year_as_category) or not (
+                pd.api.types.is_numeric_dtype(series)
+                or pd.api.types.is_bool_dtype(series)
+            ):
+                labels = series.dropna().astype(str)
+                seen = part.categories.setdefault(col, set())
+                for value in pd.unique(labels):
+                    seen.add(value)
+                    names.append(f"{col}_{value}")
+                    kinds.append(DUMMY)
+                    columns.append((series.astype(str) == value).to_numpy(dtype=float))
+                continue
+            else:
+                values = series.to_numpy(dtype=float)
+            names.append(col)
+            kinds.append(NUMERIC)
+            columns.append(values)
+
+        X = np.column_stack(columns)
+        mask = ~np.isnan(X)
+
+        n = mask.sum(axis=0).astype(float)
+        safe_n = np.where(n > 0, n, 1)
+        Y = np.where(mask, y[:, None], 0.0)
+        X0 = np.where(mask, X, 0.0)
+        mean_y = Y.sum(axis=0) / safe_n
+        mean_x = X0.sum(axis=0) / safe_n
+        dx = np.where(mask, X - mean_x, 0.0)
+        dy = np.where(mask, y[:, None] - mean_y, 0.0)
+
+        part.n_rows = len(chunk)
+        part.features = names
+        part.kinds = dict(zip(names, kinds))
+        part.n = n
+        part.mean_x = mean_x
+        part.mean_y = mean_y
+        part.m2_x = (dx * dx).sum(axis=0)
+        part.m2_y = (dy * dy).sum(axis=0)
+        part.c_xy = (dx * dy).sum(axis=0)
+        part.target_mean = float(y.mean())
+        part.target_m2 = float(((y - y.mean()) ** 2).sum())
+        return part
+
+    # ------------------------------------------------------------------
+    # Merging
+    # ------------------------------------------------------------------
+    def merge(self, other: "CorrelationAccumulator") -> "CorrelationAccumulator":
+        """
+        Merge another accumulator into this one (Chan et al. parallel update).
+
+        Features unknown to one side are aligned first: a dummy absent from a
+        partial result was zero on all of its rows, a numeric column absent
+        from it had no observations.
+        """
+        if other.n_rows == 0:
+            return self
+
+        for name in other.features:
+            if name not in self.kinds:
+                self._add_feature(name, other.kinds[name])
+        for col, values in other.categories.items():
+            self.categories.setdefault(col, set()).update(values)
+
+        a = self._stats()
+        b = other._stats_for(self.features, self.kinds)
+
+        n = a["n"] + b["n"]
+        safe_n = np.where(n > 0, n, 1)
+        dx = b["mean_x"] - a["mean_x"]
+        dy = b["mean_y"] - a["mean_y"]
+        weight = a["n"] * b["n"] / safe_n
+
+        self.mean_x = a["mean_x"] + dx * b["n"] / safe_n
+        self.mean_y = a["mean_y"] + dy * b["n"] / safe_n
+        self.m2_x = a["m2_x"] + b["m2_x"] + dx * dx * weight
+        self.m2_y = a["m2_y"] + b["m2_y"] + dy * dy * weight
+        self.c_xy = a["c_xy"] + b["c_xy"] + dx * dy * weight
+        self.n = n
+
+        total = self.n_rows + other.n_rows
+        delta = other.target_mean - self.target_mean
+        self.target_m2 += (
+            other.target_m2 + delta * delta * self.n_rows * other.n_rows / total
+        )
+        self.target_mean += delta * other.n_rows / total
+        self.n_rows = total
+        return self
+
+    def _add_feature(self, name: str, kind: str):
+        """Register a new feature, back-filling statistics for rows already seen."""
+        self.features.append(name)
+        self.kinds[name] = kind
+        if kind == DUMMY:
+            # All previous rows were zero for this category
+            fill = (self.n_rows, 0.0, self.target_mean, 0.0, self.target_m2, 0.0)
+        else:
+            fill = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        for attr, value in zip(("n", "mean_x", "mean_y", "m2_x", "m2_y", "c_xy"), fill):
+            setattr(self, attr, np.append(getattr(self, attr), value))
+
+    def _stats(self) -> dict:
+        return {
+            "n": self.n,
+            "mean_x": self.mean_x,
+            "mean_y": self.mean_y,
+            "m2_x": self.m2_x,
+            "m2_y": self.m2_y,
+            "c_xy": self.c_xy,
+        }
+
+    def _stats_for(self, features: list, kinds: dict) -> dict:
+        """Return this accumulator's statistics aligned to another feature list."""
+        index = {name: i for i, name in enumerate(self.features)}
+        stats = {key: np.zeros(len(features)) for key in self._stats()}
+
+        for j, name in enumerate(features):
+            i = index.get(name)
+            if i is not None:
+                for key, values in self._stats().items():
+                    stats[key][j] = values[i]
+            elif kinds[name] == DUMMY:
+                stats["n"][j] = self.n_rows
+                stats["mean_y"][j] = self.target_mean
+                stats["m2_y"][j] = self.target_m2
+        return stats
+
+    # ------------------------------------------------------------------
+    # Raw sufficient statistics
+    # ------------------------------------------------------------------
+    @property
+    def counts(self) -> pd.Series:
+        """Number of non-missing observations per feature."""
+        return pd.Series(self.n, index=self.features)
+
+    @property
+    def sums(self) -> pd.Series:
+        """Sum of each feature over its observations."""
+        return pd.Series(self.n * self.mean_x, index=self.features)
+
+    @property
+    def sums_of_squares(self) -> pd.Series:
+        """Sum of squares of each feature over its observations."""
+        return pd.Series(self.m2_x + self.n * self.mean_x**2, index=self.features)
+
+    @property
+    def cross_products(self) -> pd.Series:
+        """Sum of feature × target products over each feature's observations."""
+        return pd.Series(
+            self.c_xy + self.n * self.mean_x * self.mean_y, index=self.features
+        )
+
+    # ------------------------------------------------------------------
+    # Result
+    # ------------------------------------------------------------------
+    def correlation(self, drop_first: bool = True) -> pd.Series:
+        """
+        Return the Pearson correlation of every encoded feature with the target,
+        sorted descending.
+
+        With ``drop_first`` the alphabetically first category of each categorical
+        column is left out, matching ``pd.get_dummies(..., drop_first=True)``.
+        """
+        denom = np.sqrt(self.m2_x * self.m2_y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.where(
+                denom > 0, self.c_xy / np.where(denom > 0, denom, 1), np.nan
+            )
+        # Fewer than two paired observations has no defined correlation
+        corr = np.where(self.n >= 2, corr, np.nan)
+
+        result = pd.Series(corr, index=self.features, name=self.target)
+        if drop_first:
+            dropped = [
+                f"{col}_{min(values)}" for col, values in self.categories.items()
+            ]
+            result = result.drop(index=dropped, errors="ignore")
+
+        return result.sort_values(ascending=False)
+
+
+def iter_dataset_chunks(
+    path: str, chunksize: int = 100000, sheets: Sheets = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the dataset in chunks of at most ``chunksize`` rows without loading
+    the whole file. Supports CSV and Excel (.xlsx, read in openpyxl read-only mode).
+
+    Like ``loader.load_dataset``, every sheet of a workbook is read by default
+    (see ``excel.select_sheets`` for ``sheets``); a chunk holds the rows of a
+    single sheet, with its column names stripped, and blank sheets are skipped.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+        return
+    if ext not in (".xlsx", ".xlsm"):
+        raise ValueError(f"Unsupported file type for chunked reading: '{ext}'.")
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in select_sheets(path, workbook.sheetnames, sheets):
+            rows = workbook[sheet].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            header = [str(c).strip() for c in header]
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == chunksize:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def explore_key_drivers_of_sales_streaming(
+    chunks: Iterable[pd.DataFrame],
+    accumulator: Optional[CorrelationAccumulator] = None,
+) -> pd.DataFrame:
+    """
+    Compute correlations vs Sales_Volume from an iterable of row chunks.
+
+    Returns the same structure as ``explore_key_drivers_of_sales``: a sorted
+    dataframe with a single "Correlation_with_Sales_Volume" column.
+    """
+    accumulator = accumulator or CorrelationAccumulator()
+    for chunk in chunks:
+        accumulator.update(chunk)
+
+    if accumulator.n_rows == 0:
+        raise ValueError("No rows were provided to compute correlations.")
+
+    return accumulator.correlation().to_frame(name="Correlation_with_Sales_Volume")
@@ -3,37 +3,178 @@ Module for generating BMW sales analysis reports by combining
 plot creation and large language model (LLM) based markdown report generation.
 """
 
+import asyncio
 import json
 import os
+import re
+import time
+from concurrent.futures import Executor
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
 import pandas as pd
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types
+from src.data_processing.bucketing import OTHER_LABEL, has_other_bucket
+from src.data_processing.digest import (
+    digest_models_by_region,
+    digest_models_by_year,
+    digest_sales_summary,
+    digest_to_text,
+)
+from src.llm.backends import GeminiBackend, LLMBackend
+from src.llm.hedging import HedgePolicy
+from src.llm.routing import ModelRouter, Route
+from src.llm.validation import (
+    apply_repair,
+    embedded_figures,
+    fix_embeds,
+    repair_prompt,
+    validate_markdown,
+)
+from src.llm.serializers import PayloadSerializer
+from src.llm.structured import (
+    STRUCTURED_FINAL_INSTRUCTION,
+    STRUCTURED_RULES,
+    SectionPart,
+    default_parts,
+    parse_answer,
+    render_section,
+    structured_config,
+    update_answer,
+)
 from src.llm.tools import PlotTool
+from src.llm.usage import UsageTracker
+from src.llm.utils import estimate_tokens
 
 load_dotenv()  # loads GOOGLE_API_KEY
 
+# Image embeds of plots, e.g. ![alt](figures/sales_by_year.png)
+_EMBED_PATTERN = re.compile(r"!\[[^\]]*\]\((figures/[^)\s]+)\)")
+
+# Column names for the nesting levels of the sales summary payload
+SALES_SUMMARY_LEVELS = {
+    "sales_by_year": ["Year"],
+    "sales_by_region_year": ["Region", "Year"],
+}
+
+
+class LLMRequest(NamedTuple):
+    """
+    An LLM call of a report section (see ``LLMReportAgent._call_llm``), with
+    what its answer must contain: the figure filenames it must embed (saved
+    in ``figures_dir``) and its required headings. Requests with ``parts``
+    are answered as structured JSON in structured mode (see
+    src.llm.structured) and rendered locally.
+    """
+
+    section: str
+    prompt: str
+    compact: Optional[Callable[[], str]] = None
+    figures: Tuple[str, ...] = ()
+    headings: Tuple[str, ...] = ()
+    figures_dir: Optional[str] = None
+    parts: Tuple[SectionPart, ...] = ()
+
+
+def _with_figure_references(digest: str, markdown: str) -> str:
+    """Append the figures embedded in a section report to its digest."""
+    figures = _EMBED_PATTERN.findall(markdown)
+    if figures:
+        digest += "\nFigures: " + ", ".join(dict.fromkeys(figures))
+    return digest
+
 
 class LLMReportAgent:
     """
     Agent that generates detailed markdown reports analyzing BMW sales data.
 
     Combines automated plotting utilities with LLM-powered narrative generation
-    for sales trends, model performance, regional analysis, and correlation insights.
+    for sales trends, model performance, regional analysis, correlation insights
+    and XGBoost feature importances.
+
+    Every report method has an ``*_async`` variant for use under asyncio: it
+    renders the plots in ``plot_executor`` (the event loop's default thread
+    pool if None) and awaits the backend's async API, so one section's plots
+    are drawn while another section waits for the LLM. With a ``hedge``
+    policy (see src.llm.hedging) the async calls are hedged and validated.
+
+    With ``validate=True`` every answer is checked locally for its required
+    headings and figure embeds (see src.llm.validation); broken embeds are
+    fixed locally and only missing parts are requested from the LLM again.
+
+    With ``structured=True`` the section calls request a compact JSON answer
+    (findings and referenced figures per heading) through the SDK's
+    structured output, and the section markdown is rendered locally; the
+    answers are kept in ``structured_answers`` by section.
+
+    With a ``router`` (see src.llm.routing) every call's model is chosen by
+    its section instead of ``model_name`` (e.g. a fast model for the section
+    drafts, a stronger one for the final summary), and the latency and
+    tokens of each routing choice are recorded.
     """
 
-    def __init__(self, model_name="gemini-2.5-flash", max_input_tokens=25000):
-        self.client = genai.Client()
+    def __init__(
+        self,
+        model_name="gemini-2.5-flash",
+        max_input_tokens=25000,
+        payload_format="matrix",
+        backend: Optional[LLMBackend] = None,
+        usage: Optional[UsageTracker] = None,
+        plot_executor: Optional[Executor] = None,
+        hedge: Optional[HedgePolicy] = None,
+        validate: bool = False,
+        structured: bool = False,
+        router: Optional[ModelRouter] = None,
+    ):
+        # Text generation backend (see src.llm.backends); Gemini API by default
+        self.backend = backend or GeminiBackend()
+        # Token usage, cost and budget of all calls (see src.llm.usage)
+        self.usage = usage or UsageTracker()
         self.model_name = model_name
         self.max_input_tokens = max_input_tokens
         self.plot_tool = PlotTool()
+        # How summary data is embedded in prompts (see src.llm.serializers)
+        self.serializer = PayloadSerializer(payload_format)
+        # Where the async methods render plots (None: the loop's default executor)
+        self.plot_executor = plot_executor
+        # Hedged async calls: duplicates on slow calls, retries on bad answers
+        self.hedge = hedge
+        # Validate each answer locally and repair only its faulty parts
+        self.validate = validate
+        self.validation_log = []
+        # JSON section answers rendered to markdown locally
+        self.structured = structured
+        self.structured_answers = {}
+        # Per-section model tiers with latency-SLO fallback (None: model_name)
+        self.router = router
 
-    def analyze_sales_trend(self, summary_dict: dict, figures_dir: str) -> str:
+    def analyze_sales_trend(
+        self, summary_dict: dict, figures_dir: str, digest: Optional[dict] = None
+    ) -> str:
         """
         Generate plots first, then ask the LLM to assemble
         a complete markdown report with correct local plot filenames.
+
+        If a precomputed digest (see src.data_processing.digest) is given,
+        the prompt carries its facts instead of the full summary data.
         """
+        plot_filenames = self._sales_trend_plots(summary_dict, figures_dir)
+        return self._complete(
+            self._sales_trend_request(summary_dict, plot_filenames, digest, figures_dir)
+        )
 
+    async def analyze_sales_trend_async(
+        self, summary_dict: dict, figures_dir: str, digest: Optional[dict] = None
+    ) -> str:
+        """Async variant of ``analyze_sales_trend``."""
+        plot_filenames = await self._offload(
+            self._sales_trend_plots, summary_dict, figures_dir
+        )
+        return await self._complete_async(
+            self._sales_trend_request(summary_dict, plot_filenames, digest, figures_dir)
+        )
+
+    def _sales_trend_plots(self, summary_dict: dict, figures_dir: str) -> dict:
+        """Render the sales trend plots; return their filenames by plot type."""
         # ALWAYS generate the two known plots
         plot_paths = {}
         fixed_plot_types = ["sales_by_year", "sales_by_region_year"]
@@ -48,47 +189,80 @@ class LLMReportAgent:
             plot_paths[plot_type] = full_path
 
         # Convert absolute paths → just filenames
-        plot_filenames = {
-            key: os.path.basename(path) for key, path in plot_paths.items()
-        }
+        return {key: os.path.basename(path) for key, path in plot_paths.items()}
+
+    def _sales_trend_request(
+        self,
+        summary_dict: dict,
+        plot_filenames: dict,
+        digest: Optional[dict],
+        figures_dir: str,
+    ) -> LLMRequest:
+        """Prompt asking the LLM for the sales trend report."""
 
         # Ask LLM to produce structured markdown report
-        prompt = (
-            "You are a senior data analyst. "
-            "Create a clean and structured Markdown report based on BMW sales trends.\n\n"
-            "### Important Instructions\n"
-            "- ALWAYS place each plot BEFORE its related analysis.\n"
-            "- Embed images using markdown: ![alt](figures/filename.png)\n"
-            "- Use clear, logical sections.\n"
-            "- Do not invent new plots.\n\n"
-            "### Sections to Produce\n"
-            "1. Overall Sales Trend Analysis\n"
-            "   - Identify and describe key trends in total sales volume over the years.\n"
-            "   - Mention any notable peaks, dips, or steady growth patterns.\n\n"
-            "2. Regional Sales Trend Analysis\n"
-            "   - Identify and describe sales performance for each region individually.\n"
-            "   - Compare regional trends where relevant.\n\n"
-            "### Plot Filenames\n"
-            f"{json.dumps(plot_filenames, indent=2)}\n\n"
-            "### Sales Summary Data\n"
-            f"```json\n{json.dumps(summary_dict, indent=2)}\n```\n\n"
-            "Now produce ONLY the final markdown report with these sections.\n"
-        )
+        def build_prompt(data_block: str) -> str:
+            return (
+                "You are a senior data analyst. "
+                "Create a clean and structured Markdown report based on BMW sales trends.\n\n"
+                "### Important Instructions\n"
+                + self._layout_rules(
+                    "- ALWAYS place each plot BEFORE its related analysis.\n"
+                    "- Embed images using markdown: ![alt](figures/filename.png)\n"
+                )
+                + "- Use clear, logical sections.\n"
+                "- Do not invent new plots.\n\n"
+                "### Sections to Produce\n"
+                "1. Overall Sales Trend Analysis\n"
+                "   - Identify and describe key trends in total sales volume over the years.\n"
+                "   - Mention any notable peaks, dips, or steady growth patterns.\n\n"
+                "2. Regional Sales Trend Analysis\n"
+                "   - Identify and describe sales performance for each region individually.\n"
+                "   - Compare regional trends where relevant.\n\n"
+                "### Plot Filenames\n"
+                f"{json.dumps(plot_filenames, indent=2)}\n\n"
+                f"{data_block}"
+                + self._final_instruction(
+                    "Now produce ONLY the final markdown report with these sections.\n"
+                )
+            )
 
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
+        prompt = build_prompt(
+            self._data_block(
+                "Sales Summary Data", summary_dict, SALES_SUMMARY_LEVELS, digest
+            )
         )
 
-        markdown = self._extract_text(response)
+        headings = (
+            "1. Overall Sales Trend Analysis",
+            "2. Regional Sales Trend Analysis",
+        )
+        figures = tuple(plot_filenames.values())
 
-        return markdown.strip()
+        # Over the token budget: send the precomputed facts instead
+        return LLMRequest(
+            "sales_trend",
+            prompt,
+            compact=lambda: build_prompt(
+                self._data_block(
+                    "Sales Summary Data",
+                    summary_dict,
+                    SALES_SUMMARY_LEVELS,
+                    digest or digest_sales_summary(summary_dict),
+                )
+            ),
+            figures=figures,
+            headings=headings,
+            figures_dir=figures_dir,
+            parts=default_parts(headings, figures),
+        )
 
     def analyze_models_over_years_trend(
         self,
         year_model_summary: dict,
         figures_dir: str,
         title_prefix: str = "All Regions",
+        digest: Optional[dict] = None,
     ) -> str:
         """
         Generate the models-over-years plot and ask the LLM
@@ -108,11 +282,41 @@ class LLMReportAgent:
                 }
             figures_dir: directory to save generated plot
             title_prefix: title prefix for the plot and filename
+            digest: optional precomputed facts used in place of the summary data
 
         Returns:
             Markdown report string
         """
+        plot_filename = self._models_over_years_plot(
+            year_model_summary, figures_dir, title_prefix
+        )
+        return self._complete(
+            self._models_over_years_request(
+                year_model_summary, plot_filename, digest, figures_dir
+            )
+        )
+
+    async def analyze_models_over_years_trend_async(
+        self,
+        year_model_summary: dict,
+        figures_dir: str,
+        title_prefix: str = "All Regions",
+        digest: Optional[dict] = None,
+    ) -> str:
+        """Async variant of ``analyze_models_over_years_trend``."""
+        plot_filename = await self._offload(
+            self._models_over_years_plot, year_model_summary, figures_dir, title_prefix
+        )
+        return await self._complete_async(
+            self._models_over_years_request(
+                year_model_summary, plot_filename, digest, figures_dir
+            )
+        )
 
+    def _models_over_years_plot(
+        self, year_model_summary: dict, figures_dir: str, title_prefix: str
+    ) -> str:
+        """Render the models-over-years plot; return its filename."""
         if not year_model_summary:
             raise ValueError("Year-model summary data is empty or None.")
 
@@ -124,54 +328,110 @@ class LLMReportAgent:
         if not plot_path:
             raise RuntimeError("Models-over-years plot was not generated.")
 
-        plot_filename = os.path.basename(plot_path)
+        return os.path.basename(plot_path)
+
+    def _models_over_years_request(
+        self,
+        year_model_summary: dict,
+        plot_filename: str,
+        digest: Optional[dict],
+        figures_dir: str,
+    ) -> LLMRequest:
+        """Prompt asking the LLM for the model performance report."""
 
         # 2) Prepare LLM prompt
-        prompt = (
-            "You are a senior automotive market analyst. "
-            "Create a clear and structured Markdown report analyzing BMW model sales performance over the years.\n\n"
-            "### Important Instructions\n"
-            "- ALWAYS place the plot BEFORE its related analysis.\n"
-            "- Embed images using markdown: ![alt](figures/filename.png)\n"
-            "- Use clear, logical sections.\n"
-            "- Do not invent new plots or data.\n\n"
-            "### Sections to Produce\n"
-            "1. Top-Performing Models Over the Years\n"
-            "   - Identify models with consistently high sales across multiple years.\n"
-            "   - Highlight any models showing strong growth trends.\n\n"
-            "2. Underperforming Models Over the Years\n"
-            "   - Identify models with consistently low or declining sales.\n"
-            "   - Mention any models that dropped significantly or disappeared.\n\n"
-            "3. Notable Year-over-Year Trends\n"
-            "   - Discuss interesting shifts or patterns in model sales.\n"
-            "   - Mention emerging popular models or any anomalies.\n\n"
-            "### Plot Filename\n"
-            f"{plot_filename}\n\n"
-            "### Model Performance Summary Data\n"
-            f"```json\n{json.dumps(year_model_summary, indent=2)}\n```\n\n"
-            "Now produce ONLY the final markdown report with these sections.\n"
-        )
+        def build_prompt(data_block: str) -> str:
+            return (
+                "You are a senior automotive market analyst. "
+                "Create a clear and structured Markdown report analyzing BMW model sales performance over the years.\n\n"
+                "### Important Instructions\n"
+                + self._layout_rules(
+                    "- ALWAYS place the plot BEFORE its related analysis.\n"
+                    "- Embed images using markdown: ![alt](figures/filename.png)\n"
+                )
+                + "- Use clear, logical sections.\n"
+                "- Do not invent new plots or data.\n\n"
+                "### Sections to Produce\n"
+                "1. Top-Performing Models Over the Years\n"
+                "   - Identify models with consistently high sales across multiple years.\n"
+                "   - Highlight any models showing strong growth trends.\n\n"
+                "2. Underperforming Models Over the Years\n"
+                "   - Identify models with consistently low or declining sales.\n"
+                "   - Mention any models that dropped significantly or disappeared.\n\n"
+                "3. Notable Year-over-Year Trends\n"
+                "   - Discuss interesting shifts or patterns in model sales.\n"
+                "   - Mention emerging popular models or any anomalies.\n\n"
+                "### Plot Filename\n"
+                f"{plot_filename}\n\n"
+                f"{data_block}"
+                + self._final_instruction(
+                    "Now produce ONLY the final markdown report with these sections.\n"
+                )
+            )
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
+        prompt = build_prompt(
+            self._data_block(
+                "Model Performance Summary Data", year_model_summary, ["Year"], digest
             )
-        except Exception as e:
-            raise RuntimeError(f"LLM generation failed: {e}") from e
+        )
 
-        markdown = self._extract_text(response)
-        return markdown.strip()
+        headings = (
+            "1. Top-Performing Models Over the Years",
+            "2. Underperforming Models Over the Years",
+            "3. Notable Year-over-Year Trends",
+        )
+
+        # Over the token budget: send the precomputed facts instead
+        return LLMRequest(
+            "models_by_year",
+            prompt,
+            compact=lambda: build_prompt(
+                self._data_block(
+                    "Model Performance Summary Data",
+                    year_model_summary,
+                    ["Year"],
+                    digest or digest_models_by_year(year_model_summary),
+                )
+            ),
+            figures=(plot_filename,),
+            headings=headings,
+            figures_dir=figures_dir,
+            parts=default_parts(headings, (plot_filename,)),
+        )
 
     def analyze_models_over_region_trend(
-        self, model_summary: dict, figures_dir: str
+        self, model_summary: dict, figures_dir: str, digest: Optional[dict] = None
     ) -> str:
         """
         Generate region-level model plots and ask the LLM
         to produce a markdown report highlighting performance
         of BMW models per region across years.
+
+        If a precomputed digest is given, the prompt carries its facts
+        instead of the full per-region model tables.
         """
+        region_plot_filenames = self._region_plots(model_summary, figures_dir)
+        return self._complete(
+            self._region_request(
+                model_summary, region_plot_filenames, digest, figures_dir
+            )
+        )
 
+    async def analyze_models_over_region_trend_async(
+        self, model_summary: dict, figures_dir: str, digest: Optional[dict] = None
+    ) -> str:
+        """Async variant of ``analyze_models_over_region_trend``."""
+        region_plot_filenames = await self._offload(
+            self._region_plots, model_summary, figures_dir
+        )
+        return await self._complete_async(
+            self._region_request(
+                model_summary, region_plot_filenames, digest, figures_dir
+            )
+        )
+
+    def _region_plots(self, model_summary: dict, figures_dir: str) -> dict:
+        """Render one model plot per region; return the filenames by region."""
         if not model_summary:
             raise ValueError("Model summary data is empty or None.")
 
@@ -184,41 +444,73 @@ class LLMReportAgent:
             raise RuntimeError("No region plots were generated.")
 
         # 2) Convert paths to filenames for markdown embedding
-        region_plot_filenames = {
+        return {
             region.replace(" ", "_"): os.path.basename(path)
             for region, path in region_plot_paths.items()
         }
 
+    def _region_request(
+        self,
+        model_summary: dict,
+        region_plot_filenames: dict,
+        digest: Optional[dict],
+        figures_dir: str,
+    ) -> LLMRequest:
+        """Prompt asking the LLM for the regional model performance report."""
+
         # 3) Prepare LLM prompt
-        prompt = (
-            "You are a senior automotive market analyst. "
-            "Write a clear and concise Markdown report analyzing BMW model sales performance per region across years.\n\n"
-            "### Important Instructions\n"
-            "- For each region, embed the corresponding plot BEFORE its analysis.\n"
-            "- Use markdown syntax to embed images: ![alt](figures/filename.png)\n"
-            "- Focus on:\n"
-            "  1. Interesting and unique regional sales trends.\n"
-            "  2. High-performing models specific to each region.\n"
-            "  3. Underperforming models and notable declines.\n"
-            "- Keep the analysis succinct and avoid repeating information from the overall model performance section.\n"
-            "- Do NOT invent additional plots or data.\n\n"
-            "### Region Plot Filenames\n"
-            f"{json.dumps(region_plot_filenames, indent=2)}\n\n"
-            "### Model Performance Summary for All Regions\n"
-            f"```json\n{json.dumps(model_summary, indent=2)}\n```\n\n"
-            "Now produce ONLY the final markdown report with regional model performance analysis sections.\n"
-        )
+        def build_prompt(data_block: str) -> str:
+            return (
+                "You are a senior automotive market analyst. "
+                "Write a clear and concise Markdown report analyzing BMW model sales performance per region across years.\n\n"
+                "### Important Instructions\n"
+                + self._layout_rules(
+                    "- For each region, embed the corresponding plot BEFORE its analysis.\n"
+                    "- Use markdown syntax to embed images: ![alt](figures/filename.png)\n"
+                )
+                + "- Focus on:\n"
+                "  1. Interesting and unique regional sales trends.\n"
+                "  2. High-performing models specific to each region.\n"
+                "  3. Underperforming models and notable declines.\n"
+                "- Keep the analysis succinct and avoid repeating information from the overall model performance section.\n"
+                "- Do NOT invent additional plots or data.\n\n"
+                "### Region Plot Filenames\n"
+                f"{json.dumps(region_plot_filenames, indent=2)}\n\n"
+                f"{data_block}"
+                + self._final_instruction(
+                    "Now produce ONLY the final markdown report with regional model performance analysis sections.\n"
+                )
+            )
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
+        prompt = build_prompt(
+            self._data_block(
+                "Model Performance Summary for All Regions",
+                model_summary,
+                ["Region", "Year"],
+                digest,
             )
-        except Exception as e:
-            raise RuntimeError(f"LLM generation failed: {e}") from e
+        )
 
-        markdown = self._extract_text(response)
-        return markdown.strip()
+        # Over the token budget: send the precomputed facts instead
+        return LLMRequest(
+            "models_by_region",
+            prompt,
+            compact=lambda: build_prompt(
+                self._data_block(
+                    "Model Performance Summary for All Regions",
+                    model_summary,
+                    ["Region", "Year"],
+                    digest or digest_models_by_region(model_summary),
+                )
+            ),
+            figures=tuple(region_plot_filenames.values()),
+            figures_dir=figures_dir,
+            # One part per region, under the region's name
+            parts=tuple(
+                SectionPart(region.replace("_", " "), (filename,))
+                for region, filename in region_plot_filenames.items()
+            ),
+        )
 
     def analyze_correlation_matrix(
         self, corr_df: pd.DataFrame, figures_dir: str
@@ -234,6 +526,24 @@ class LLMReportAgent:
         Returns:
             str: Markdown report generated by the LLM.
         """
+        plot_filename = self._correlation_plot(corr_df, figures_dir)
+        return self._complete(
+            self._correlation_request(corr_df, plot_filename, figures_dir)
+        )
+
+    async def analyze_correlation_matrix_async(
+        self, corr_df: pd.DataFrame, figures_dir: str
+    ) -> str:
+        """Async variant of ``analyze_correlation_matrix``."""
+        plot_filename = await self._offload(
+            self._correlation_plot, corr_df, figures_dir
+        )
+        return await self._complete_async(
+            self._correlation_request(corr_df, plot_filename, figures_dir)
+        )
+
+    def _correlation_plot(self, corr_df: pd.DataFrame, figures_dir: str) -> str:
+        """Render the correlation vector plot; return its filename."""
         if corr_df.empty:
             raise ValueError("Correlation DataFrame is empty.")
 
@@ -241,42 +551,119 @@ class LLMReportAgent:
         plot_path = self.plot_tool.generate_correlation_matrix(corr_df, figures_dir)
 
         # 2) Extract filename from full path for markdown embedding
-        plot_filename = os.path.basename(plot_path)
-
-        # 3) Convert correlation DataFrame to JSON-serializable dict
-        corr_dict = corr_df.to_dict()
+        return os.path.basename(plot_path)
 
-        # 4) Prepare prompt with plot BEFORE analysis text
+    def _correlation_request(
+        self, corr_df: pd.DataFrame, plot_filename: str, figures_dir: str
+    ) -> LLMRequest:
+        """Prompt asking the LLM for the correlation report."""
+        # 3) Prepare prompt with plot BEFORE analysis text
         prompt = (
             "You are a senior data analyst.\n"
             "Create a detailed and insightful Markdown report analyzing key drivers of BMW sales by examining the correlation vector.\n\n"
             "### Important Instructions\n"
-            "- ALWAYS place the correlation vector plot BEFORE the analysis text.\n"
-            "- Embed the image using markdown syntax: ![Correlation Vector](figures/plot_filename)\n"
-            "- Provide honest and balanced interpretations of the strongest positive and negative correlations.\n"
+            + self._layout_rules(
+                "- ALWAYS place the correlation vector plot BEFORE the analysis text.\n"
+                "- Embed the image using markdown syntax: ![Correlation Vector](figures/plot_filename)\n"
+            )
+            + "- Provide honest and balanced interpretations of the strongest positive and negative correlations.\n"
             "- Clearly explain which features appear to be key drivers of sales and why.\n"
             "- Mention any features with weak or no correlation briefly.\n"
             "- Do not invent additional plots or data.\n\n"
             "### Plot Filename\n"
             f"{json.dumps(plot_filename)}\n\n"
             "### Correlation Vector Data\n"
-            f"```json\n{json.dumps(corr_dict, indent=2)}\n```\n\n"
-            "Now produce ONLY the final markdown report with focused analysis of key sales drivers based on the correlations.\n"
+            f"{self._format_payload(corr_df)}\n\n"
+            + self._final_instruction(
+                "Now produce ONLY the final markdown report with focused analysis of key sales drivers based on the correlations.\n"
+            )
         )
 
-        # 5) Call the model
-        try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-        except Exception as e:
-            raise RuntimeError(f"LLM generation failed: {e}") from e
+        return LLMRequest(
+            "correlation",
+            prompt,
+            figures=(plot_filename,),
+            figures_dir=figures_dir,
+            parts=(SectionPart("Correlation Analysis", (plot_filename,)),),
+        )
 
-        # 6) Extract text from response
-        markdown = self._extract_text(response)
+    def analyze_feature_importance(
+        self, importance_df: pd.DataFrame, figures_dir: str
+    ) -> str:
+        """
+        Generate the XGBoost feature importance plot and produce a markdown report
+        with the plot embedded BEFORE the analysis text.
 
-        return markdown.strip()
+        Args:
+            importance_df: DataFrame of gain importances indexed by feature, with
+                optional bootstrap confidence interval columns.
+            figures_dir: directory where plot images will be saved.
+
+        Returns:
+            str: Markdown report generated by the LLM.
+        """
+        plot_filename = self._feature_importance_plot(importance_df, figures_dir)
+        return self._complete(
+            self._feature_importance_request(importance_df, plot_filename, figures_dir)
+        )
+
+    async def analyze_feature_importance_async(
+        self, importance_df: pd.DataFrame, figures_dir: str
+    ) -> str:
+        """Async variant of ``analyze_feature_importance``."""
+        plot_filename = await self._offload(
+            self._feature_importance_plot, importance_df, figures_dir
+        )
+        return await self._complete_async(
+            self._feature_importance_request(importance_df, plot_filename, figures_dir)
+        )
+
+    def _feature_importance_plot(
+        self, importance_df: pd.DataFrame, figures_dir: str
+    ) -> str:
+        """Render the feature importance plot; return its filename."""
+        if importance_df.empty:
+            raise ValueError("Feature importance DataFrame is empty.")
+
+        # 1) Generate feature importance plot and save the path
+        plot_path = self.plot_tool.generate_feature_importance_plot(
+            importance_df, figures_dir
+        )
+        return os.path.basename(plot_path)
+
+    def _feature_importance_request(
+        self, importance_df: pd.DataFrame, plot_filename: str, figures_dir: str
+    ) -> LLMRequest:
+        """Prompt asking the LLM for the feature importance report."""
+        # 2) Prepare prompt with plot BEFORE analysis text
+        prompt = (
+            "You are a senior data analyst.\n"
+            "Create a concise Markdown report analyzing key drivers of BMW sales using XGBoost gain-based feature importances.\n\n"
+            "### Important Instructions\n"
+            + self._layout_rules(
+                "- ALWAYS place the feature importance plot BEFORE the analysis text.\n"
+                "- Embed the image using markdown syntax: ![Feature Importance](figures/plot_filename)\n"
+            )
+            + "- Explain which features contribute most to predicting sales volume.\n"
+            "- If confidence intervals (ci_lower/ci_upper) are given, point out which rankings are stable and which overlap.\n"
+            "- Contrast briefly with correlation analysis: importance captures non-linear effects but not direction.\n"
+            "- Do not invent additional plots or data.\n\n"
+            "### Plot Filename\n"
+            f"{json.dumps(plot_filename)}\n\n"
+            "### Feature Importance Data\n"
+            f"{self._format_payload(importance_df)}\n\n"
+            + self._final_instruction(
+                "Now produce ONLY the final markdown report with focused analysis of key sales drivers based on feature importance.\n"
+            )
+        )
+
+        return LLMRequest(
+            "feature_importance",
+            prompt,
+            figures=(plot_filename,),
+            figures_dir=figures_dir,
+            parts=(SectionPart("Feature Importance Analysis", (plot_filename,)),),
+        )
 
     def combine_and_summarize_reports(self, markdown_reports: list[str]) -> str:
         """
@@ -289,7 +676,16 @@ class LLMReportAgent:
         Returns:
             str: Combined concise markdown report.
         """
+        return self._complete(self._combine_request(markdown_reports))
+
+    async def combine_and_summarize_reports_async(
+        self, markdown_reports: list[str]
+    ) -> str:
+        """Async variant of ``combine_and_summarize_reports``."""
+        return await self._complete_async(self._combine_request(markdown_reports))
 
+    def _combine_request(self, markdown_reports: list[str]) -> LLMRequest:
+        """Prompt asking the LLM to combine the section reports."""
         # Join input reports with separators for clarity
         joined_reports = "\n\n---\n\n".join(markdown_reports)
         prompt = (
@@ -315,6 +711,7 @@ class LLMReportAgent:
             "        - 4.6 South America\n"
             "        - Use bullet points liberally in this section to break up text and improve clarity.\n"
             "     5) Key Drivers of Sales through Correlation Analysis\n"
+            "     6) Key Drivers of Sales through Feature Importance Analysis (only if such a report is provided)\n"
             "   - Synthesize findings from the reports for each subsection without repetition.\n"
             "   - Ensure each subsection logically builds on the previous ones, creating a clear flow of insights.\n"
             "   - Use bullet points where they help highlight important points and improve clarity.\n\n"
@@ -325,10 +722,8 @@ class LLMReportAgent:
             "   - Use bullet points where appropriate to keep recommendations clear and concise.\n\n"
             "### Important Instructions\n"
             "- DO NOT remove or modify any existing plot embeds like ![alt](figures/filename.png).\n"
-            "- Immediately after each plot embed, add a figure caption in the format:\n"
-            "  'Figure X: <meaningful descriptive figure title>' where X is the figure number in order of appearance starting from 1.\n"
-            "- Ensure the explanatory paragraph related to each figure always comes immediately after the figure caption.\n"
-            "- Maintain this figure numbering and formatting uniformly throughout the report.\n"
+            "- Do NOT add figure captions or numbers; they are added automatically after each embed.\n"
+            "- Ensure the explanatory paragraph related to each figure always comes immediately after the figure.\n"
             "- Ensure smooth narrative flow: the report should read as a cohesive document, not a collection of separate parts.\n"
             "- Prioritize only the most meaningful, high-impact insights that contribute substantially to understanding sales trends, model performance, and key drivers of sales.\n"
             "- Do NOT include every minor observation from the original reports. Consolidate and summarize the information to focus on the strongest patterns and conclusions.\n"
@@ -340,16 +735,366 @@ class LLMReportAgent:
             "Now produce ONLY the final combined markdown report."
         )
 
+        return LLMRequest(
+            "combine",
+            prompt,
+            figures=tuple(embedded_figures(joined_reports)),
+            headings=("1. Executive Summary", "2. Analysis", "3. Recommendations"),
+        )
+
+    def digest_section_report(self, title: str, markdown: str) -> str:
+        """
+        Condense a section report into a short digest for the final summary.
+
+        Args:
+            title: Section title.
+            markdown: Full markdown of the section report.
+
+        Returns:
+            str: Bullet-point digest with the section's key facts, followed by
+            the section's figure references (extracted locally).
+        """
+        digest = self._complete(self._section_digest_request(title, markdown))
+        return _with_figure_references(digest, markdown)
+
+    async def digest_section_report_async(self, title: str, markdown: str) -> str:
+        """Async variant of ``digest_section_report``."""
+        digest = await self._complete_async(
+            self._section_digest_request(title, markdown)
+        )
+        return _with_figure_references(digest, markdown)
+
+    def _section_digest_request(self, title: str, markdown: str) -> LLMRequest:
+        """Prompt asking the LLM to condense a section report."""
+        if not markdown.strip():
+            raise ValueError(f"Section report '{title}' is empty.")
+
+        prompt = (
+            "You are a senior data analyst.\n"
+            "Condense the report section below into a digest for an executive summary.\n\n"
+            "### Important Instructions\n"
+            "- Write at most 6 bullet points with the key facts and conclusions.\n"
+            "- Keep concrete numbers (sales, growth rates, shares, rankings).\n"
+            "- No headings, no plot embeds, no introduction.\n\n"
+            f"### Section: {title}\n"
+            f"{markdown}\n\n"
+            "Now produce ONLY the bullet points.\n"
+        )
+
+        return LLMRequest("section_digests", prompt)
+
+    def summarize_section_digests(self, section_digests: Dict[str, str]) -> str:
+        """
+        Write the executive summary and recommendations from section digests.
+
+        The full section reports are not sent; they are spliced into the
+        report locally (see ``build_markdown_report``), so this prompt stays
+        small however long the sections are.
+
+        Args:
+            section_digests: Section title -> digest from ``digest_section_report``.
+
+        Returns:
+            str: Markdown with an executive summary and a recommendations section.
+        """
+        return self._complete(self._summary_request(section_digests))
+
+    async def summarize_section_digests_async(
+        self, section_digests: Dict[str, str]
+    ) -> str:
+        """Async variant of ``summarize_section_digests``."""
+        return await self._complete_async(self._summary_request(section_digests))
+
+    def _summary_request(self, section_digests: Dict[str, str]) -> LLMRequest:
+        """Prompt asking the LLM for the summary and recommendations."""
+        if not section_digests:
+            raise ValueError("No section digests to summarize.")
+
+        digests = "\n\n".join(
+            f"### {title}\n{digest}" for title, digest in section_digests.items()
+        )
+        prompt = (
+            "You are a senior data analyst.\n"
+            "Below are digests of the sections of a BMW sales analysis report: "
+            "sales trends, model performance and key drivers of sales.\n"
+            "The full sections will be included in the report after your executive "
+            "summary. Write exactly these two sections:\n\n"
+            "## 1. Executive Summary\n"
+            "   - A clear and brief summary of the key insights from all sections,\n"
+            "     organized by sales trends, model performance and key drivers of sales.\n"
+            "   - Use bullet points for business stakeholders.\n\n"
+            "## 3. Recommendations\n"
+            "   - Actionable recommendations clearly linked to the insights,\n"
+            "     structured by sales trends, model performance and key drivers of sales.\n"
+            "   - Use bullet points.\n\n"
+            "### Important Instructions\n"
+            "- Use exactly the two headings above (section 2, the analysis, is added separately).\n"
+            "- Do NOT embed plots; refer to a figure by its section when useful.\n"
+            "- Prioritize the most meaningful, high-impact insights.\n"
+            "- This report is intended for business readers, not technical experts.\n"
+            "- Do NOT include technical or advanced analytics method recommendations.\n\n"
+            "### Section Digests\n"
+            f"{digests}\n\n"
+            + self._final_instruction("Now produce ONLY the two sections in markdown.")
+        )
+
+        # No figures: plot embeds are not allowed in the summary
+        headings = ("1. Executive Summary", "3. Recommendations")
+        return LLMRequest(
+            "combine", prompt, headings=headings, parts=default_parts(headings, ())
+        )
+
+    def _data_block(self, title: str, payload, levels=None, digest=None) -> str:
+        """
+        Prompt block with the summary data, or with its precomputed facts
+        when a digest is given. Bucketed summaries get a note on the
+        "Other" series.
+        """
+        note = ""
+        if has_other_bucket(payload):
+            note = (
+                f'"{OTHER_LABEL}" is the combined sales of the smaller models, '
+                "not a model; mention it only as the long tail.\n"
+            )
+        if digest is None:
+            return f"### {title}\n{note}{self._format_payload(payload, levels)}\n\n"
+        return (
+            f"### {title} (Precomputed Facts)\n"
+            "Facts precomputed from the full data: growth rates and shares are in "
+            "percent, CAGR is from the first to the last year, and rank changes "
+            "compare the first and last year. Base the analysis on these facts.\n"
+            f"{note}"
+            f"```text\n{digest_to_text(digest)}\n```\n\n"
+        )
+
+    def _layout_rules(self, markdown_rules: str) -> str:
+        """Prompt instructions on the answer layout: markdown or structured JSON."""
+        return STRUCTURED_RULES if self.structured else markdown_rules
+
+    def _final_instruction(self, markdown_instruction: str) -> str:
+        """Last line of a section prompt: markdown or structured JSON."""
+        return STRUCTURED_FINAL_INSTRUCTION if self.structured else markdown_instruction
+
+    def _format_payload(self, payload, levels=None) -> str:
+        """Serialize summary data as a fenced block in the configured payload format."""
+        body = self.serializer.serialize(payload, levels)
+        return f"```{self.serializer.language}\n{body}\n```"
+
+    def _call_llm(
+        self,
+        section: str,
+        prompt: str,
+        compact: Optional[Callable[[], str]] = None,
+        config=None,
+    ):
+        """
+        Send a prompt to the backend; every LLM call of the agent goes through here.
+
+        The prompt is checked against the token budget first (``compact``
+        builds a smaller prompt for the "compact" budget mode), and the
+        response's token usage is recorded under ``section``. ``config`` is
+        the generation config (the response schema in structured mode).
+        """
+        prompt = self.usage.admit(section, prompt, compact)
+        route = self._route(section)
+        start = time.perf_counter()
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
+            response = self.backend.generate_content(
+                model=route.model, contents=prompt, config=config
             )
         except Exception as e:
+            self._record_failure(route, start, prompt)
             raise RuntimeError(f"LLM generation failed: {e}") from e
 
-        combined_markdown = self._extract_text(response)
-        return combined_markdown.strip()
+        self._record_call(route, start, section, prompt, response)
+        return response
+
+    async def _call_llm_async(
+        self,
+        section: str,
+        prompt: str,
+        compact: Optional[Callable[[], str]] = None,
+        config=None,
+    ):
+        """Coroutine version of ``_call_llm`` (``client.aio`` for Gemini)."""
+        prompt = self.usage.admit(section, prompt, compact)
+        route = self._route(section)
+        start = time.perf_counter()
+        try:
+            response = await self.backend.generate_content_async(
+                model=route.model, contents=prompt, config=config
+            )
+        except asyncio.CancelledError:
+            # A hedged attempt that lost the race: free its budget
+            self.usage.release(prompt)
+            raise
+        except Exception as e:
+            self._record_failure(route, start, prompt)
+            raise RuntimeError(f"LLM generation failed: {e}") from e
+
+        self._record_call(route, start, section, prompt, response)
+        return response
+
+    def _route(self, section: str) -> Route:
+        """Model of a call: the router's choice, or ``model_name``."""
+        if self.router is None:
+            return Route(section, "default", self.model_name, "policy")
+        return self.router.choose(section)
+
+    def _record_call(self, route: Route, start: float, section, prompt, response):
+        """Record the token usage of a call, and its latency with the router."""
+        latency_s = time.perf_counter() - start
+        input_tokens, output_tokens = self.usage.record(
+            section, route.model, prompt, response, self._extract_text(response)
+        )
+        if self.router is not None:
+            self.router.record(route, latency_s, input_tokens, output_tokens)
+
+    def _record_failure(self, route: Route, start: float, prompt: str):
+        """Release the budget of a failed call and record it with the router."""
+        self.usage.release(prompt)
+        if self.router is not None:
+            self.router.record(route, time.perf_counter() - start, ok=False)
+
+    def _complete(self, request: LLMRequest) -> str:
+        """Send a request and return the stripped (and repaired) markdown answer."""
+        response = self._call_llm(
+            request.section, request.prompt, request.compact, self._config(request)
+        )
+        text = self._answer_markdown(request, self._extract_text(response))
+        if not self.validate:
+            return text
+
+        text, problems, prompt = self._check(request, text)
+        answer = None
+        if prompt is not None:
+            answer = self._extract_text(self._call_llm("repairs", prompt))
+        return self._finish_repair(request, text, problems, answer)
+
+    async def _complete_async(self, request: LLMRequest) -> str:
+        """Send a request without blocking the event loop, hedged if configured."""
+
+        async def send(prompt: str) -> str:
+            response = await self._call_llm_async(
+                request.section, prompt, request.compact, self._config(request)
+            )
+            return self._answer_markdown(request, self._extract_text(response))
+
+        if self.hedge is None:
+            text = await send(request.prompt)
+        else:
+            text = await self.hedge.run(
+                request.section,
+                request.prompt,
+                request.figures,
+                send,
+                structured=self._is_structured(request),
+                headings=request.headings if self._is_structured(request) else (),
+            )
+        if not self.validate:
+            return text
+
+        text, problems, prompt = self._check(request, text)
+        answer = None
+        if prompt is not None:
+            answer = self._extract_text(await self._call_llm_async("repairs", prompt))
+        return self._finish_repair(request, text, problems, answer)
+
+    def _is_structured(self, request: LLMRequest) -> bool:
+        return self.structured and bool(request.parts)
+
+    def _config(self, request: LLMRequest):
+        """Generation config of a request: the response schema in structured mode."""
+        return (
+            structured_config(request.parts) if self._is_structured(request) else None
+        )
+
+    def _answer_markdown(self, request: LLMRequest, text: str) -> str:
+        """
+        Markdown of an answer: the stripped text, or in structured mode the
+        section rendered locally from the JSON answer.
+
+        An unparsable JSON answer gives an empty section, which hedging
+        retries and validation repairs.
+        """
+        if not self._is_structured(request):
+            return text.strip()
+        answer = parse_answer(text)
+        if answer is None:
+            print(f"Warning: section '{request.section}' returned invalid JSON.")
+            return ""
+        self.structured_answers[request.section] = answer
+        return render_section(answer, request.parts)
+
+    def _check(self, request: LLMRequest, text: str):
+        """
+        Validate an answer and fix its embeds locally.
+
+        Returns:
+            (text, problems left, repair prompt or None)
+        """
+        problems = validate_markdown(
+            text,
+            request.headings,
+            request.figures,
+            request.figures_dir,
+            require_text=self._is_structured(request),
+        )
+        if problems:
+            self.validation_log.append(
+                {
+                    "section": request.section,
+                    "problems": [p._asdict() for p in problems],
+                    "fixed_locally": sum(p.kind == "unknown_figure" for p in problems),
+                }
+            )
+        text, problems = fix_embeds(text, problems)
+        prompt = repair_prompt(text, problems)
+        if prompt is not None:
+            self.validation_log[-1]["repair_prompt_tokens"] = estimate_tokens(prompt)
+        return text, problems, prompt
+
+    def _finish_repair(
+        self, request: LLMRequest, text: str, problems: list, answer: Optional[str]
+    ) -> str:
+        """
+        Splice a repair answer into the section and report what is still wrong.
+
+        In structured mode the repaired text is written back to the section's
+        answer, so ``structured_answers`` matches the report.
+        """
+        structured = self._is_structured(request)
+        if answer is not None:
+            text = apply_repair(text, problems, answer, request.headings)
+            if structured:
+                self.structured_answers[request.section] = update_answer(
+                    self.structured_answers.get(request.section, {"parts": []}),
+                    text,
+                    request.parts,
+                )
+
+        remaining = validate_markdown(
+            text,
+            request.headings,
+            request.figures,
+            request.figures_dir,
+            require_text=structured,
+        )
+        text, remaining = fix_embeds(text, remaining)
+        if remaining:
+            print(
+                f"Warning: section '{request.section}' still has problems after "
+                f"repair: {[p.target for p in remaining]}"
+            )
+        return text
+
+    async def _offload(self, func: Callable, *args):
+        """
+        Run blocking work (plot rendering) in ``plot_executor``, so it
+        overlaps with LLM calls awaited by other sections.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.plot_executor, func, *args)
 
     def _extract_text(self, response) -> str:
         """Robustly extract text from Gemini response."""
@@ -371,15 +1116,13 @@ class LLMReportAgent:
         return "".join(parts_text)
 
     def count_prompt_tokens(self, prompt: str) -> int:
-        """Return number of tokens for a given text prompt."""
-
-        content = types.Content(parts=[types.Part(text=prompt)])
+        """
+        Return number of tokens for a given text prompt.
 
-        response = self.client.models.count_tokens(
-            model=self.model_name, contents=content
-        )
+        With the Gemini backend this is a separate API call; token usage of
+        the report calls is tracked from their responses in ``self.usage``.
+        """
 
-        if response.total_tokens is None:
-            raise RuntimeError("count_tokens() returned None")
+        content = types.Content(parts=[types.Part(text=prompt)])
 
-        return response.total_tokens
+        return self.backend.count_tokens(model=self.model_name, contents=content)
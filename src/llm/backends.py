@@ -0,0 +1,437 @@
+"""
+Pluggable LLM backends for LLMReportAgent.
+
+Every backend exposes the subset of the google-genai client used by the
+agent: ``generate_content(model, contents, config)`` returning a
+``types.GenerateContentResponse``, its coroutine ``generate_content_async``
+(the ``client.aio`` equivalent), and ``count_tokens(model, contents)``.
+
+- ``GeminiBackend``: the Gemini API through ``genai.Client()`` (network + API key).
+- ``TemplateBackend``: a local, deterministic backend for offline runs, CI
+  and load tests. It answers with markdown derived from the prompt (its
+  numbered sections and plot filenames) after a configurable artificial
+  latency, and reports estimated token usage. When the config requests
+  structured output (a ``response_json_schema``) it answers with a
+  deterministic JSON instance of the schema instead.
+- ``RecordingBackend``: wraps another backend and appends every prompt,
+  response, token usage and latency to a JSONL archive in the run directory.
+- ``ReplayBackend``: serves the responses of such an archive back without
+  network access, to rerun the pipeline against a recorded baseline.
+
+``create_backend`` builds a backend by name (see ``LLM_BACKEND`` in config).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from google import genai
+from google.genai import types
+
+from src.llm.utils import estimate_tokens
+
+# Numbered sections ("1. Title", "## 1. Title") and indented subsections ("   1) Title", "  - 4.1 Africa")
+_SECTION_PATTERN = re.compile(r"^(?:#+\s+)?(\d+)\.\s+(.+)$")
+_SUBSECTION_PATTERN = re.compile(r"^\s+(?:-\s+)?(\d+(?:\)|\.\d+))\s+(.+)$")
+_INSTRUCTION_BLOCKS = ("Sections to Produce", "Important Instructions")
+_NO_EMBED_PATTERN = re.compile(r"no plot embeds|do not embed plots", re.IGNORECASE)
+_FIGURE_PATTERN = re.compile(r"[A-Za-z0-9_\-]+\.(?:png|svg)")
+_PLACEHOLDER_FIGURES = {"filename.png"}
+
+
+class LLMBackend(ABC):
+    """Interface of a text-generation backend used by LLMReportAgent."""
+
+    @abstractmethod
+    def generate_content(self, model: str, contents, config=None):
+        """Return a ``types.GenerateContentResponse`` for the prompt."""
+
+    async def generate_content_async(self, model: str, contents, config=None):
+        """
+        Coroutine version of ``generate_content``.
+
+        Backends without native async support run the blocking call in the
+        event loop's default executor, so the loop is never blocked.
+        """
+        return await asyncio.to_thread(self.generate_content, model, contents, config)
+
+    @abstractmethod
+    def count_tokens(self, model: str, contents) -> int:
+        """Return the number of input tokens of ``contents``."""
+
+
+class GeminiBackend(LLMBackend):
+    """Backend calling the Gemini API through the google-genai client."""
+
+    def __init__(self, client=None):
+        self.client = client or genai.Client()
+
+    def generate_content(self, model: str, contents, config=None):
+        return self.client.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    async def generate_content_async(self, model: str, contents, config=None):
+        return await self.client.aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    def count_tokens(self, model: str, contents) -> int:
+        response = self.client.models.count_tokens(model=model, contents=contents)
+        if response.total_tokens is None:
+            raise RuntimeError("count_tokens() returned None")
+        return response.total_tokens
+
+
+def _text_of(contents) -> str:
+    """Flatten prompt contents (str, Content or list of them) to text."""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, types.Content):
+        return "".join(part.text or "" for part in contents.parts or [])
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(_text_of(item) for item in contents)
+    return str(contents)
+
+
+def prompt_key(prompt: str) -> str:
+    """Archive key of a prompt: the SHA-256 of its text."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def make_response(
+    text: str, prompt_tokens: int, model: str = None, output_tokens: int = None
+):
+    """Build a Gemini-shaped response object around a text answer."""
+    if output_tokens is None:
+        output_tokens = estimate_tokens(text)
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                finish_reason=types.FinishReason.STOP,
+            )
+        ],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        ),
+        model_version=model,
+    )
+
+
+def _schema_instance(schema: dict, tag: str, position=(0, 1)):
+    """
+    Deterministic JSON instance of a response schema.
+
+    An array of objects with an enum property gets one item per enum value;
+    arrays of enum values nested in its items share the allowed values out
+    over those items in order, starting with the first item (``position`` is
+    (item index, item count)).
+    """
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _schema_instance(sub, tag, position)
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        items = schema.get("items", {})
+        if "enum" in items:
+            values = items["enum"]
+            index, count = position
+            # Value i goes to item i * count // len(values), the first first
+            return [
+                value
+                for idx, value in enumerate(values)
+                if idx * count // len(values) == index
+            ]
+        keys = [
+            (name, sub["enum"])
+            for name, sub in items.get("properties", {}).items()
+            if "enum" in sub
+        ]
+        if keys:
+            name, values = keys[0]
+            return [
+                {**_schema_instance(items, tag, (idx, len(values))), name: value}
+                for idx, value in enumerate(values)
+            ]
+        return [
+            _schema_instance(items, tag, position)
+            for _ in range(min(2, schema.get("maxItems", 2)))
+        ]
+    if kind == "string":
+        if schema.get("enum"):
+            return schema["enum"][0]
+        return f"Deterministic local finding [{tag}]."
+    if kind in ("number", "integer"):
+        return 0
+    if kind == "boolean":
+        return False
+    return None
+
+
+class TemplateBackend(LLMBackend):
+    """
+    Deterministic local backend that renders markdown from the prompt.
+
+    The answer has one heading per numbered section requested by the prompt
+    (outside its data blocks) and embeds
+    every plot filename mentioned in it, so the full pipeline (plots, report
+    assembly, concurrency and caching) runs without network access. The same
+    prompt always produces the same text. A structured-output request (a
+    config with a ``response_json_schema``) is answered with a JSON instance
+    of the schema.
+
+    Args:
+        latency_s: Artificial latency added to every call, in seconds.
+        jitter_s: Maximum extra latency, drawn deterministically per prompt.
+    """
+
+    def __init__(self, latency_s: float = 0.0, jitter_s: float = 0.0):
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+
+    def generate_content(self, model: str, contents, config=None):
+        prompt = _text_of(contents)
+        delay = self._delay(prompt)
+        if delay > 0:
+            time.sleep(delay)
+        return self._respond(model, prompt, config)
+
+    async def generate_content_async(self, model: str, contents, config=None):
+        prompt = _text_of(contents)
+        delay = self._delay(prompt)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._respond(model, prompt, config)
+
+    def _delay(self, prompt: str) -> float:
+        """Artificial latency of a prompt (the jitter is seeded by the prompt)."""
+        return self.latency_s + random.Random(prompt_key(prompt)).uniform(
+            0, self.jitter_s
+        )
+
+    def _respond(self, model: str, prompt: str, config=None):
+        schema = getattr(config, "response_json_schema", None)
+        if schema:
+            text = json.dumps(_schema_instance(schema, prompt_key(prompt)[:8]))
+        else:
+            text = self.render(prompt, prompt_key(prompt)[:8])
+        return make_response(text, estimate_tokens(prompt), model)
+
+    def count_tokens(self, model: str, contents) -> int:
+        return estimate_tokens(_text_of(contents))
+
+    @staticmethod
+    def render(prompt: str, tag: str = "") -> str:
+        """Render a deterministic markdown answer for a prompt."""
+        sections = []
+        in_instructions = True
+        for line in prompt.splitlines():
+            if line.startswith("### "):
+                # Numbered lines in data blocks (e.g. embedded reports) are not sections
+                in_instructions = line[4:].startswith(_INSTRUCTION_BLOCKS)
+                continue
+            if not in_instructions:
+                continue
+            match = _SECTION_PATTERN.match(line)
+            if match:
+                sections.append([f"## {match.group(1)}. {match.group(2).strip()}"])
+                continue
+            match = _SUBSECTION_PATTERN.match(line)
+            if match and sections:
+                number = match.group(1).rstrip(")")
+                sections[-1].append(f"### {number} {match.group(2).strip()}")
+
+        figures = [
+            name
+            for name in dict.fromkeys(_FIGURE_PATTERN.findall(prompt))
+            if name not in _PLACEHOLDER_FIGURES
+        ]
+        if _NO_EMBED_PATTERN.search(prompt):
+            figures = []
+        if not sections:
+            # No numbered sections: one section per figure, or a single section
+            sections = [[f"## {name[:-4].replace('_', ' ')}"] for name in figures] or [
+                ["## Analysis"]
+            ]
+
+        blocks = []
+        for idx, headings in enumerate(sections):
+            # Spread the figures over the sections in order of appearance
+            start = idx * len(figures) // len(sections)
+            stop = (idx + 1) * len(figures) // len(sections)
+            lines = [headings[0]]
+            lines.extend(
+                f"![{name[:-4].replace('_', ' ')}](figures/{name})"
+                for name in figures[start:stop]
+            )
+            lines.append(f"Deterministic local analysis placeholder [{tag}].")
+            for heading in headings[1:]:
+                lines.append(f"{heading}\n\n- Placeholder finding.")
+            blocks.append("\n\n".join(lines))
+
+        return "\n\n".join(blocks)
+
+
+class RecordingBackend(LLMBackend):
+    """
+    Record every call of a wrapped backend into a JSONL archive.
+
+    Each line holds the prompt key and text, the model, the response text,
+    the token usage reported by the response and the call latency. Calls
+    from several threads are appended under a lock.
+
+    Args:
+        inner: Backend that answers the prompts.
+        archive_path: JSONL file the calls are appended to.
+    """
+
+    def __init__(self, inner: LLMBackend, archive_path: str):
+        self.inner = inner
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(archive_path) or ".", exist_ok=True)
+
+    def generate_content(self, model: str, contents, config=None):
+        start = time.perf_counter()
+        response = self.inner.generate_content(model, contents, config)
+        self._record(model, contents, response, time.perf_counter() - start)
+        return response
+
+    async def generate_content_async(self, model: str, contents, config=None):
+        start = time.perf_counter()
+        response = await self.inner.generate_content_async(model, contents, config)
+        self._record(model, contents, response, time.perf_counter() - start)
+        return response
+
+    def _record(self, model: str, contents, response, latency: float):
+        """Append one call to the archive."""
+        prompt = _text_of(contents)
+        usage = response.usage_metadata
+        record = {
+            "key": prompt_key(prompt),
+            "model": model,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "latency_s": round(latency, 4),
+            "prompt_tokens": usage.prompt_token_count if usage else None,
+            "output_tokens": usage.candidates_token_count if usage else None,
+            "prompt": prompt,
+            "response": response.text or "",
+        }
+        with self._lock:
+            with open(self.archive_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def count_tokens(self, model: str, contents) -> int:
+        return self.inner.count_tokens(model, contents)
+
+
+def load_archive(archive_path: str) -> dict:
+    """Load a recorded JSONL archive as {prompt key: record} (last record wins)."""
+    records = {}
+    with open(archive_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records[record["key"]] = record
+    return records
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Serve recorded responses of a ``RecordingBackend`` archive.
+
+    Prompts are matched by their exact text, so a rerun on unchanged data
+    replays the baseline responses and token counts. A prompt that is not
+    in the archive is sent to ``fallback`` if one is given, and otherwise
+    raises a RuntimeError.
+
+    Args:
+        archive_path: JSONL archive written by ``RecordingBackend``.
+        replay_latency: Sleep for each call's recorded latency, to reproduce
+            the recorded wall time instead of answering immediately.
+        fallback: Optional backend for prompts missing from the archive.
+    """
+
+    def __init__(
+        self,
+        archive_path: str,
+        replay_latency: bool = False,
+        fallback: LLMBackend = None,
+    ):
+        if not os.path.exists(archive_path):
+            raise ValueError(f"LLM archive not found: {archive_path}")
+        self.records = load_archive(archive_path)
+        self.replay_latency = replay_latency
+        self.fallback = fallback
+
+    def generate_content(self, model: str, contents, config=None):
+        prompt = _text_of(contents)
+        record = self._lookup(prompt)
+        if record is None:
+            return self.fallback.generate_content(model, contents, config)
+
+        if self.replay_latency and record.get("latency_s"):
+            time.sleep(record["latency_s"])
+        return self._respond(prompt, record)
+
+    async def generate_content_async(self, model: str, contents, config=None):
+        prompt = _text_of(contents)
+        record = self._lookup(prompt)
+        if record is None:
+            return await self.fallback.generate_content_async(model, contents, config)
+
+        if self.replay_latency and record.get("latency_s"):
+            await asyncio.sleep(record["latency_s"])
+        return self._respond(prompt, record)
+
+    def _lookup(self, prompt: str):
+        """Recorded call of a prompt, or None if it goes to the fallback."""
+        record = self.records.get(prompt_key(prompt))
+        if record is None and self.fallback is None:
+            raise RuntimeError(
+                "No recorded response for this prompt; the prompt changed since "
+                "the archive was recorded. Record a new baseline."
+            )
+        return record
+
+    @staticmethod
+    def _respond(prompt: str, record: dict):
+        prompt_tokens = record.get("prompt_tokens")
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt)
+        return make_response(
+            record["response"],
+            prompt_tokens,
+            record.get("model"),
+            output_tokens=record.get("output_tokens"),
+        )
+
+    def count_tokens(self, model: str, contents) -> int:
+        return estimate_tokens(_text_of(contents))
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "template": TemplateBackend,
+    "record": RecordingBackend,
+    "replay": ReplayBackend,
+}
+
+
+def create_backend(name: str = "gemini", **kwargs) -> LLMBackend:
+    """Instantiate a backend by name with backend-specific keyword arguments."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Available: {list(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
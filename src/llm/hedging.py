@@ -0,0 +1,297 @@
+"""
+Hedged LLM requests: bound tail latency and retry bad answers.
+
+A report section occasionally comes back empty or without some of its plot
+embeds, and a slow call holds up the whole run. With a ``HedgePolicy`` the
+agent's async calls (see ``LLMReportAgent._complete_async``):
+
+- Fire a duplicate request when a call has not completed within a latency
+  threshold: the given percentile of the recent latencies of the same
+  section (``initial_delay_s`` until ``min_samples`` calls of the section
+  have completed), as sections differ widely in prompt and answer size.
+  Most sections are called once per run, so the latencies of the previous
+  runs' hedge logs seed the policy (see ``load_hedge_history``).
+- Fire an alternative request, whose prompt names the missing figures
+  (or, for a structured JSON answer, asks for the complete JSON object),
+  when an answer fails validation (empty, missing an expected figure
+  embed, or a structured part without text) or the call fails (except
+  for an exceeded token budget).
+
+The first valid answer wins and the other attempts are cancelled. If no
+attempt is valid once ``max_attempts`` have completed, the last answer is
+returned as is (or the last error raised).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.llm.usage import TokenBudgetExceeded
+from src.llm.validation import embedded_figures, heading_texts
+from src.reporting.artifacts import ArtifactStore
+from src.reporting.writer import atomic_write
+
+HEDGE_LOG_FILENAME = "hedging.json"
+
+
+def validation_problems(
+    text: str, figures: Iterable[str] = (), headings: Iterable[str] = ()
+) -> List[str]:
+    """
+    Check an LLM answer: it must be non-empty, embed every expected figure
+    and have text under each of ``headings`` it contains.
+
+    Returns:
+        list[str]: Problems found (empty if the answer is valid).
+    """
+    if not text.strip():
+        return ["empty response"]
+    missing = [f for f in figures if f not in set(embedded_figures(text))]
+    problems = [f"missing figure embed: {name}" for name in missing]
+    problems.extend(
+        f"empty part: {heading}"
+        for heading, body in heading_texts(text, headings).items()
+        if not body
+    )
+    return problems
+
+
+def alternative_prompt(
+    prompt: str, figures: Iterable[str], structured: bool = False
+) -> str:
+    """
+    Prompt variant that insists on a complete answer with every figure embed.
+
+    A structured request asks for the JSON object instead: its figures are
+    embedded when the answer is rendered, not by the model.
+    """
+    if structured:
+        return (
+            prompt + "\n\nIMPORTANT: Answer with the complete JSON object of the "
+            "response schema: every part, each with its summary and findings.\n"
+        )
+    figures = list(figures)
+    reminder = "\n\nIMPORTANT: Answer with the complete markdown report."
+    if figures:
+        embeds = ", ".join(f"![...](figures/{name})" for name in figures)
+        reminder += f" It MUST embed every one of these figures: {embeds}."
+    return prompt + reminder + "\n"
+
+
+class HedgePolicy:
+    """
+    When to hedge an LLM call, and the record of hedges fired in a run.
+
+    Args:
+        percentile: Latency percentile of the section's completed calls
+            after which a duplicate request is fired.
+        min_samples: Completed calls of a section needed before its
+            percentile is used.
+        initial_delay_s: Hedge delay until ``min_samples`` calls completed.
+        min_delay_s: Lower bound of the hedge delay.
+        max_attempts: Maximum requests per call, including the first one.
+        window: Only the latest ``window`` latencies of a section are used.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 90,
+        min_samples: int = 3,
+        initial_delay_s: float = 30.0,
+        min_delay_s: float = 1.0,
+        max_attempts: int = 3,
+        window: int = 20,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay_s = initial_delay_s
+        self.min_delay_s = min_delay_s
+        self.max_attempts = max_attempts
+        self.window = window
+        self.latencies: Dict[str, Deque[float]] = {}
+        # Latencies of this run's calls only, written to the hedge log
+        self.run_latencies: Dict[str, List[float]] = {}
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+
+    def seed(self, latencies: Dict[str, Iterable[float]]):
+        """Add the latencies per section of previous runs (``load_hedge_history``)."""
+        with self._lock:
+            for section, values in latencies.items():
+                self.latencies.setdefault(section, deque(maxlen=self.window)).extend(
+                    values
+                )
+
+    def delay(self, section: str) -> float:
+        """Seconds to wait for an attempt of ``section`` before firing a duplicate."""
+        with self._lock:
+            latencies = list(self.latencies.get(section, ()))
+        if len(latencies) < self.min_samples:
+            return self.initial_delay_s
+        threshold = float(np.percentile(latencies, self.percentile))
+        return max(threshold, self.min_delay_s)
+
+    def observe(self, section: str, latency_s: float):
+        """Record the latency of a completed call of ``section``."""
+        with self._lock:
+            self.latencies.setdefault(section, deque(maxlen=self.window)).append(
+                latency_s
+            )
+            self.run_latencies.setdefault(section, []).append(round(latency_s, 4))
+
+    def log(self, section: str, reason: str, attempt: int, detail: str = ""):
+        """Record a hedge fired for ``section`` (reason: latency, invalid or error)."""
+        with self._lock:
+            self.events.append(
+                {
+                    "section": section,
+                    "reason": reason,
+                    "attempt": attempt,
+                    "detail": detail,
+                }
+            )
+
+    async def run(
+        self,
+        section: str,
+        prompt: str,
+        figures: Iterable[str],
+        send: Callable[[str], Awaitable[str]],
+        structured: bool = False,
+        headings: Iterable[str] = (),
+    ) -> str:
+        """
+        Send ``prompt`` with hedging and return the first valid answer.
+
+        Args:
+            section: Report section, for the hedge log.
+            prompt: Prompt of the first attempt (and of latency duplicates).
+            figures: Figure filenames the answer must embed.
+            send: Coroutine function sending a prompt and returning its text.
+            structured: Whether the request asks for a JSON answer (see
+                ``alternative_prompt``).
+            headings: Headings that must have text under them.
+
+        Returns:
+            str: The first valid answer, or the last answer if none is valid.
+        """
+        figures = list(figures)
+        headings = list(headings)
+        pending = set()
+        attempts = 0
+        last_text: Optional[str] = None
+        last_error: Optional[BaseException] = None
+
+        async def timed(attempt_prompt: str) -> str:
+            start = time.perf_counter()
+            text = await send(attempt_prompt)
+            self.observe(section, time.perf_counter() - start)
+            return text
+
+        def fire(attempt_prompt: str):
+            nonlocal attempts
+            attempts += 1
+            pending.add(asyncio.ensure_future(timed(attempt_prompt)))
+
+        fire(prompt)
+        try:
+            while pending:
+                delay = self.delay(section) if attempts < self.max_attempts else None
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Slower than the latency threshold: race a duplicate
+                    self.log(section, "latency", attempts + 1, f"{delay:.1f}s")
+                    fire(prompt)
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        text = task.result()
+                    except TokenBudgetExceeded:
+                        raise
+                    except Exception as e:  # pylint: disable=broad-except
+                        last_error = e
+                        reason, problems = "error", [str(e)]
+                    else:
+                        last_text = text
+                        problems = validation_problems(text, figures, headings)
+                        if not problems:
+                            return text
+                        reason = "invalid"
+                    if attempts < self.max_attempts:
+                        self.log(section, reason, attempts + 1, "; ".join(problems))
+                        fire(alternative_prompt(prompt, figures, structured))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_text is None and last_error is not None:
+            raise last_error
+        return last_text or ""
+
+    def summary(self) -> dict:
+        """
+        Hedges fired per reason, the events, each section's latency threshold
+        and the latencies of this run's calls.
+        """
+        with self._lock:
+            events = list(self.events)
+            sections = list(self.latencies)
+            latencies = {k: list(v) for k, v in self.run_latencies.items()}
+        counts = {}
+        for event in events:
+            counts[event["reason"]] = counts.get(event["reason"], 0) + 1
+        delays = {section: round(self.delay(section), 3) for section in sections}
+        return {
+            "hedges": counts,
+            "delay_s": delays,
+            "events": events,
+            "latencies": latencies,
+        }
+
+    def save(self, path: str) -> str:
+        """Write the hedge log as JSON."""
+        atomic_write(path, json.dumps(self.summary(), indent=2))
+        return path
+
+
+def load_hedge_history(
+    reports_root: str, current_dir: str, max_runs: int = 5
+) -> Dict[str, List[float]]:
+    """
+    Call latencies per section of the newest previous runs with a hedge log.
+
+    Args:
+        reports_root: Folder of the run folders.
+        current_dir: Folder of the current run (skipped).
+        max_runs: Number of previous runs to read.
+
+    Returns:
+        dict: Section -> latencies, oldest first (empty if there is no log).
+    """
+    current = os.path.abspath(current_dir)
+    paths = [
+        os.path.join(run, HEDGE_LOG_FILENAME)
+        for run in ArtifactStore(reports_root).run_dirs()
+        if os.path.abspath(run) != current
+        and os.path.isfile(os.path.join(run, HEDGE_LOG_FILENAME))
+    ]
+    latencies: Dict[str, List[float]] = {}
+    for path in paths[-max_runs:]:
+        with open(path, encoding="utf-8") as f:
+            for section, values in json.load(f).get("latencies", {}).items():
+                latencies.setdefault(section, []).extend(values)
+    return latencies
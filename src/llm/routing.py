@@ -0,0 +1,287 @@
+"""
+Tiered model routing: pick the model of every LLM call by its section.
+
+By default the agent sends every call to one model. With a ``ModelRouter``
+(see ``LLMReportAgent._call_llm``) each call is routed by its section to a
+model tier, e.g. a lighter, faster model for the section drafts, digests
+and repairs and a stronger one only for the final summary ("combine"):
+
+- A tier may have a latency SLO. When the recent latencies of its model
+  put the SLO at risk (their ``percentile`` exceeds it), calls of that tier
+  fall back to the fallback tier (the fast model). Every ``probe_every``-th
+  call of the tier is still sent to its own model as a probe; a probe
+  within the SLO resets the model's latencies, so the tier recovers once
+  its model is fast again. The previous runs' routing logs can seed the
+  router (latencies and probes), so a model called once per run (the
+  final summary) is judged from data.
+- Every routing choice is recorded with its latency and token usage, and
+  summarized per model and per section in ``routing.json``, to tune the
+  tiers and SLOs from data.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from src.reporting.artifacts import ArtifactStore
+from src.reporting.writer import atomic_write
+
+ROUTING_LOG_FILENAME = "routing.json"
+
+
+class Route(NamedTuple):
+    """
+    The model chosen for a call, its tier, and why ("policy", "slo_fallback"
+    or "slo_probe").
+    """
+
+    section: str
+    tier: str
+    model: str
+    reason: str
+
+
+class ModelRouter:
+    """
+    Route LLM calls to model tiers by section, with latency-SLO fallback.
+
+    Args:
+        tiers: Tier name -> model name.
+        routes: Section -> tier; other sections use ``default_tier``.
+        default_tier: Tier of the sections missing from ``routes``.
+        fallback_tier: Tier used while another tier's SLO is at risk.
+        slo_s: Tier -> latency SLO in seconds (tiers without one never fall
+            back).
+        percentile: Latency percentile compared with the SLO.
+        min_samples: Latencies of a model needed before its SLO is checked.
+        window: Only the latest ``window`` latencies of a model are used.
+        probe_every: While a tier falls back, every ``probe_every``-th of its
+            calls probes its own model (None: never).
+    """
+
+    def __init__(
+        self,
+        tiers: Dict[str, str],
+        routes: Optional[Dict[str, str]] = None,
+        default_tier: str = "fast",
+        fallback_tier: str = "fast",
+        slo_s: Optional[Dict[str, float]] = None,
+        percentile: float = 90,
+        min_samples: int = 3,
+        window: int = 20,
+        probe_every: Optional[int] = 5,
+    ):
+        self.routes = dict(routes or {})
+        self.slo_s = dict(slo_s or {})
+        used = {default_tier, fallback_tier, *self.routes.values(), *self.slo_s}
+        unknown = sorted(used - set(tiers))
+        if unknown:
+            raise ValueError(
+                f"Unknown model tiers {unknown}. Available: {list(tiers.keys())}"
+            )
+        self.tiers = dict(tiers)
+        self.default_tier = default_tier
+        self.fallback_tier = fallback_tier
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.probe_every = probe_every
+        self.latencies: Dict[str, Deque[float]] = {}
+        # Tier -> calls fallen back since its model was last called
+        self.fallbacks: Dict[str, int] = {}
+        self.calls: List[dict] = []
+        self._lock = threading.Lock()
+
+    def seed(self, calls: Iterable[dict]):
+        """Replay the calls of a previous routing log: latencies, fallbacks, probes."""
+        for call in calls:
+            section = call.get("section")
+            reason = call.get("reason", "policy")
+            tier = call.get("tier")
+            with self._lock:
+                if section is not None:
+                    routed = self.routes.get(section, self.default_tier)
+                    self.fallbacks[routed] = (
+                        self.fallbacks.get(routed, 0) + 1
+                        if reason == "slo_fallback"
+                        else 0
+                    )
+            if call.get("ok", True):
+                self._observe(call["model"], call["latency_s"], reason, tier)
+
+    def _observe(
+        self,
+        model: str,
+        latency_s: float,
+        reason: str = "policy",
+        tier: Optional[str] = None,
+    ):
+        slo = self.slo_s.get(tier)
+        with self._lock:
+            latencies = self.latencies.setdefault(model, deque(maxlen=self.window))
+            if reason == "slo_probe" and slo is not None and latency_s <= slo:
+                # The model is within its SLO again: judge it from here on
+                latencies.clear()
+            latencies.append(latency_s)
+
+    def latency_percentile(self, model: str) -> Optional[float]:
+        """Recent latency percentile of a model, or None with too few samples."""
+        with self._lock:
+            latencies = list(self.latencies.get(model, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        return float(np.percentile(latencies, self.percentile))
+
+    def slo_at_risk(self, tier: str) -> bool:
+        """Whether the recent latencies of a tier's model exceed its SLO."""
+        slo = self.slo_s.get(tier)
+        if slo is None:
+            return False
+        latency = self.latency_percentile(self.tiers[tier])
+        return latency is not None and latency > slo
+
+    def choose(self, section: str) -> Route:
+        """The model of the next call of ``section``."""
+        tier = self.routes.get(section, self.default_tier)
+        if tier != self.fallback_tier and self.slo_at_risk(tier):
+            with self._lock:
+                waited = self.fallbacks.get(tier, 0) + 1
+                probe = self.probe_every is not None and waited >= self.probe_every
+                self.fallbacks[tier] = 0 if probe else waited
+            if probe:
+                return Route(section, tier, self.tiers[tier], "slo_probe")
+            fallback = self.fallback_tier
+            return Route(section, fallback, self.tiers[fallback], "slo_fallback")
+        with self._lock:
+            self.fallbacks[tier] = 0
+        return Route(section, tier, self.tiers[tier], "policy")
+
+    def record(
+        self,
+        route: Route,
+        latency_s: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        ok: bool = True,
+    ):
+        """Record the outcome of a routed call (failed calls do not count toward the SLO)."""
+        if ok:
+            self._observe(route.model, latency_s, route.reason, route.tier)
+        with self._lock:
+            self.calls.append(
+                {
+                    **route._asdict(),
+                    "latency_s": round(latency_s, 4),
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "ok": ok,
+                }
+            )
+
+    @staticmethod
+    def _stats(calls: List[dict]) -> dict:
+        latencies = [c["latency_s"] for c in calls if c["ok"]]
+        return {
+            "calls": len(calls),
+            "errors": sum(not c["ok"] for c in calls),
+            "slo_fallbacks": sum(c["reason"] == "slo_fallback" for c in calls),
+            "slo_probes": sum(c["reason"] == "slo_probe" for c in calls),
+            "input_tokens": sum(c["input_tokens"] for c in calls),
+            "output_tokens": sum(c["output_tokens"] for c in calls),
+            "latency_mean_s": (
+                round(float(np.mean(latencies)), 4) if latencies else None
+            ),
+            "latency_p50_s": (
+                round(float(np.percentile(latencies, 50)), 4) if latencies else None
+            ),
+            "latency_p90_s": (
+                round(float(np.percentile(latencies, 90)), 4) if latencies else None
+            ),
+        }
+
+    def summary(self) -> dict:
+        """The policy, and the latency and tokens per model and per section."""
+        with self._lock:
+            calls = list(self.calls)
+        by_model: Dict[str, List[dict]] = {}
+        by_section: Dict[str, Dict[str, List[dict]]] = {}
+        for call in calls:
+            by_model.setdefault(call["model"], []).append(call)
+            by_section.setdefault(call["section"], {}).setdefault(
+                call["model"], []
+            ).append(call)
+        return {
+            "policy": {
+                "tiers": self.tiers,
+                "routes": self.routes,
+                "default_tier": self.default_tier,
+                "fallback_tier": self.fallback_tier,
+                "slo_s": self.slo_s,
+                "percentile": self.percentile,
+                "probe_every": self.probe_every,
+            },
+            "models": {model: self._stats(c) for model, c in by_model.items()},
+            "sections": {
+                section: {model: self._stats(c) for model, c in models.items()}
+                for section, models in by_section.items()
+            },
+            "calls": calls,
+        }
+
+    def save(self, path: str) -> str:
+        """Write the routing summary and log as JSON."""
+        atomic_write(path, json.dumps(self.summary(), indent=2))
+        return path
+
+
+def tiered_router(
+    fast_model: str,
+    strong_model: str,
+    strong_sections: Iterable[str] = ("combine",),
+    strong_slo_s: Optional[float] = None,
+    **kwargs,
+) -> ModelRouter:
+    """
+    Two-tier router: ``strong_sections`` on the strong model, everything
+    else on the fast one, with the fast model as the SLO fallback.
+    """
+    return ModelRouter(
+        tiers={"fast": fast_model, "strong": strong_model},
+        routes={section: "strong" for section in strong_sections},
+        default_tier="fast",
+        fallback_tier="fast",
+        slo_s={} if strong_slo_s is None else {"strong": strong_slo_s},
+        **kwargs,
+    )
+
+
+def load_routing_history(
+    reports_root: str, current_dir: str, max_runs: int = 5
+) -> List[dict]:
+    """
+    Routed calls of the newest previous runs with a routing log.
+
+    Args:
+        reports_root: Folder of the run folders.
+        current_dir: Folder of the current run (skipped).
+        max_runs: Number of previous runs to read.
+
+    Returns:
+        list[dict]: Their calls, oldest first (empty if there is no log).
+    """
+    current = os.path.abspath(current_dir)
+    paths = [
+        os.path.join(run, ROUTING_LOG_FILENAME)
+        for run in ArtifactStore(reports_root).run_dirs()
+        if os.path.abspath(run) != current
+        and os.path.isfile(os.path.join(run, ROUTING_LOG_FILENAME))
+    ]
+    calls = []
+    for path in paths[-max_runs:]:
+        with open(path, encoding="utf-8") as f:
+            calls.extend(json.load(f).get("calls", []))
+    return calls
@@ -0,0 +1,178 @@
+"""
+Payload serializers for embedding summary data in LLM prompts.
+
+Pretty-printed JSON spends most of its tokens on indentation and on keys
+repeated for every record (``"Model"``/``"Total_Sales"``). This module offers
+interchangeable, lossless formats for the summary payloads of
+``LLMReportAgent``:
+
+- ``json``: pretty-printed JSON (the original prompt format).
+- ``minjson``: JSON without whitespace.
+- ``csv``: one long CSV table; nesting keys become leading columns.
+- ``matrix``: wide CSV tables; the innermost key (e.g. Year) becomes the
+  columns, so a year × model summary is one row per model.
+
+Nested dicts whose branches have different shapes (e.g. the sales summary's
+``sales_by_year`` and ``sales_by_region_year``) are emitted as one titled table
+per top-level key. DataFrames are written as CSV in both tabular formats.
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Optional, Sequence, Union
+
+import pandas as pd
+
+from src.llm.utils import estimate_tokens
+
+FORMATS = ("json", "minjson", "csv", "matrix")
+
+Levels = Optional[Union[Sequence[str], Dict[str, Sequence[str]]]]
+
+
+def _flatten(obj, path=()):
+    """Yield (path, record) pairs; scalar leaves become {"Value": leaf}."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield from _flatten(value, path + (key,))
+    elif isinstance(obj, list) and all(isinstance(item, dict) for item in obj):
+        for record in obj:
+            yield path, record
+    else:
+        yield path, {"Value": obj}
+
+
+def _depths(obj) -> set:
+    return {len(path) for path, _ in _flatten(obj)}
+
+
+def _to_csv(rows: list, header: list) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().rstrip("\n")
+
+
+def _long_table(obj, levels: Sequence[str]) -> pd.DataFrame:
+    """Flatten a uniformly nested payload into one long DataFrame."""
+    rows = []
+    for path, record in _flatten(obj):
+        row = dict(zip(levels, path))
+        row.update(record)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _level_names(depth: int, levels: Optional[Sequence[str]]) -> list:
+    names = list(levels or [])[:depth]
+    return names + [f"Key{i + 1}" for i in range(len(names), depth)]
+
+
+class PayloadSerializer:
+    """
+    Serialize prompt payloads in one of the ``FORMATS``.
+
+    Args:
+        fmt: Output format name.
+    """
+
+    def __init__(self, fmt: str = "csv"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown payload format '{fmt}'. Available: {FORMATS}")
+        self.fmt = fmt
+
+    @property
+    def language(self) -> str:
+        """Markdown code-fence language of the serialized payload."""
+        return "json" if self.fmt in ("json", "minjson") else "csv"
+
+    def serialize(self, payload, levels: Levels = None) -> str:
+        """
+        Serialize a summary dict or DataFrame.
+
+        Args:
+            payload: Nested summary dict (or list of records), or a DataFrame.
+            levels: Names of the nesting levels used as column headers, e.g.
+                ("Region", "Year"); or a dict of such names per top-level key
+                for payloads with differently shaped branches.
+
+        Returns:
+            str: The serialized payload.
+        """
+        if isinstance(payload, pd.DataFrame):
+            if self.fmt in ("json", "minjson"):
+                payload = payload.to_dict()
+            else:
+                return payload.to_csv(float_format="%.6g").rstrip("\n")
+
+        if self.fmt == "json":
+            return json.dumps(payload, indent=2, default=str)
+        if self.fmt == "minjson":
+            return json.dumps(payload, separators=(",", ":"), default=str)
+
+        depths = _depths(payload)
+        if isinstance(payload, dict) and len(depths) > 1:
+            # Differently shaped branches: one titled table per top-level key
+            blocks = []
+            for key, value in payload.items():
+                sub_levels = levels.get(key) if isinstance(levels, dict) else None
+                blocks.append(f"# {key}\n{self.serialize(value, sub_levels)}")
+            return "\n\n".join(blocks)
+
+        if isinstance(levels, dict):
+            levels = None
+        names = _level_names(max(depths, default=0), levels)
+        table = _long_table(payload, names)
+
+        if self.fmt == "matrix" and names:
+            table = self._pivot(table, names)
+
+        return _to_csv(table.itertuples(index=False), list(table.columns))
+
+    @staticmethod
+    def _pivot(table: pd.DataFrame, names: list) -> pd.DataFrame:
+        """
+        Spread the innermost nesting level over the columns.
+
+        A (label, value) record such as {"Model", "Total_Sales"} keeps its label
+        as a row key; rows and columns keep their first-seen order, so rankings
+        in the source lists survive the pivot.
+        """
+        fields = [c for c in table.columns if c not in names]
+        if len(fields) > 2:
+            # Records with several values do not fit a single matrix
+            return table
+
+        value = fields[-1]
+        column = names[-1]
+        row_keys = names[:-1] + fields[:-1]
+        columns = list(dict.fromkeys(table[column]))
+
+        if row_keys:
+            wide = table.set_index(row_keys + [column])[value].unstack(column)
+            rows = table[row_keys].drop_duplicates()
+            if len(row_keys) > 1:
+                wide = wide.reindex(pd.MultiIndex.from_frame(rows))
+            else:
+                wide = wide.reindex(rows[row_keys[0]])
+            wide = wide[columns]
+        else:
+            wide = table.set_index(column)[[value]].T[columns]
+
+        if pd.api.types.is_integer_dtype(table[value]):
+            # Missing cells would otherwise turn integer sales into floats
+            wide = wide.astype("Int64")
+
+        wide = wide.reset_index(drop=not row_keys)
+        wide.columns = [str(c) for c in wide.columns]
+        return wide.astype(object).where(wide.notna(), "")
+
+
+def compare_formats(payload, levels: Levels = None) -> Dict[str, int]:
+    """Return the estimated token count of the payload in every format."""
+    return {
+        fmt: estimate_tokens(PayloadSerializer(fmt).serialize(payload, levels))
+        for fmt in FORMATS
+    }
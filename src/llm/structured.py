@@ -0,0 +1,264 @@
+"""
+Structured (JSON-schema) section answers, rendered to markdown locally.
+
+By default every section call asks the LLM for the complete markdown of
+the section: headings, image embeds and boilerplate the pipeline already
+knows. In structured mode (``STRUCTURED_OUTPUT`` in ``src.config``) the
+agent asks instead for a compact JSON object, through the SDK's structured
+output (``response_mime_type="application/json"`` with a
+``response_json_schema``):
+
+    {"parts": [{"heading": ..., "summary": ..., "findings": [...],
+                "figures": [...]}]}
+
+with one part per heading of the section; headings and figure filenames
+are restricted to the known ones by enums. ``render_section`` renders the
+markdown locally from templates: each heading, the figures the part
+references embedded before its text, the summary paragraph and the
+findings as bullets. A figure no part references is embedded in the part
+it is assigned to (``SectionPart.figures``), so every plot appears.
+
+A part without summary and findings renders as a heading with nothing
+under it; validation reports it (``require_text``), so hedging retries the
+call and the targeted repair asks for its text. ``update_answer`` writes
+the repaired text back into the answer, which stays in sync with the
+report.
+
+The model only writes the analysis, so output tokens and generation
+latency drop, and the answers (saved to ``section_answers.json``) can be
+cached and diffed between runs.
+"""
+
+import json
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from google.genai import types
+
+from src.llm.validation import heading_texts
+
+# At most this many findings (bullets) per part
+MAX_FINDINGS = 6
+
+PART_TEMPLATE = "## {heading}\n\n{figures}{summary}{findings}"
+FIGURE_TEMPLATE = "![{alt}](figures/{name})\n\n"
+FINDING_TEMPLATE = "- {finding}"
+_FINDING_PREFIX = "- "
+
+# Layout instructions replacing the markdown ones in structured prompts
+STRUCTURED_RULES = (
+    "- Answer with the JSON object of the response schema: one part per "
+    "section heading, with a short summary paragraph and at most "
+    f"{MAX_FINDINGS} findings.\n"
+    "- List in `figures` the plot filenames a part discusses; the plots are "
+    "embedded before its text automatically.\n"
+    "- Plain text only: no markdown headings or image embeds.\n"
+)
+STRUCTURED_FINAL_INSTRUCTION = "Now produce ONLY the JSON object.\n"
+
+_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class SectionPart(NamedTuple):
+    """A heading of a structured section and the figures placed under it."""
+
+    heading: str
+    figures: Tuple[str, ...] = ()
+
+
+def default_parts(
+    headings: Sequence[str], figures: Sequence[str]
+) -> Tuple[SectionPart, ...]:
+    """
+    One part per heading, with the figures spread over them in order.
+
+    The first heading gets the first figures, so a plot is placed before
+    the analysis of its part.
+    """
+    assigned: List[List[str]] = [[] for _ in headings]
+    for idx, name in enumerate(figures):
+        assigned[idx * len(headings) // len(figures)].append(name)
+    return tuple(
+        SectionPart(heading, tuple(names)) for heading, names in zip(headings, assigned)
+    )
+
+
+def response_schema(parts: Sequence[SectionPart]) -> dict:
+    """JSON schema of the structured answer of a section."""
+    figures = list(dict.fromkeys(name for part in parts for name in part.figures))
+    part_schema = {
+        "type": "object",
+        "properties": {
+            "heading": {"type": "string", "enum": [part.heading for part in parts]},
+            "summary": {"type": "string"},
+            "findings": {
+                "type": "array",
+                "items": {"type": "string"},
+                "maxItems": MAX_FINDINGS,
+            },
+            "figures": {
+                "type": "array",
+                "items": {"type": "string", "enum": figures},
+            },
+        },
+        "required": ["heading", "summary", "findings", "figures"],
+    }
+    if not figures:
+        # Sections without plots (the executive summary)
+        del part_schema["properties"]["figures"]
+        part_schema["required"].remove("figures")
+    return {
+        "type": "object",
+        "properties": {"parts": {"type": "array", "items": part_schema}},
+        "required": ["parts"],
+    }
+
+
+def structured_config(parts: Sequence[SectionPart]) -> types.GenerateContentConfig:
+    """Generation config requesting a JSON answer of ``response_schema(parts)``."""
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_json_schema=response_schema(parts),
+    )
+
+
+def parse_answer(text: str) -> Optional[dict]:
+    """
+    Parse a structured answer.
+
+    Returns:
+        dict: The answer, or None if ``text`` is not a JSON object with a
+        list of parts (e.g. a truncated answer).
+    """
+    try:
+        answer = json.loads(_FENCE_PATTERN.sub("", text.strip()))
+    except ValueError:
+        return None
+    if not isinstance(answer, dict) or not isinstance(answer.get("parts"), list):
+        return None
+    return answer
+
+
+def _plain(text) -> str:
+    """Answer text on one line (no stray newlines breaking the markdown)."""
+    return " ".join(str(text).split())
+
+
+def render_section(answer: dict, parts: Sequence[SectionPart]) -> str:
+    """
+    Render a structured answer to section markdown.
+
+    Args:
+        answer: Parsed answer (see ``parse_answer``).
+        parts: The section's parts, in report order; answer parts with an
+            unknown heading are ignored, and missing ones rendered with their
+            heading and figures only.
+
+    Returns:
+        str: The section markdown.
+    """
+    headings = {part.heading for part in parts}
+    by_heading: Dict[str, dict] = {}
+    for item in answer.get("parts", []):
+        if isinstance(item, dict) and item.get("heading") in headings:
+            by_heading.setdefault(item["heading"], item)
+
+    known = {name for part in parts for name in part.figures}
+    referenced = {
+        part.heading: [name for name in item.get("figures") or [] if name in known]
+        for part in parts
+        for item in [by_heading.get(part.heading, {})]
+    }
+    # Figures no part references stay in the part they are assigned to
+    unreferenced = known - {name for names in referenced.values() for name in names}
+
+    placed = set()
+    blocks = []
+    for part in parts:
+        item = by_heading.get(part.heading, {})
+        figures = []
+        for name in referenced[part.heading] + [
+            name for name in part.figures if name in unreferenced
+        ]:
+            if name not in placed:
+                placed.add(name)
+                figures.append(name)
+
+        summary = _plain(item.get("summary", ""))
+        findings = [_plain(f) for f in item.get("findings") or [] if _plain(f)]
+        blocks.append(
+            PART_TEMPLATE.format(
+                heading=part.heading,
+                figures="".join(
+                    FIGURE_TEMPLATE.format(
+                        alt=name.rsplit(".", 1)[0].replace("_", " "), name=name
+                    )
+                    for name in figures
+                ),
+                summary=summary + ("\n\n" if summary and findings else ""),
+                findings="\n".join(
+                    FINDING_TEMPLATE.format(finding=f) for f in findings
+                ),
+            ).rstrip()
+        )
+    return "\n\n".join(blocks)
+
+
+def _text_fields(text: str) -> Tuple[str, List[str]]:
+    """Summary and findings of the text of a rendered part."""
+    lines = text.splitlines()
+    findings = [
+        line[len(_FINDING_PREFIX) :]
+        for line in lines
+        if line.startswith(_FINDING_PREFIX)
+    ]
+    summary = " ".join(line for line in lines if not line.startswith(_FINDING_PREFIX))
+    return _plain(summary), [_plain(f) for f in findings]
+
+
+def update_answer(answer: dict, markdown: str, parts: Sequence[SectionPart]) -> dict:
+    """
+    The answer with the text of the section's markdown after a repair.
+
+    Every part whose text in ``markdown`` differs from what the answer
+    renders takes the summary and findings of the markdown; a part missing
+    from the answer is added.
+
+    Args:
+        answer: Parsed answer the section was rendered from.
+        markdown: The section markdown after the repair.
+        parts: The section's parts.
+
+    Returns:
+        dict: A new answer (``answer`` is not modified).
+    """
+    texts = heading_texts(markdown, [part.heading for part in parts])
+    items = [dict(item) if isinstance(item, dict) else item for item in answer["parts"]]
+    by_heading: Dict[str, dict] = {}
+    for item in items:
+        if isinstance(item, dict) and item.get("heading") in texts:
+            by_heading.setdefault(item["heading"], item)
+
+    for part in parts:
+        if part.heading not in texts:
+            continue
+        summary, findings = _text_fields(texts[part.heading])
+        item = by_heading.get(part.heading)
+        if item is None:
+            if summary or findings:
+                items.append(
+                    {
+                        "heading": part.heading,
+                        "summary": summary,
+                        "findings": findings,
+                        "figures": [],
+                    }
+                )
+            continue
+        current = (
+            _plain(item.get("summary", "")),
+            [_plain(f) for f in item.get("findings") or [] if _plain(f)],
+        )
+        if (summary, findings) != current:
+            item.update(summary=summary, findings=findings)
+    return dict(answer, parts=items)
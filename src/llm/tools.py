@@ -2,19 +2,38 @@
 PlotTool module: Provides plotting functions for BMW sales data analysis.
 
 Includes line plots for sales by year, by region, model sales over years,
-region-specific model performance, and correlation heatmaps.
+region-specific model performance, correlation heatmaps and XGBoost
+feature importances.
 
 Designed for easy invocation by name and integration with LLM-based workflows.
+Every generated plot is registered with a caption (figure filename -> caption),
+which the report builder uses to number and caption figures locally.
+With a ``figure_cache`` (see ``src.reporting.incremental``) a plot whose data,
+renderer settings and plotting code are unchanged since the previous run is
+copied from it instead of drawn again.
 """
 
 import os
+from src.plotting import plot_functions, renderer
 from src.plotting.plot_functions import (
     plot_sales_by_year,
     plot_regions,
     plot_models_over_years,
     plot_models_by_region_over_years,
     plot_correlation_vector,
+    plot_feature_importance,
 )
+from src.reporting.incremental import fingerprint, source_fingerprint
+
+# Plots are redrawn when the plotting code changes
+PLOT_CODE_VERSION = source_fingerprint(plot_functions, renderer)
+
+
+def figure_version() -> str:
+    """Fingerprint of what a figure depends on besides its data: the default
+    renderer's settings and the plotting code."""
+    r = renderer.get_default_renderer()
+    return fingerprint(r.fmt, r.dpi, r.layout, r.png_compress_level, PLOT_CODE_VERSION)
 
 
 class PlotTool:
@@ -30,6 +49,38 @@ class PlotTool:
             "sales_by_region_year": plot_regions,
             # region-specific multi-plot handled separately
         }
+        # Captions of the simple plot types
+        self.plot_captions = {
+            "sales_by_year": "Total BMW sales volume by year",
+            "sales_by_region_year": "BMW sales volume by region and year",
+        }
+        # figure filename -> caption of every plot generated so far
+        self.captions = {}
+        # RunCache of a differential re-run, or None to always draw
+        self.figure_cache = None
+
+    def _register(self, path: str, caption: str) -> str:
+        """Record the caption of a generated plot and return its path."""
+        self.captions[os.path.basename(path)] = caption
+        return path
+
+    def _draw(self, key: tuple, out_dir: str, draw) -> str:
+        """
+        Draw a plot, or copy it from the previous run if its inputs are unchanged.
+
+        Args:
+            key: Plot kind and data the figure depends on.
+            out_dir: Directory of the figure.
+            draw: Callable drawing the figure and returning its path.
+        """
+        if self.figure_cache is None:
+            return draw()
+        data_key = fingerprint(key)
+        path = self.figure_cache.reuse_figure(data_key, out_dir)
+        if path is None:
+            path = draw()
+            self.figure_cache.add_figure(data_key, path)
+        return path
 
     def generate_plot(self, plot_type: str, data: dict, out_dir: str) -> str:
         """
@@ -44,9 +95,12 @@ class PlotTool:
         plot_func = self.plot_functions[plot_type]
 
         try:
-            return plot_func(data, out_dir)
+            path = self._draw(
+                (plot_type, data), out_dir, lambda: plot_func(data, out_dir)
+            )
         except Exception as e:
             raise RuntimeError(f"Plot generation failed for '{plot_type}': {e}") from e
+        return self._register(path, self.plot_captions[plot_type])
 
     def generate_models_over_years_plot(
         self, year_models_summary: dict, out_dir: str, title_prefix: str = "All Regions"
@@ -73,9 +127,18 @@ class PlotTool:
         """
         os.makedirs(out_dir, exist_ok=True)
         try:
-            return plot_models_over_years(year_models_summary, out_dir, title_prefix)
+            path = self._draw(
+                ("models_over_years", year_models_summary, title_prefix),
+                out_dir,
+                lambda: plot_models_over_years(
+                    year_models_summary, out_dir, title_prefix
+                ),
+            )
         except Exception as e:
             raise RuntimeError(f"Models-over-years plot generation failed: {e}") from e
+        return self._register(
+            path, f"Sales volume of each BMW model over the years ({title_prefix})"
+        )
 
     def generate_region_model_plots(
         self, region_models_summary: dict, out_dir: str
@@ -105,12 +168,18 @@ class PlotTool:
                 print(f"Skipping region '{region}' due to empty data.")
                 continue
             try:
-                path = plot_models_by_region_over_years(
-                    year_dict,  # per-year model data
-                    out_dir,  # output directory
-                    region,  # region name
+                path = self._draw(
+                    ("models_by_region", year_dict, region),
+                    out_dir,
+                    lambda: plot_models_by_region_over_years(
+                        year_dict,  # per-year model data
+                        out_dir,  # output directory
+                        region,  # region name
+                    ),
+                )
+                output_paths[region] = self._register(
+                    path, f"Sales volume of each BMW model over the years in {region}"
                 )
-                output_paths[region] = path
 
             except Exception as e:
                 raise RuntimeError(
@@ -125,9 +194,31 @@ class PlotTool:
         """
         os.makedirs(out_dir, exist_ok=True)
         try:
-            return plot_correlation_vector(data, out_dir)
+            path = self._draw(
+                ("correlation", data),
+                out_dir,
+                lambda: plot_correlation_vector(data, out_dir),
+            )
         except Exception as e:
             raise RuntimeError(f"Correlation matrix plot generation failed: {e}") from e
+        return self._register(path, "Correlation of each feature with sales volume")
+
+    def generate_feature_importance_plot(self, importance_df, out_dir: str) -> str:
+        """
+        Generate the XGBoost feature importance plot separately.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        try:
+            path = self._draw(
+                ("feature_importance", importance_df),
+                out_dir,
+                lambda: plot_feature_importance(importance_df, out_dir),
+            )
+        except Exception as e:
+            raise RuntimeError(f"Feature importance plot generation failed: {e}") from e
+        return self._register(
+            path, "XGBoost feature importance (gain) for predicting sales volume"
+        )
 
     def generate_all(self, summary: dict, out_dir: str) -> dict:
         """
@@ -142,7 +233,9 @@ class PlotTool:
                     print(f"Skipping '{plot_type}' – missing data in summary.")
                     continue
 
-                paths[plot_type] = plot_func(data, out_dir)
+                paths[plot_type] = self._register(
+                    plot_func(data, out_dir), self.plot_captions[plot_type]
+                )
             except Exception as e:
                 raise RuntimeError(
                     f"Warning: Failed to generate '{plot_type}': {e}"
@@ -0,0 +1,253 @@
+"""
+Token and cost accounting for the LLM calls of a report run.
+
+``UsageTracker`` reads the usage metadata of every ``generate_content``
+response (falling back to the local estimator when a backend reports none),
+aggregates it per report section and per run, and prices it with a
+per-model price table. It also enforces an optional token budget before a
+call is sent: an over-budget prompt either aborts the run or is replaced by
+a compacted prompt supplied by the caller. An admitted prompt reserves its
+estimated tokens until its response is recorded (or the call fails), so
+concurrent calls cannot all be admitted against the same remaining budget.
+"""
+
+import json
+import threading
+from typing import Callable, Dict, List, Optional
+
+from src.llm.utils import estimate_tokens
+from src.reporting.writer import atomic_write
+
+# USD per 1M tokens (output includes thinking tokens); update when prices change
+DEFAULT_PRICES = {
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.00},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-flash-lite": {"input": 0.10, "output": 0.40},
+}
+
+BUDGET_MODES = ("abort", "compact")
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """Raised when a prompt would exceed the run's token budget."""
+
+
+def _empty_totals() -> dict:
+    return {
+        "calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "estimated_calls": 0,
+        "cost_usd": 0.0,
+    }
+
+
+class UsageTracker:
+    """
+    Aggregate token usage and cost per section and per run.
+
+    Args:
+        budget_tokens: Maximum input + output tokens of the run, or None.
+        budget_mode: "abort" raises TokenBudgetExceeded when a prompt does not
+            fit the remaining budget; "compact" first tries the caller's
+            compacted prompt and only raises if that does not fit either.
+        reserve_output_tokens: Output tokens assumed per call when checking
+            the budget before the response is known.
+        prices: USD per 1M input/output tokens per model name.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: Optional[int] = None,
+        budget_mode: str = "abort",
+        reserve_output_tokens: int = 2000,
+        prices: Optional[Dict[str, dict]] = None,
+    ):
+        if budget_mode not in BUDGET_MODES:
+            raise ValueError(
+                f"Unknown budget mode '{budget_mode}'. Available: {BUDGET_MODES}"
+            )
+        self.budget_tokens = budget_tokens
+        self.budget_mode = budget_mode
+        self.reserve_output_tokens = reserve_output_tokens
+        self.prices = DEFAULT_PRICES if prices is None else prices
+        self.sections: Dict[str, dict] = {}
+        self.compacted = []
+        # Tokens reserved by the admitted prompts still in flight
+        self._reservations: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _used(self) -> int:
+        return sum(
+            s["input_tokens"] + s["output_tokens"] for s in self.sections.values()
+        )
+
+    @property
+    def used_tokens(self) -> int:
+        """Input + output tokens recorded so far."""
+        with self._lock:
+            return self._used()
+
+    @property
+    def reserved_tokens(self) -> int:
+        """Tokens reserved by admitted calls whose response is not recorded yet."""
+        with self._lock:
+            return sum(sum(r) for r in self._reservations.values())
+
+    def _reserve(self, prompt: str, needed: int) -> Optional[int]:
+        """
+        Reserve ``needed`` tokens for ``prompt`` if they fit the budget.
+
+        Returns:
+            int: None if reserved, else the tokens remaining.
+        """
+        with self._lock:
+            reserved = sum(sum(r) for r in self._reservations.values())
+            remaining = self.budget_tokens - self._used() - reserved
+            if needed > remaining:
+                return remaining
+            self._reservations.setdefault(prompt, []).append(needed)
+            return None
+
+    def _settle(self, prompt: str):
+        """Drop one reservation of ``prompt`` (call with the lock held)."""
+        reservations = self._reservations.get(prompt)
+        if reservations:
+            reservations.pop()
+            if not reservations:
+                del self._reservations[prompt]
+
+    def release(self, prompt: str):
+        """Release the reservation of an admitted prompt (e.g. its call failed)."""
+        with self._lock:
+            self._settle(prompt)
+
+    def admit(
+        self, section: str, prompt: str, compact: Optional[Callable[[], str]] = None
+    ) -> str:
+        """
+        Check a prompt against the budget before it is sent.
+
+        The remaining budget excludes the tokens recorded so far and those
+        reserved by the calls in flight. The admitted prompt reserves its
+        estimated input tokens plus ``reserve_output_tokens`` until
+        ``record`` (or ``release``) is called with it.
+
+        Args:
+            section: Report section the prompt belongs to.
+            prompt: Prompt about to be sent.
+            compact: Optional callable returning a smaller prompt for the same
+                section, used in "compact" mode when the prompt does not fit.
+
+        Returns:
+            str: The prompt to send (the original or the compacted one).
+
+        Raises:
+            TokenBudgetExceeded: If no admissible prompt fits the budget.
+        """
+        if self.budget_tokens is None:
+            return prompt
+
+        needed = estimate_tokens(prompt) + self.reserve_output_tokens
+        remaining = self._reserve(prompt, needed)
+        if remaining is None:
+            return prompt
+
+        if self.budget_mode == "compact" and compact is not None:
+            compacted = compact()
+            compact_needed = estimate_tokens(compacted) + self.reserve_output_tokens
+            compact_remaining = self._reserve(compacted, compact_needed)
+            if compact_remaining is None:
+                print(
+                    f"Token budget: compacted the '{section}' prompt "
+                    f"({needed} -> {compact_needed} tokens)."
+                )
+                with self._lock:
+                    self.compacted.append(section)
+                return compacted
+            needed, remaining = compact_needed, compact_remaining
+
+        raise TokenBudgetExceeded(
+            f"Section '{section}' needs ~{needed} tokens but only {remaining} of "
+            f"the {self.budget_tokens} token budget remain."
+        )
+
+    def record(self, section: str, model: str, prompt: str, response, text: str):
+        """
+        Add the usage of one response (or its local estimate) to the totals,
+        settling the reservation of its prompt.
+
+        Returns:
+            (input tokens, output tokens) of the call.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        input_tokens = getattr(usage, "prompt_token_count", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+        estimated = input_tokens is None or output_tokens is None
+
+        if input_tokens is None:
+            input_tokens = estimate_tokens(prompt)
+        if output_tokens is None:
+            output_tokens = estimate_tokens(text)
+        # Thinking tokens are billed as output
+        output_tokens += getattr(usage, "thoughts_token_count", None) or 0
+
+        with self._lock:
+            self._settle(prompt)
+            totals = self.sections.setdefault(section, _empty_totals())
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["output_tokens"] += output_tokens
+            totals["estimated_calls"] += int(estimated)
+            totals["cost_usd"] += self.cost(model, input_tokens, output_tokens)
+        return input_tokens, output_tokens
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """USD cost of a call (0 for models missing from the price table)."""
+        price = self.prices.get(model)
+        if price is None:
+            return 0.0
+        return (input_tokens * price["input"] + output_tokens * price["output"]) / 1e6
+
+    def summary(self) -> dict:
+        """Per-section and per-run totals, plus the budget state."""
+        with self._lock:
+            sections = {
+                name: {**totals, "cost_usd": round(totals["cost_usd"], 6)}
+                for name, totals in self.sections.items()
+            }
+        run = _empty_totals()
+        for totals in sections.values():
+            for key in run:
+                run[key] += totals[key]
+        run["cost_usd"] = round(run["cost_usd"], 6)
+        run["total_tokens"] = run["input_tokens"] + run["output_tokens"]
+
+        return {
+            "sections": sections,
+            "run": run,
+            "budget": {
+                "tokens": self.budget_tokens,
+                "mode": self.budget_mode,
+                "compacted_sections": list(self.compacted),
+            },
+        }
+
+    def save(self, path: str) -> str:
+        """Write the usage summary as JSON."""
+        atomic_write(path, json.dumps(self.summary(), indent=2))
+        return path
+
+    def table(self) -> str:
+        """Plain-text table of tokens and cost per section and for the run."""
+        summary = self.summary()
+        rows = list(summary["sections"].items()) + [("total", summary["run"])]
+        lines = [
+            f"{'section':<22}{'calls':>6}{'input':>10}{'output':>10}{'cost $':>11}"
+        ]
+        for name, totals in rows:
+            lines.append(
+                f"{name:<22}{totals['calls']:>6}{totals['input_tokens']:>10}"
+                f"{totals['output_tokens']:>10}{totals['cost_usd']:>11.4f}"
+            )
+        return "\n".join(lines)
@@ -1,11 +1,46 @@
 """
-Spinner module: Implements a simple console spinner for indicating progress
-during long-running tasks.
+Utility module: Implements a simple console spinner for indicating progress
+during long-running tasks, a local prompt token estimator, and a stage
+timer for recording the wall time (and optionally the peak memory and RSS) of
+pipeline steps.
 """
 
+import json
+import math
+import re
+import resource
 import threading
 import time
 import sys
+import tracemalloc
+from contextlib import contextmanager
+
+from src.reporting.writer import atomic_write
+
+# Words (letters of any script), digit runs, single punctuation marks and line
+# breaks (with indentation)
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d+|\n[ \t]*|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a text, without a network call.
+
+    Approximates subword tokenizers: words count one token per 4 letters,
+    digit runs one per 3 digits, and each punctuation mark or line break
+    (including its indentation) one token. Good enough to compare prompt
+    formats and budgets; use the API's usage metadata for exact counts.
+    """
+    total = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        piece = match.group()
+        if piece[0].isalpha():
+            total += math.ceil(len(piece) / 4)
+        elif piece[0].isdigit():
+            total += math.ceil(len(piece) / 3)
+        else:
+            total += 1
+    return total
 
 
 class Spinner:
@@ -38,3 +73,63 @@ class Spinner:
     def stop(self):
         """Stop the spinner animation and print completion message."""
         self.stop_running = True
+
+
+class StageTimer:
+    """
+    Record the wall time of named pipeline stages.
+
+    With ``track_memory`` each stage also records its peak traced memory
+    (``tracemalloc``: Python objects and numpy/pandas buffers) and the
+    process's peak RSS so far (``ru_maxrss``, native memory such as
+    XGBoost's included). The traced peak is a process-wide counter reset at
+    the start of each stage, so stages running concurrently are timed with
+    ``track_memory=False`` and their memory is tracked by one enclosing
+    stage.
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.timings = {}
+        self.peak_memory_mb = {}
+        self.peak_rss_mb = {}
+        self.track_memory = track_memory
+        self._start = time.perf_counter()
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, track_memory: bool = True):
+        """
+        Time the enclosed block as stage ``name`` (also on error).
+
+        Args:
+            name: Stage name.
+            track_memory: False for a stage running concurrently with other
+                stages, whose memory peak cannot be told apart.
+        """
+        track_memory = self.track_memory and track_memory
+        if track_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+            if track_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory_mb[name] = round(peak / 1e6, 1)
+                # ru_maxrss is in KB on Linux
+                rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                self.peak_rss_mb[name] = round(rss_kb / 1e3, 1)
+
+    def save(self, path: str) -> str:
+        """Write the stage timings and the total elapsed time to a JSON file."""
+        payload = {
+            "stages": self.timings,
+            "total_s": round(time.perf_counter() - self._start, 3),
+        }
+        if self.track_memory:
+            payload["peak_memory_mb"] = self.peak_memory_mb
+            payload["peak_rss_mb"] = self.peak_rss_mb
+        atomic_write(path, json.dumps(payload, indent=2))
+        return path
@@ -0,0 +1,337 @@
+"""
+Local validation and targeted repair of section markdown.
+
+Each section request knows what its answer must contain (see
+``LLMRequest``): its required headings and the figures it must embed.
+``validate_markdown`` checks an answer locally for:
+
+- Missing required headings (matched by title, ignoring numbering, heading
+  level and case).
+- Missing figure embeds.
+- Embeds that do not resolve to one of the section's files under
+  ``figures/`` (invented filenames, wrong folders, deleted files).
+- With ``require_text``, required headings with nothing but figure embeds
+  under them (a structured answer part without summary or findings).
+
+Repairs are as small as possible. Broken embeds are fixed without the LLM:
+they are pointed at the missing figures in order, and any left over are
+removed. Only missing headings and missing figure paragraphs go back to the
+LLM, in one short ``repair_prompt`` that asks for just those parts (or the
+text of an empty one).
+``apply_repair`` then splices the answer into the section. The rest of the
+section is never regenerated.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+_EMBED_PATTERN = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)\)")
+_FIGURE_EMBED_PATTERN = re.compile(r"!\[[^\]]*\]\((figures/[^)\s]+)\)")
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+# Leading section numbers such as "2.", "4.1" or "3)"
+_NUMBERING_PATTERN = re.compile(r"^(?:\d+(?:\.\d+)*[.)]?\s+)+")
+# Numbered headings of the repair answer, e.g. "## 2. Regional Sales ..."
+_REPAIR_ITEM_PATTERN = re.compile(r"^#{1,6}\s+(\d+)\.\s")
+
+FIGURES_FOLDER = "figures"
+# Problems only the LLM can repair
+_REPAIR_KINDS = ("missing_heading", "empty_heading", "missing_figure")
+
+
+class Problem(NamedTuple):
+    """A validation failure: its kind and the heading or figure it concerns."""
+
+    # "missing_heading", "empty_heading", "missing_figure" or "unknown_figure"
+    kind: str
+    target: str
+
+
+def embedded_figures(markdown: str) -> List[str]:
+    """Filenames of the figures embedded in markdown, in order, without repeats."""
+    return list(
+        dict.fromkeys(
+            os.path.basename(p) for p in _FIGURE_EMBED_PATTERN.findall(markdown)
+        )
+    )
+
+
+def _title_key(text: str) -> str:
+    """Normalized heading title: no numbering, markup or case."""
+    text = _NUMBERING_PATTERN.sub("", text.strip().strip("*_").strip())
+    return " ".join(text.lower().split())
+
+
+def _heading_lines(markdown: str) -> List[Tuple[int, int, str]]:
+    """(line index, level, title key) of the headings outside code fences."""
+    headings = []
+    in_fence = False
+    for idx, line in enumerate(markdown.splitlines()):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else _HEADING_PATTERN.match(line)
+        if match:
+            headings.append((idx, len(match.group(1)), _title_key(match.group(2))))
+    return headings
+
+
+def _section_end(heading_lines, position: int, n_lines: int) -> int:
+    """Line index after the body of ``heading_lines[position]``."""
+    _, level, _ = heading_lines[position]
+    return next(
+        (idx for idx, lvl, _ in heading_lines[position + 1 :] if lvl <= level),
+        n_lines,
+    )
+
+
+def heading_texts(markdown: str, headings: Iterable[str]) -> Dict[str, str]:
+    """
+    Text under each of ``headings`` present in markdown.
+
+    The body of a heading ends at the next heading of the same or a higher
+    level; figure embeds, sub-headings and blank lines are left out.
+
+    Returns:
+        dict: Heading -> its text lines joined by newlines ("" if it has
+        none); headings missing from the markdown are left out.
+    """
+    lines = markdown.splitlines()
+    heading_lines = _heading_lines(markdown)
+    positions = {key: pos for pos, (_, _, key) in enumerate(heading_lines)}
+    texts = {}
+    for heading in headings:
+        position = positions.get(_title_key(heading))
+        if position is None:
+            continue
+        start = heading_lines[position][0] + 1
+        body = lines[start : _section_end(heading_lines, position, len(lines))]
+        texts[heading] = "\n".join(
+            line.strip()
+            for line in body
+            if line.strip()
+            and not _HEADING_PATTERN.match(line)
+            and not _EMBED_PATTERN.fullmatch(line.strip())
+        )
+    return texts
+
+
+def _resolves(path: str, figures: Sequence[str], figures_dir: Optional[str]) -> bool:
+    """True if an embed path is ``figures/<one of figures>`` (and exists on disk)."""
+    folder, name = os.path.split(path)
+    if folder != FIGURES_FOLDER or name not in figures:
+        return False
+    return figures_dir is None or os.path.exists(os.path.join(figures_dir, name))
+
+
+def validate_markdown(
+    markdown: str,
+    headings: Iterable[str] = (),
+    figures: Iterable[str] = (),
+    figures_dir: Optional[str] = None,
+    require_text: bool = False,
+) -> List[Problem]:
+    """
+    Check a section's markdown against its requirements.
+
+    Args:
+        markdown: Section markdown returned by the LLM.
+        headings: Required headings, e.g. "2. Regional Sales Trend Analysis".
+        figures: Figure filenames the section must embed; no other embeds
+            are allowed.
+        figures_dir: Folder of the figures; if given, embeds must also
+            resolve to existing files.
+        require_text: Whether a required heading with no text under it is
+            a problem.
+
+    Returns:
+        list[Problem]: The problems found, empty if the markdown is valid.
+    """
+    figures = list(figures)
+    headings = list(headings)
+    present = {key for _, _, key in _heading_lines(markdown)}
+    problems = [
+        Problem("missing_heading", heading)
+        for heading in headings
+        if _title_key(heading) not in present
+    ]
+    if require_text:
+        problems.extend(
+            Problem("empty_heading", heading)
+            for heading, text in heading_texts(markdown, headings).items()
+            if not text
+        )
+
+    resolved = set()
+    for _, path in _EMBED_PATTERN.findall(markdown):
+        if _resolves(path, figures, figures_dir):
+            resolved.add(os.path.basename(path))
+        else:
+            problems.append(Problem("unknown_figure", path))
+    problems.extend(
+        Problem("missing_figure", name) for name in figures if name not in resolved
+    )
+    return problems
+
+
+def fix_embeds(markdown: str, problems: List[Problem]) -> Tuple[str, List[Problem]]:
+    """
+    Repair broken embeds locally, without the LLM.
+
+    Broken embeds are pointed at the missing figures in order of
+    appearance. Any broken embeds left over are removed, along with a line
+    that held nothing but the embed.
+
+    Returns:
+        (fixed markdown, problems still left)
+    """
+    unknown = {p.target for p in problems if p.kind == "unknown_figure"}
+    if not unknown:
+        return markdown, problems
+    missing = [p.target for p in problems if p.kind == "missing_figure"]
+
+    def replace(match):
+        alt, path = match.group(1), match.group(2)
+        if path not in unknown:
+            return match.group(0)
+        if missing:
+            return f"![{alt}]({FIGURES_FOLDER}/{missing.pop(0)})"
+        return ""
+
+    lines = []
+    for line in markdown.splitlines():
+        fixed = _EMBED_PATTERN.sub(replace, line)
+        if fixed.strip() or not line.strip():
+            lines.append(fixed)
+
+    remaining = [
+        p
+        for p in problems
+        if p.kind in ("missing_heading", "empty_heading")
+        or (p.kind == "missing_figure" and p.target in missing)
+    ]
+    return "\n".join(lines), remaining
+
+
+def repair_prompt(markdown: str, problems: List[Problem]) -> Optional[str]:
+    """
+    Short prompt asking only for the missing parts of a section.
+
+    Each missing (or empty) heading and each missing figure paragraph is one
+    numbered item; the current section is included as context only.
+
+    Returns:
+        str, or None if nothing needs the LLM.
+    """
+    items = [p for p in problems if p.kind in _REPAIR_KINDS]
+    if not items:
+        return None
+
+    lines = []
+    for idx, problem in enumerate(items, 1):
+        if problem.kind != "missing_figure":
+            lines.append(f"{idx}. {_NUMBERING_PATTERN.sub('', problem.target)}")
+        else:
+            lines.append(f"{idx}. Figure {problem.target}")
+    return (
+        "You are a senior data analyst.\n"
+        "A report section below is missing some parts. Write ONLY the missing parts.\n\n"
+        "### Important Instructions\n"
+        "- Start each part with a markdown heading '## <number>. <title>' "
+        "using the numbers and titles listed below.\n"
+        "- For a 'Figure' part, write 2-3 sentences describing what the figure "
+        "shows; do not embed images.\n"
+        "- Be consistent with the facts stated in the current section.\n"
+        "- Do not repeat the rest of the section.\n\n"
+        "### Sections to Produce\n" + "\n".join(lines) + "\n\n"
+        "### Current Section (context only)\n"
+        f"{markdown}\n\n"
+        "Now produce ONLY the missing parts in markdown.\n"
+    )
+
+
+def _repair_blocks(answer: str, n_items: int) -> List[List[str]]:
+    """Split a repair answer into its numbered parts (body lines per item)."""
+    blocks = [[] for _ in range(n_items)]
+    current = None
+    for line in answer.splitlines():
+        match = _REPAIR_ITEM_PATTERN.match(line)
+        if match and 1 <= int(match.group(1)) <= n_items:
+            current = int(match.group(1)) - 1
+            continue
+        if current is not None:
+            blocks[current].append(line)
+    return blocks
+
+
+def apply_repair(
+    markdown: str,
+    problems: List[Problem],
+    answer: str,
+    headings: Sequence[str] = (),
+) -> str:
+    """
+    Splice the answer to ``repair_prompt`` into the section.
+
+    A missing heading is inserted before the next required heading present
+    in the section (or at the end), at the level of the section's other
+    required headings. The text of an empty heading is inserted at the end
+    of its body. A missing figure is appended as an embed followed by its
+    paragraph.
+
+    Args:
+        markdown: Section markdown (after ``fix_embeds``).
+        problems: The problems ``repair_prompt`` was built from.
+        answer: The LLM's answer to the repair prompt.
+        headings: All required headings of the section, in order.
+
+    Returns:
+        str: The repaired markdown.
+    """
+    items = [p for p in problems if p.kind in _REPAIR_KINDS]
+    blocks = _repair_blocks(answer, len(items))
+
+    lines = markdown.splitlines()
+    heading_lines = _heading_lines(markdown)
+    present = {key: (idx, level) for idx, level, key in heading_lines}
+    positions = {key: pos for pos, (_, _, key) in enumerate(heading_lines)}
+    required = [_title_key(h) for h in headings]
+    levels = [present[key][1] for key in required if key in present]
+    level = "#" * (levels[0] if levels else 2)
+
+    inserts = []  # (line index, item order, lines), applied bottom-up
+    appended = []
+    for order, (problem, body) in enumerate(zip(items, blocks)):
+        # Embeds in the repair are dropped; figures are embedded here
+        body = [line for line in body if not _EMBED_PATTERN.search(line)]
+        text = "\n".join(body).strip()
+        if problem.kind == "missing_figure":
+            appended.append(f"![{problem.target}]({FIGURES_FOLDER}/{problem.target})")
+            if text:
+                appended.append(text)
+            continue
+        if problem.kind == "empty_heading":
+            position = positions.get(_title_key(problem.target))
+            if text and position is not None:
+                end = _section_end(heading_lines, position, len(lines))
+                lead = [] if end and not lines[end - 1].strip() else [""]
+                inserts.append((end, order, lead + [text, ""]))
+            continue
+
+        block = [f"{level} {problem.target}", "", text, ""]
+        key = _title_key(problem.target)
+        later = required[required.index(key) + 1 :] if key in required else []
+        position = next((present[k][0] for k in later if k in present), None)
+        if position is None:
+            appended.append("\n".join(block).strip())
+        else:
+            inserts.append((position, order, block))
+
+    # Later items first, so items inserted at the same line keep their order
+    for position, _, block in sorted(inserts, key=lambda item: (-item[0], -item[1])):
+        lines[position:position] = block
+
+    repaired = "\n".join(lines).rstrip()
+    if appended:
+        repaired += "\n\n" + "\n\n".join(appended)
+    return repaired
@@ -8,29 +8,58 @@ Functions:
 - plot_models_over_years
 - plot_models_by_region_over_years
 - plot_correlation_vector
+- plot_feature_importance
+
+All plots are drawn with the object-oriented API through a FigureRenderer
+(see src.plotting.renderer), which reuses figures per thread and saves them
+with a fixed layout; pass ``renderer`` to change the format or layout.
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as mpatches
 from matplotlib.colors import Normalize
 from matplotlib.ticker import FuncFormatter
 import numpy as np
+from src.data_processing.bucketing import OTHER_LABEL
+from src.plotting.renderer import FigureRenderer, get_default_renderer
+
+# Style of the bucketed long-tail series, set apart from the named models
+OTHER_STYLE = {"color": "0.6", "linestyle": "--"}
+
+
+def _model_styles(models) -> Dict[str, dict]:
+    """
+    Line style per model, ordered for plotting and the legend.
+
+    Named models get distinct colors in name order; the "Other" bucket, if
+    present, comes last in a neutral gray dashed line.
+    """
+    named = sorted(m for m in models if m != OTHER_LABEL)
+    colors = matplotlib.colormaps["tab20"](np.linspace(0, 1, len(named)))
+    styles = {model: {"color": colors[i]} for i, model in enumerate(named)}
+    if OTHER_LABEL in models:
+        styles[OTHER_LABEL] = OTHER_STYLE
+    return styles
 
 
-def plot_sales_by_year(yearly_dict: dict, out_dir: str) -> str:
+def plot_sales_by_year(
+    yearly_dict: dict, out_dir: str, renderer: Optional[FigureRenderer] = None
+) -> str:
     """
     Plot total sales volume by year as a line chart.
 
     Args:
         yearly_dict (dict): {"2020": 1234, "2021": 2345, ...}
         out_dir (str): Directory where plot will be saved.
+        renderer (FigureRenderer): Optional renderer; the default one if None.
 
     Returns:
         str: File path to saved PNG.
     """
+    renderer = renderer or get_default_renderer()
     years = sorted([int(y) for y in yearly_dict.keys()])
     values = [
         yearly_dict[str(year)] if str(year) in yearly_dict else yearly_dict[year]
@@ -40,24 +69,23 @@ def plot_sales_by_year(yearly_dict: dict, out_dir: str) -> str:
     # Scale values to millions
     values_m = [v / 1e6 for v in values]
 
-    plt.figure(figsize=(10, 5.5))
-    plt.plot(years, values_m, marker="o")
+    with renderer.axes("line", (10, 5.5)) as ax:
+        ax.plot(years, values_m, marker="o")
 
-    plt.title("Sales by Year")
-    plt.xlabel("Year")
-    plt.ylabel("Sales Volume (Millions)")
-    plt.grid(True)
+        ax.set_title("Sales by Year")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("Sales Volume (Millions)")
+        ax.grid(True)
 
-    # Force integer ticks for years (fixes 2020.5 issue)
-    plt.xticks(years)
+        # Force integer ticks for years (fixes 2020.5 issue)
+        ax.set_xticks(years)
 
-    path = os.path.join(out_dir, "sales_by_year_millions.png")
-    plt.savefig(path, dpi=120, bbox_inches="tight")
-    plt.close()
-    return path
+        return renderer.save(ax, out_dir, "sales_by_year_millions")
 
 
-def plot_regions(region_year_dict: dict, out_dir: str) -> str:
+def plot_regions(
+    region_year_dict: dict, out_dir: str, renderer: Optional[FigureRenderer] = None
+) -> str:
     """
     Plot sales volume by region over multiple years as a multi-line chart.
 
@@ -67,40 +95,40 @@ def plot_regions(region_year_dict: dict, out_dir: str) -> str:
             "Asia": {"2020": 3456, "2021": 4567},
         }
         out_dir (str): Directory where plot will be saved.
+        renderer (FigureRenderer): Optional renderer; the default one if None.
 
     Returns:
         str: File path to saved PNG.
     """
-    plt.figure(figsize=(10, 5.5))
+    renderer = renderer or get_default_renderer()
 
     # Collect all years across regions
     all_years = sorted(
         {year for region_data in region_year_dict.values() for year in region_data}
     )
 
-    # Plot each region
-    for region, year_dict in region_year_dict.items():
-        values = [
-            year_dict.get(year, 0) / 1e6 for year in all_years
-        ]  # convert to millions
-        plt.plot(all_years, values, marker="o", label=region)
+    with renderer.axes("line", (10, 5.5)) as ax:
+        # Plot each region
+        for region, year_dict in region_year_dict.items():
+            values = [
+                year_dict.get(year, 0) / 1e6 for year in all_years
+            ]  # convert to millions
+            ax.plot(all_years, values, marker="o", label=region)
 
-    plt.title("Sales by Region Over Years")
-    plt.xlabel("Year")
-    plt.ylabel("Sales Volume (Millions)")
-    plt.legend()
-    plt.grid(True)
+        ax.set_title("Sales by Region Over Years")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("Sales Volume (Millions)")
+        ax.legend()
+        ax.grid(True)
 
-    path = os.path.join(out_dir, "sales_by_region_year_millions.png")
-    plt.savefig(path, dpi=120, bbox_inches="tight")
-    plt.close()
-    return path
+        return renderer.save(ax, out_dir, "sales_by_region_year_millions")
 
 
 def plot_models_over_years(
     year_models_dict: Dict[str, Any],
     out_dir: str,
     title_prefix: str = "All Regions",
+    renderer: Optional[FigureRenderer] = None,
 ) -> str:
     """
     Plot sales of all models over years as lines.
@@ -117,10 +145,12 @@ def plot_models_over_years(
         }
         out_dir: Directory to save the plot
         title_prefix: Title prefix, default "All Regions"
+        renderer: Optional FigureRenderer; the default one if None
 
     Returns:
         Path to saved PNG file
     """
+    renderer = renderer or get_default_renderer()
 
     years = sorted(year_models_dict.keys())
     n_years = len(years)
@@ -133,15 +163,10 @@ def plot_models_over_years(
     for year in years:
         for entry in year_models_dict[year]:
             all_models_set.add(entry["Model"])
-    all_models = sorted(all_models_set)
+    model_styles = _model_styles(all_models_set)
+    all_models = list(model_styles)
     n_models = len(all_models)
 
-    plt.figure(figsize=(10, 5.5))
-
-    # Generate color map
-    colors = plt.get_cmap("tab20")(np.linspace(0, 1, n_models))
-    model_color_map = {model: colors[i] for i, model in enumerate(all_models)}
-
     # Build matrix: rows = models, cols = years (in millions)
     sales_matrix = np.zeros((n_models, n_years), dtype=float)
     for year_idx, year in enumerate(years):
@@ -153,40 +178,38 @@ def plot_models_over_years(
         for model_idx, model in enumerate(all_models):
             sales_matrix[model_idx, year_idx] = sales_dict.get(model, 0)
 
-    # Plot lines
-    for model_idx, model in enumerate(all_models):
-        plt.plot(
-            years,
-            sales_matrix[model_idx],
-            label=model,
-            color=model_color_map[model],
-            marker="o",
-            linewidth=2,
-            markersize=5,
-        )
-
-    plt.title(f"Model Sales Over Years – {title_prefix}")
-    plt.xlabel("Year")
-    plt.ylabel("Sales Volume (Millions)")
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.xticks(rotation=45)
+    with renderer.axes("line", (10, 5.5)) as ax:
+        # Plot lines
+        for model_idx, model in enumerate(all_models):
+            ax.plot(
+                years,
+                sales_matrix[model_idx],
+                label=model,
+                **model_styles[model],
+                marker="o",
+                linewidth=2,
+                markersize=5,
+            )
 
-    plt.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize="small")
-    plt.tight_layout()
+        ax.set_title(f"Model Sales Over Years – {title_prefix}")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("Sales Volume (Millions)")
+        ax.grid(True, linestyle="--", alpha=0.5)
+        ax.tick_params(axis="x", labelrotation=45)
 
-    os.makedirs(out_dir, exist_ok=True)
-    safe_title = title_prefix.replace(" ", "_")
-    path = os.path.join(out_dir, f"{safe_title}_models_performance_line.png")
-    plt.savefig(path, dpi=120, bbox_inches="tight")
-    plt.close()
+        ax.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize="small")
 
-    return path
+        safe_title = title_prefix.replace(" ", "_")
+        return renderer.save(
+            ax, out_dir, f"{safe_title}_models_performance_line", "legend_right"
+        )
 
 
 def plot_models_by_region_over_years(
     region_models_dict: Dict[str, Any],
     out_dir: str,
     region_name: str,
+    renderer: Optional[FigureRenderer] = None,
 ) -> str:
     """
     Plot sales of all models over years as lines for a given region.
@@ -203,10 +226,12 @@ def plot_models_by_region_over_years(
         }
         out_dir: Directory to save the plot
         region_name: Region name, used for filename and title
+        renderer: Optional FigureRenderer; the default one if None
 
     Returns:
         Path to saved PNG file
     """
+    renderer = renderer or get_default_renderer()
 
     years = sorted(region_models_dict.keys())
     n_years = len(years)
@@ -219,17 +244,10 @@ def plot_models_by_region_over_years(
     for year in years:
         for entry in region_models_dict[year]:
             all_models_set.add(entry["Model"])
-    all_models = sorted(all_models_set)
+    model_styles = _model_styles(all_models_set)
+    all_models = list(model_styles)
     n_models = len(all_models)
 
-    # plt.figure(figsize=(max(12, n_models * 0.5), 7))  # widen plot if many models
-    plt.figure(figsize=(10, 5.5))
-
-    # Generate color map for all models
-    colors = plt.get_cmap("tab20")(np.linspace(0, 1, n_models))
-
-    model_color_map = {model: colors[i] for i, model in enumerate(all_models)}
-
     # Prepare sales data matrix: rows = models, cols = years
     sales_matrix = np.zeros((n_models, n_years), dtype=float)
     for year_idx, year in enumerate(years):
@@ -238,42 +256,44 @@ def plot_models_by_region_over_years(
         for model_idx, model in enumerate(all_models):
             sales_matrix[model_idx, year_idx] = sales_dict.get(model, 0)
 
-    # Plot each model's sales over years as a line
-    for model_idx, model in enumerate(all_models):
-        plt.plot(
-            years,
-            sales_matrix[model_idx],
-            label=model,
-            color=model_color_map[model],
-            marker="o",
-            linewidth=2,
-            markersize=5,
-        )
-
-    plt.title(f"Model Sales Over Years – {region_name}")
-    plt.xlabel("Year")
-    plt.ylabel("Sales Volume")
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.xticks(rotation=45)
+    with renderer.axes("line", (10, 5.5)) as ax:
+        # Plot each model's sales over years as a line
+        for model_idx, model in enumerate(all_models):
+            ax.plot(
+                years,
+                sales_matrix[model_idx],
+                label=model,
+                **model_styles[model],
+                marker="o",
+                linewidth=2,
+                markersize=5,
+            )
 
-    # Format y-axis with commas for thousands
-    ax = plt.gca()
-    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{int(x):,}"))
+        ax.set_title(f"Model Sales Over Years – {region_name}")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("Sales Volume")
+        ax.grid(True, linestyle="--", alpha=0.5)
+        ax.tick_params(axis="x", labelrotation=45)
 
-    plt.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize="small")
-    plt.tight_layout()
+        # Format y-axis with commas for thousands
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{int(x):,}"))
 
-    os.makedirs(out_dir, exist_ok=True)
-    safe_region_name = region_name.replace(" ", "_")
-    path = os.path.join(out_dir, f"{safe_region_name}_all_models_performance_line.png")
-    plt.savefig(path, dpi=120, bbox_inches="tight")
-    plt.close()
+        ax.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize="small")
 
-    return path
+        safe_region_name = region_name.replace(" ", "_")
+        return renderer.save(
+            ax,
+            out_dir,
+            f"{safe_region_name}_all_models_performance_line",
+            "legend_right",
+        )
 
 
 def plot_correlation_vector(
-    corr_vector, out_dir: str, filename: str = "correlation_vector.png"
+    corr_vector,
+    out_dir: str,
+    filename: str = "correlation_vector.png",
+    renderer: Optional[FigureRenderer] = None,
 ) -> str:
     """
     Plot a correlation vector (single-column DataFrame or Series) as a horizontal bar plot
@@ -282,11 +302,14 @@ def plot_correlation_vector(
     Args:
         corr_vector (pd.Series or pd.DataFrame): Correlation values with features as index.
         out_dir (str): Directory to save the plot.
-        filename (str): Output filename.
+        filename (str): Output filename (its extension follows the renderer format).
+        renderer (FigureRenderer): Optional renderer; the default one if None.
 
     Returns:
         str: File path to the saved plot image.
     """
+    renderer = renderer or get_default_renderer()
+
     # Convert single-column DataFrame to Series if needed
     if isinstance(corr_vector, pd.DataFrame):
         if corr_vector.shape[1] != 1:
@@ -304,71 +327,126 @@ def plot_correlation_vector(
     values = np.array(corr_vector.values, dtype=float)  # ensure numpy float array
 
     fig_height = max(5, 0.35 * len(features))
-    _, ax = plt.subplots(figsize=(10, fig_height))
-
-    # Normalize correlation values for color mapping [-1,1]
-    norm = Normalize(-1, 1)
-    colors =plt.get_cmap("coolwarm")(norm(values))
-
-    bars = ax.barh(features, values, color=colors)
-
-    # Add value labels
-    for bar in bars:
-        width = bar.get_width()
-        ax.text(
-            width + 0.01 * np.sign(width),
-            bar.get_y() + bar.get_height() / 2,
-            f"{width:.3f}",
-            va="center",
-            ha="left" if width >= 0 else "right",
+    with renderer.axes("barh", (10, fig_height)) as ax:
+        # Normalize correlation values for color mapping [-1,1]
+        norm = Normalize(-1, 1)
+        colors = matplotlib.colormaps["coolwarm"](norm(values))
+
+        bars = ax.barh(features, values, color=colors)
+
+        # Add value labels
+        for bar in bars:
+            width = bar.get_width()
+            ax.text(
+                width + 0.01 * np.sign(width),
+                bar.get_y() + bar.get_height() / 2,
+                f"{width:.3f}",
+                va="center",
+                ha="left" if width >= 0 else "right",
+                fontsize=8,
+            )
+
+        ax.set_xlabel("Correlation with Sales Volume")
+        ax.set_title("Correlation Vector Heatmap")
+        ax.axvline(0, color="black", linewidth=0.8)
+
+        # Fix x-axis limits to symmetric range
+        ax.set_xlim(-1, 1)
+
+        # Legend for correlation strength ranges
+        legend_labels = [
+            "Strong +ive correlation (≥ 0.6)",
+            "Medium +ive correlation (0.3 to 0.6)",
+            "Weak +ive correlation (0.1 to 0.3)",
+            "No correlation (-0.1 to 0.1)",
+            "Weak -ive correlation (-0.3 to -0.1)",
+            "Medium -ive correlation (-0.6 to -0.3)",
+            "Strong -ive correlation (≤ -0.6)",
+        ]
+
+        legend_colors = [
+            "#d73027",  # strong positive red
+            "#fc8d59",  # medium positive light red
+            "#fddbc7",  # weak positive very light red
+            "#f7f7f7",  # no correlation gray/white        "#d1e5f0",  # weak negative very light blue
+            "#d1e5f0",  # weak negative very light blue
+            "#91bfdb",  # medium negative light blue
+            "#4575b4",  # strong negative blue
+        ]
+
+        patches = [
+            mpatches.Patch(color=color, label=label)
+            for color, label in zip(legend_colors, legend_labels)
+        ]
+        ax.legend(
+            handles=patches,
+            loc="upper right",
             fontsize=8,
+            frameon=False,
+            title="Correlation Strength",
         )
 
-    ax.set_xlabel("Correlation with Sales Volume")
-    ax.set_title("Correlation Vector Heatmap")
-    ax.axvline(0, color="black", linewidth=0.8)
-
-    # Fix x-axis limits to symmetric range
-    ax.set_xlim(-1, 1)
-
-    # Legend for correlation strength ranges
-    legend_labels = [
-        "Strong +ive correlation (≥ 0.6)",
-        "Medium +ive correlation (0.3 to 0.6)",
-        "Weak +ive correlation (0.1 to 0.3)",
-        "No correlation (-0.1 to 0.1)",
-        "Weak -ive correlation (-0.3 to -0.1)",
-        "Medium -ive correlation (-0.6 to -0.3)",
-        "Strong -ive correlation (≤ -0.6)",
-    ]
+        stem = os.path.splitext(filename)[0]
+        return renderer.save(ax, out_dir, stem, "labels_left")
 
-    legend_colors = [
-        "#d73027",  # strong positive red
-        "#fc8d59",  # medium positive light red
-        "#fddbc7",  # weak positive very light red
-        "#f7f7f7",  # no correlation gray/white        "#d1e5f0",  # weak negative very light blue
-        "#d1e5f0",  # weak negative very light blue
-        "#91bfdb",  # medium negative light blue
-        "#4575b4",  # strong negative blue
-    ]
 
-    patches = [
-        mpatches.Patch(color=color, label=label)
-        for color, label in zip(legend_colors, legend_labels)
-    ]
-    ax.legend(
-        handles=patches,
-        loc="upper right",
-        fontsize=8,
-        frameon=False,
-        title="Correlation Strength",
-    )
+def plot_feature_importance(
+    importance_df: pd.DataFrame,
+    out_dir: str,
+    filename: str = "xgboost_feature_importance.png",
+    top_n: int = 20,
+    renderer: Optional[FigureRenderer] = None,
+) -> str:
+    """
+    Plot XGBoost gain importances as a horizontal bar chart, with bootstrap
+    confidence intervals as error bars when available.
+
+    Like all plots here it uses the object-oriented API instead of pyplot
+    global state, so it can be rendered from a worker thread while other
+    plots are being drawn.
+
+    Args:
+        importance_df (pd.DataFrame): Features as index with an "importance"
+            column and optional "ci_lower"/"ci_upper" columns.
+        out_dir (str): Directory to save the plot.
+        filename (str): Output filename (its extension follows the renderer format).
+        top_n (int): Number of most important features to show.
+        renderer (FigureRenderer): Optional renderer; the default one if None.
+
+    Returns:
+        str: File path to the saved plot image.
+    """
+    if "importance" not in importance_df.columns:
+        raise ValueError("Input DataFrame must have an 'importance' column.")
+    if importance_df.empty:
+        raise ValueError("No feature importances available to plot")
+
+    renderer = renderer or get_default_renderer()
+
+    top = importance_df.sort_values(by="importance", ascending=False).head(top_n)
+    # Reverse so the most important feature is drawn at the top
+    top = top.iloc[::-1]
+
+    features = top.index.astype(str).tolist()
+    values = top["importance"].to_numpy(dtype=float)
+
+    xerr = None
+    if {"ci_lower", "ci_upper"} <= set(top.columns):
+        xerr = np.vstack(
+            [
+                values - top["ci_lower"].to_numpy(dtype=float),
+                top["ci_upper"].to_numpy(dtype=float) - values,
+            ]
+        ).clip(min=0)
+
+    with renderer.axes("barh", (10, max(5, 0.35 * len(features)))) as ax:
 
-    plt.tight_layout()
+        ax.barh(features, values, xerr=xerr, color="#4575b4", ecolor="black", capsize=3)
 
-    os.makedirs(out_dir, exist_ok=True)
-    path = os.path.join(out_dir, filename)
-    plt.savefig(path, dpi=120, bbox_inches="tight")
-    plt.close()
+        ax.set_xlabel("Gain Importance")
+        ax.set_title("XGBoost Feature Importance (Gain)")
+        ax.grid(True, axis="x", linestyle="--", alpha=0.5)
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{x:,.0f}"))
 
-    return path
+        stem = os.path.splitext(filename)[0]
+        return renderer.save(ax, out_dir, stem, "labels_left")
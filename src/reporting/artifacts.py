@@ -0,0 +1,328 @@
+"""
+Content-addressed artifact store for the run directories under reports/.
+
+Every run writes its own ``reports/run_YYYY_MM_DD_HH_MM_SS`` folder with a
+copy of every figure and JSON summary, most of them identical to those of
+the previous runs. ``ArtifactStore`` keeps one blob per unique content under
+``reports/objects/<sha256[:2]>/<sha256>`` and replaces the files of a run
+directory with hard links to the blobs, so storage grows with unique
+content only while run directories keep their usual layout. Each ingested
+run also gets an ``artifacts.json`` manifest (relative path -> digest, size).
+
+Blobs are made read-only: a file shared by several runs must be replaced
+(written to a new file and renamed), not edited in place. If hard links are
+not supported (e.g. the store is on another file system), files are left
+as plain copies and only listed in the manifest.
+
+Retention policies remove whole run directories (the ``keep_last`` newest
+runs and those younger than ``max_age_days`` are kept; runs containing a
+``.keep`` file are never removed); compaction ingests runs written before the
+store existed, applies the retention policy and deletes blobs no run links
+to any more.
+
+Usage:
+    python -m src.reporting.artifacts [--keep-last 20] [--max-age-days 30] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.reporting.writer import atomic_write
+
+OBJECTS_FOLDER = "objects"
+MANIFEST_FILENAME = "artifacts.json"
+KEEP_MARKER = ".keep"
+RUN_PREFIX = "run_"
+RUN_TIMESTAMP_FORMAT = "run_%Y_%m_%d_%H_%M_%S"
+_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def run_timestamp(run_dir: str) -> datetime:
+    """Creation time of a run, from its folder name (or its mtime)."""
+    try:
+        return datetime.strptime(os.path.basename(run_dir), RUN_TIMESTAMP_FORMAT)
+    except ValueError:
+        return datetime.fromtimestamp(os.path.getmtime(run_dir))
+
+
+class ArtifactStore:
+    """
+    Deduplicated storage of the run directories under a reports root.
+
+    Args:
+        reports_root: Folder holding the ``run_*`` directories.
+        objects_dir: Blob folder (defaults to ``<reports_root>/objects``).
+    """
+
+    def __init__(self, reports_root: str, objects_dir: Optional[str] = None):
+        self.reports_root = reports_root
+        self.objects_dir = objects_dir or os.path.join(reports_root, OBJECTS_FOLDER)
+
+    def blob_path(self, digest: str) -> str:
+        """Path of the blob holding the content with this digest."""
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def run_dirs(self) -> List[str]:
+        """Run directories under the reports root, oldest first."""
+        if not os.path.isdir(self.reports_root):
+            return []
+        runs = [
+            os.path.join(self.reports_root, name)
+            for name in os.listdir(self.reports_root)
+            if name.startswith(RUN_PREFIX)
+            and os.path.isdir(os.path.join(self.reports_root, name))
+        ]
+        return sorted(runs, key=lambda run: (run_timestamp(run), run))
+
+    def _store(self, path: str, digest: str) -> bool:
+        """
+        Replace ``path`` by a hard link to its blob, creating the blob if new.
+
+        Returns:
+            bool: False if hard links are not supported (the file is left as is).
+        """
+        blob = self.blob_path(digest)
+        if os.path.exists(blob):
+            if os.path.samefile(path, blob):
+                return True
+            tmp_path = f"{path}.link"
+            try:
+                os.link(blob, tmp_path)
+            except OSError:
+                return False
+            os.replace(tmp_path, path)
+            return True
+
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        try:
+            os.link(path, blob)
+        except OSError:
+            return False
+        os.chmod(blob, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        return True
+
+    def ingest(self, run_dir: str) -> dict:
+        """
+        Deduplicate the files of a run directory into the store.
+
+        Every file (except the manifest and the ``.keep`` marker) is replaced
+        by a hard link to its blob, and ``artifacts.json`` is written.
+
+        Args:
+            run_dir: Run directory to ingest.
+
+        Returns:
+            dict: Files ingested, files that were already stored (deduplicated),
+                files left as copies and bytes saved.
+        """
+        manifest: Dict[str, dict] = {}
+        stats = {"files": 0, "deduplicated": 0, "unlinked": 0, "bytes_saved": 0}
+        for folder, _, names in os.walk(run_dir):
+            for name in sorted(names):
+                path = os.path.join(folder, name)
+                relpath = os.path.relpath(path, run_dir).replace(os.sep, "/")
+                if relpath in (MANIFEST_FILENAME, KEEP_MARKER) or os.path.islink(path):
+                    continue
+                digest = file_digest(path)
+                size = os.path.getsize(path)
+                existed = os.path.exists(self.blob_path(digest))
+                already_linked = existed and os.path.samefile(
+                    path, self.blob_path(digest)
+                )
+
+                stats["files"] += 1
+                if not self._store(path, digest):
+                    stats["unlinked"] += 1
+                elif existed and not already_linked:
+                    stats["deduplicated"] += 1
+                    stats["bytes_saved"] += size
+                manifest[relpath] = {"sha256": digest, "size": size}
+
+        atomic_write(
+            os.path.join(run_dir, MANIFEST_FILENAME),
+            json.dumps(manifest, indent=2, sort_keys=True),
+        )
+        return stats
+
+    def expired_runs(
+        self,
+        keep_last: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Run directories the retention policy would remove, oldest first.
+
+        A run is kept if it is among the ``keep_last`` newest runs, younger
+        than ``max_age_days``, or contains a ``.keep`` file. With neither
+        limit set, every run is kept.
+
+        Args:
+            keep_last: Number of newest runs to keep, or None for no limit.
+            max_age_days: Age in days under which runs are kept, or None.
+            now: Reference time (defaults to the current time).
+
+        Returns:
+            list[str]: Paths of the expired run directories.
+        """
+        if keep_last is None and max_age_days is None:
+            return []
+        if keep_last is not None and keep_last < 1:
+            raise ValueError("keep_last must be at least 1.")
+        now = now or datetime.now()
+        runs = self.run_dirs()
+        newest = set(runs[-keep_last:]) if keep_last else set()
+
+        expired = []
+        for run in runs:
+            if run in newest or os.path.exists(os.path.join(run, KEEP_MARKER)):
+                continue
+            age_days = (now - run_timestamp(run)).total_seconds() / 86400
+            if max_age_days is not None and age_days < max_age_days:
+                continue
+            expired.append(run)
+        return expired
+
+    def unreferenced_blobs(self) -> List[str]:
+        """Blobs no run directory links to any more (link count of 1)."""
+        if not os.path.isdir(self.objects_dir):
+            return []
+        blobs = []
+        for folder, _, names in os.walk(self.objects_dir):
+            for name in names:
+                path = os.path.join(folder, name)
+                if os.stat(path).st_nlink <= 1:
+                    blobs.append(path)
+        return sorted(blobs)
+
+    def disk_usage(self) -> dict:
+        """Bytes of all run files (logical) and of their distinct files on disk."""
+        runs = self.run_dirs()
+        logical = 0
+        inodes = {}
+        for run in runs:
+            for folder, _, names in os.walk(run):
+                for name in names:
+                    info = os.lstat(os.path.join(folder, name))
+                    logical += info.st_size
+                    inodes[(info.st_dev, info.st_ino)] = info.st_size
+        return {
+            "runs": len(runs),
+            "logical_bytes": logical,
+            "stored_bytes": sum(inodes.values()),
+        }
+
+    def compact(
+        self,
+        keep_last: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        dry_run: bool = False,
+    ) -> dict:
+        """
+        Ingest all runs, apply the retention policy and delete orphan blobs.
+
+        Args:
+            keep_last: Number of newest runs to keep, or None for no limit.
+            max_age_days: Age in days under which runs are kept, or None.
+            dry_run: Only report what would be removed.
+
+        Returns:
+            dict: The removed runs and blobs, bytes freed, and the disk usage
+                before and after.
+        """
+        before = self.disk_usage()
+        expired = self.expired_runs(keep_last, max_age_days)
+        if dry_run:
+            return {"removed_runs": expired, "removed_blobs": [], "before": before}
+
+        for run in self.run_dirs():
+            if run not in expired:
+                self.ingest(run)
+        result = self.apply_retention(keep_last, max_age_days)
+        result.update(before=before, after=self.disk_usage())
+        return result
+
+    def apply_retention(
+        self,
+        keep_last: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+    ) -> dict:
+        """
+        Remove the expired run directories, then the blobs left unreferenced.
+
+        Args:
+            keep_last: Number of newest runs to keep, or None for no limit.
+            max_age_days: Age in days under which runs are kept, or None.
+
+        Returns:
+            dict: The removed runs and blobs, and the bytes freed by the blobs.
+        """
+        expired = self.expired_runs(keep_last, max_age_days)
+        for run in expired:
+            shutil.rmtree(run)
+
+        blobs = self.unreferenced_blobs()
+        freed = 0
+        for blob in blobs:
+            freed += os.path.getsize(blob)
+            os.chmod(blob, stat.S_IWUSR | stat.S_IRUSR)
+            os.remove(blob)
+        return {"removed_runs": expired, "removed_blobs": blobs, "bytes_freed": freed}
+
+
+def main():
+    from src.config import (  # pylint: disable=import-outside-toplevel
+        REPORTS_ROOT,
+        RETENTION_KEEP_RUNS,
+        RETENTION_MAX_AGE_DAYS,
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Deduplicate the run directories, apply retention, drop orphans."
+    )
+    parser.add_argument("--reports-root", default=REPORTS_ROOT)
+    parser.add_argument("--keep-last", type=int, default=RETENTION_KEEP_RUNS)
+    parser.add_argument("--max-age-days", type=float, default=RETENTION_MAX_AGE_DAYS)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.reports_root)
+    result = store.compact(args.keep_last, args.max_age_days, dry_run=args.dry_run)
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    for run in result["removed_runs"]:
+        print(f"{verb} run: {os.path.basename(run)}")
+    before = result["before"]
+    print(
+        f"Before: {before['runs']} runs, {before['logical_bytes'] / 1e6:.1f} MB "
+        f"in files, {before['stored_bytes'] / 1e6:.1f} MB on disk"
+    )
+    if not args.dry_run:
+        after = result["after"]
+        print(
+            f"Removed {len(result['removed_blobs'])} orphan blobs "
+            f"({result['bytes_freed'] / 1e6:.1f} MB)"
+        )
+        print(
+            f"After: {after['runs']} runs, {after['logical_bytes'] / 1e6:.1f} MB "
+            f"in files, {after['stored_bytes'] / 1e6:.1f} MB on disk"
+        )
+
+
+if __name__ == "__main__":
+    main()
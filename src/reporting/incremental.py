@@ -0,0 +1,304 @@
+"""
+Differential re-runs: reuse the figures and sections of a previous run.
+
+Every run writes a manifest, ``sections.json``, to its folder: the
+fingerprint (SHA-256 of a canonical JSON) of the inputs of every figure and
+report section, the section markdown, digest and figures, and the combined
+summary. With ``RERUN_FROM`` set (a run folder, or "latest") the pipeline
+compares the fingerprints of the new run with the previous run's manifest:
+
+- A section whose inputs are unchanged (its summary data, and the settings
+  and code that shape its prompt) is copied with its figures and digest:
+  no plots, no LLM call, and for the feature importance section no
+  XGBoost fit.
+- In a changed section, every figure whose data is unchanged is copied
+  instead of drawn (e.g. the plots of the regions whose data is the same).
+- The final summary is generated again only if a section changed.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.reporting.artifacts import ArtifactStore
+from src.reporting.writer import read_artifact, resolve_artifact
+
+MANIFEST_FILENAME = "sections.json"
+
+
+def _canonical(obj):
+    """JSON-serializable form of an input, stable across runs."""
+    if isinstance(obj, pd.Series):
+        obj = obj.to_frame()
+    if isinstance(obj, pd.DataFrame):
+        return {
+            "columns": [str(c) for c in obj.columns],
+            "dtypes": [str(t) for t in obj.dtypes],
+            "rows": frame_fingerprint(obj),
+        }
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return repr(obj)
+
+
+def fingerprint(*parts) -> str:
+    """
+    Fingerprint of stage inputs: SHA-256 of their canonical JSON.
+
+    Args:
+        parts: Dicts, lists, scalars and DataFrames/Series (by content).
+
+    Returns:
+        str: Hex digest.
+    """
+    data = json.dumps(_canonical(list(parts)), sort_keys=True, allow_nan=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def frame_fingerprint(df) -> str:
+    """Fingerprint of the rows of a DataFrame or Series (index included)."""
+    hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+
+def source_fingerprint(*modules) -> str:
+    """Fingerprint of the source code of modules (e.g. prompts, plot code)."""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(inspect.getfile(module), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def find_previous_run(reports_root: str, current_dir: str, run_from: str):
+    """
+    Run folder to reuse sections from.
+
+    Args:
+        reports_root: Folder of the run folders.
+        current_dir: Folder of the current run (never returned).
+        run_from: A run folder, or "latest" for the newest run with a
+            manifest.
+
+    Returns:
+        str: The run folder, or None if there is none with a manifest.
+    """
+    if run_from != "latest":
+        if resolve_artifact(os.path.join(run_from, MANIFEST_FILENAME)) is None:
+            raise ValueError(f"No {MANIFEST_FILENAME} in RERUN_FROM={run_from}")
+        return run_from
+    current = os.path.abspath(current_dir)
+    for run in reversed(ArtifactStore(reports_root).run_dirs()):
+        if os.path.abspath(run) == current:
+            continue
+        if resolve_artifact(os.path.join(run, MANIFEST_FILENAME)) is not None:
+            return run
+    return None
+
+
+def _empty_manifest() -> dict:
+    return {"previous_run": None, "sections": {}, "figures": {}, "combined": None}
+
+
+class RunCache:
+    """
+    Fingerprints and outputs of the current run, and reuse of a previous one.
+
+    Figures are recorded by the fingerprint of their data and by their full
+    fingerprint, which adds ``figure_version`` (renderer settings and
+    plotting code, see ``src.llm.tools.figure_version``); a figure is only
+    reused if its full fingerprint is the one this run would compute.
+
+    Args:
+        run_dir: Folder of the current run (figures under ``figures/``).
+        previous_dir: Folder of the run to reuse from, or None to only
+            record this run's manifest.
+        figure_version: Fingerprint of the figure settings of this run.
+    """
+
+    def __init__(
+        self,
+        run_dir: str,
+        previous_dir: Optional[str] = None,
+        figure_version: str = "",
+    ):
+        self.run_dir = run_dir
+        self.figures_dir = os.path.join(run_dir, "figures")
+        self.previous_dir = previous_dir
+        self.figure_version = figure_version
+        self.previous = _empty_manifest()
+        if previous_dir is not None:
+            self.previous.update(
+                read_artifact(os.path.join(previous_dir, MANIFEST_FILENAME))
+            )
+        self.manifest = _empty_manifest()
+        self.manifest["previous_run"] = (
+            os.path.basename(previous_dir) if previous_dir else None
+        )
+        self.reused_sections = []
+        self.reused_figures = []
+        # Figures are drawn from several threads
+        self._lock = threading.Lock()
+
+    def _copy_figure(self, name: str, out_dir: str) -> Optional[str]:
+        """Copy a figure of the previous run into ``out_dir`` (None if missing)."""
+        source = os.path.join(self.previous_dir, "figures", name)
+        if not os.path.isfile(source):
+            return None
+        os.makedirs(out_dir, exist_ok=True)
+        target = os.path.join(out_dir, name)
+        shutil.copyfile(source, target)
+        return target
+
+    def figure_fingerprint(self, data_key: str) -> str:
+        """Full fingerprint of a figure of this run from its data fingerprint."""
+        return fingerprint(data_key, self.figure_version)
+
+    def _figure_current(self, name: str) -> bool:
+        """Whether a figure of the previous run is the one this run would draw."""
+        record = self.previous["figures"].get(name)
+        return bool(record) and record["fingerprint"] == self.figure_fingerprint(
+            record["data"]
+        )
+
+    def reuse_figure(self, data_key: str, out_dir: str) -> Optional[str]:
+        """
+        Copy the previous run's figure of the same data and settings, if any.
+
+        Args:
+            data_key: Fingerprint of the plot kind and data.
+            out_dir: Folder to copy the figure to.
+
+        Returns:
+            str: Path of the copied figure, or None if it must be drawn.
+        """
+        if self.previous_dir is None:
+            return None
+        key = self.figure_fingerprint(data_key)
+        names = [
+            n
+            for n, rec in self.previous["figures"].items()
+            if rec["fingerprint"] == key
+        ]
+        path = self._copy_figure(names[0], out_dir) if names else None
+        if path is not None:
+            self.add_figure(data_key, path)
+            with self._lock:
+                self.reused_figures.append(os.path.basename(path))
+        return path
+
+    def add_figure(self, data_key: str, path: str) -> None:
+        """Record the fingerprints of a figure drawn (or copied) in this run."""
+        with self._lock:
+            self.manifest["figures"][os.path.basename(path)] = {
+                "data": data_key,
+                "fingerprint": self.figure_fingerprint(data_key),
+            }
+
+    def reuse_section(self, name: str, key: str) -> Optional[dict]:
+        """
+        Copy a section of the previous run if its inputs are unchanged.
+
+        Its figures are copied into this run's figures folder; the section
+        is generated again if any of them would be drawn differently now
+        (e.g. another figure format or changed plotting code).
+
+        Returns:
+            dict: The section entry (markdown, digest, figures, captions,
+            answer), or None if the section must be generated.
+        """
+        entry = self.previous["sections"].get(name)
+        if self.previous_dir is None or not entry or entry["fingerprint"] != key:
+            return None
+        figures = entry.get("figures", [])
+        if not all(
+            self._figure_current(n)
+            and os.path.isfile(os.path.join(self.previous_dir, "figures", n))
+            for n in figures
+        ):
+            return None
+        for figure in figures:
+            path = self._copy_figure(figure, self.figures_dir)
+            self.add_figure(self.previous["figures"][figure]["data"], path)
+        with self._lock:
+            self.manifest["sections"][name] = dict(entry)
+            self.reused_sections.append(name)
+            self.reused_figures.extend(figures)
+        return entry
+
+    def add_section(
+        self,
+        name: str,
+        key: str,
+        markdown: str,
+        figures=(),
+        captions: Optional[Dict[str, str]] = None,
+        answer: Optional[dict] = None,
+    ) -> None:
+        """Record a section generated in this run."""
+        with self._lock:
+            self.manifest["sections"][name] = {
+                "fingerprint": key,
+                "markdown": markdown,
+                "digest": None,
+                "figures": list(figures),
+                "captions": captions or {},
+                "answer": answer,
+            }
+
+    def set_digest(self, name: str, digest: str) -> None:
+        """Record the digest of a section (hierarchical combine mode)."""
+        with self._lock:
+            self.manifest["sections"][name]["digest"] = digest
+
+    def reuse_combined(self, key: str) -> Optional[dict]:
+        """
+        The previous combined summary, if no section changed.
+
+        Returns:
+            dict: The summary entry (markdown, answer), or None if it must
+            be generated.
+        """
+        combined = self.previous.get("combined")
+        if self.previous_dir is None or not combined:
+            return None
+        if combined["fingerprint"] != key:
+            return None
+        self.manifest["combined"] = dict(combined)
+        return combined
+
+    def add_combined(
+        self, key: str, markdown: str, answer: Optional[dict] = None
+    ) -> None:
+        """Record the combined summary generated in this run."""
+        self.manifest["combined"] = {
+            "fingerprint": key,
+            "markdown": markdown,
+            "answer": answer,
+        }
+
+    def summary(self) -> dict:
+        """What was reused from the previous run."""
+        return {
+            "previous_run": self.manifest["previous_run"],
+            "reused_sections": list(self.reused_sections),
+            "reused_figures": len(self.reused_figures),
+            "reused_combined": bool(
+                self.previous_dir
+                and self.manifest["combined"]
+                and self.manifest["combined"] == self.previous.get("combined")
+            ),
+        }
@@ -3,13 +3,155 @@ Module to combine multiple markdown reports into a single comprehensive markdown
 
 Provides a function to assemble various markdown strings generated by LLM analyses,
 adding a report title, timestamp, optional introduction, and section separators.
+Full section reports can be spliced locally into an LLM-written summary, so
+the summary call only needs short digests of the sections. Figures are
+numbered and captioned locally, and embeds of missing figure files are dropped.
 
 Saves the combined markdown file to a specified output directory.
 """
 
 import os
+import re
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
+
+from src.reporting.writer import get_default_writer
+
+_HEADING_PATTERN = re.compile(r"^(#{1,6})(\s+.*)$")
+_EMBED_PATTERN = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)\)")
+# Captions such as "Figure 3: ..." or "*Figure 3.* ..." written by the LLM
+_CAPTION_PATTERN = re.compile(r"^\s*[*_]*\s*Figure\s+\d+\s*[:.]", re.IGNORECASE)
+
+
+def _demote_headings(markdown: str, top_level: int) -> str:
+    """Shift all headings so the highest one becomes ``top_level`` (max 6)."""
+    lines = markdown.splitlines()
+    in_code = False
+    levels = []
+    for line in lines:
+        if line.startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _HEADING_PATTERN.match(line)
+        levels.append(len(match.group(1)) if match else None)
+
+    present = [level for level in levels if level]
+    if not present:
+        return markdown
+    shift = top_level - min(present)
+
+    return "\n".join(
+        (
+            "#" * min(level + shift, 6) + _HEADING_PATTERN.match(line).group(2)
+            if level
+            else line
+        )
+        for line, level in zip(lines, levels)
+    )
+
+
+def caption_figures(
+    markdown: str, out_dir: str, captions: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Number and caption figure embeds, dropping embeds of missing files.
+
+    Single pass over the lines (code blocks are left untouched): every embed
+    ``![alt](figures/x.png)`` whose file exists under ``out_dir`` gets a
+    "*Figure N: caption*" line, with the caption taken from ``captions``
+    (figure filename -> caption) or else from the alt text. A figure embedded
+    again keeps its first number. Captions already written after an embed
+    are replaced, and embeds of files that do not exist are removed with a
+    warning.
+
+    Args:
+        markdown: Report markdown.
+        out_dir: Directory the embed paths are relative to.
+        captions: Optional figure filename -> caption.
+
+    Returns:
+        str: The markdown with numbered captions.
+    """
+    captions = captions or {}
+    numbers = {}
+    out = []
+    in_code = False
+    drop_caption = False
+
+    for line in markdown.splitlines():
+        if line.startswith("```"):
+            in_code = not in_code
+        if in_code or not line.strip():
+            out.append(line)
+            continue
+        if drop_caption and _CAPTION_PATTERN.match(line):
+            # Caption from the LLM; replaced by the local one
+            drop_caption = False
+            continue
+        drop_caption = False
+
+        embeds = _EMBED_PATTERN.findall(line)
+        if not embeds:
+            out.append(line)
+            continue
+
+        new_captions = []
+        for alt, path in embeds:
+            if not os.path.isfile(os.path.join(out_dir, path)):
+                print(f"Warning: dropping embed of missing figure '{path}'.")
+                line = line.replace(f"![{alt}]({path})", "")
+                continue
+            filename = os.path.basename(path)
+            if filename not in numbers:
+                numbers[filename] = len(numbers) + 1
+            caption = captions.get(filename) or alt or filename
+            new_captions.append(f"*Figure {numbers[filename]}: {caption}*")
+
+        if line.strip():
+            out.append(line)
+        if new_captions:
+            out.append("")
+            out.extend(new_captions)
+            drop_caption = True
+
+    return "\n".join(out)
+
+
+def splice_sections(
+    summary_markdown: str,
+    section_markdowns: Dict[str, str],
+    analysis_title: str = "Analysis",
+    before_heading: str = "Recommendations",
+) -> str:
+    """
+    Insert full section reports into a summary as an analysis section.
+
+    The sections are placed under "## {analysis_title}", each with a
+    "### {title}" heading and its own headings demoted below it, just before
+    the summary's heading that contains ``before_heading`` (or at the end).
+
+    Args:
+        summary_markdown: Markdown with e.g. the executive summary and
+            recommendations.
+        section_markdowns: Section title -> full section markdown, in order.
+        analysis_title: Title of the inserted analysis section.
+        before_heading: Text of the summary heading to insert the sections before.
+
+    Returns:
+        str: The spliced markdown.
+    """
+    blocks = [f"## {analysis_title}"]
+    for title, markdown in section_markdowns.items():
+        blocks.append(f"### {title}")
+        blocks.append(_demote_headings(markdown.strip(), 4))
+    analysis = "\n\n".join(blocks)
+
+    lines = summary_markdown.strip().splitlines()
+    for idx, line in enumerate(lines):
+        if _HEADING_PATTERN.match(line) and before_heading.lower() in line.lower():
+            head = "\n".join(lines[:idx]).rstrip()
+            tail = "\n".join(lines[idx:])
+            return f"{head}\n\n{analysis}\n\n{tail}"
+    return f"{summary_markdown.strip()}\n\n{analysis}"
 
 
 def build_markdown_report(
@@ -17,6 +159,9 @@ def build_markdown_report(
     out_dir: str,
     report_title: str = "BMW Sales Analysis Report",
     intro_text: Optional[str] = None,
+    section_markdowns: Optional[Dict[str, str]] = None,
+    analysis_title: str = "Analysis",
+    figure_captions: Optional[Dict[str, str]] = None,
 ) -> str:
     """
     Combine multiple LLM-generated markdown reports into a single markdown file
@@ -27,12 +172,24 @@ def build_markdown_report(
         out_dir: Directory where report.md will be saved.
         report_title: Title for the markdown document.
         intro_text: Optional introductory text for the combined report.
+        section_markdowns: Optional section title -> full section markdown,
+            spliced into the first markdown before its recommendations
+            (see ``splice_sections``).
+        analysis_title: Title of the spliced analysis section.
+        figure_captions: Optional figure filename -> caption used for the
+            locally added "Figure N" captions (see ``caption_figures``).
 
     Returns:
         Path to the saved markdown file.
     """
     os.makedirs(out_dir, exist_ok=True)
 
+    if section_markdowns:
+        analysis_markdowns = [
+            splice_sections(analysis_markdowns[0], section_markdowns, analysis_title),
+            *analysis_markdowns[1:],
+        ]
+
     lines = []
 
     # Report title and timestamp
@@ -55,9 +212,11 @@ def build_markdown_report(
     # Join all lines with double newlines
     markdown_content = "\n\n".join(lines)
 
+    # Number and caption figures; drop embeds of missing files
+    markdown_content = caption_figures(markdown_content, out_dir, figure_captions)
+
     # Save combined markdown file
     out_path = os.path.join(out_dir, "report.md")
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(markdown_content)
+    get_default_writer().write_text(markdown_content, out_path)
 
     return out_path
@@ -0,0 +1,295 @@
+"""
+Atomic, optionally compressed and background writes of run artifacts.
+
+The JSON summaries, ``report.md`` and the run logs used to be written
+straight into their final path, so a crash mid-write left a truncated file
+that the next consumer would pick up. Every write now goes through
+``atomic_write``: the data is written to a temporary file in the same
+folder, flushed to disk and renamed over the final path, so readers see
+either the previous file or the complete new one. Renaming also replaces
+files hard-linked into the artifact store (see ``src.reporting.artifacts``)
+instead of editing the shared blob.
+
+``ArtifactWriter`` adds, for the JSON-like artifacts:
+
+- Serialization with the standard ``json`` module (default), ``orjson``
+  (faster, same output) or ``msgpack`` (binary, ``.msgpack`` files). Keys
+  are strings in every format, as in JSON, so all read back the same.
+- Optional ``gzip`` or ``zstd`` compression (``.gz`` / ``.zst`` suffix).
+- Write-behind: with ``background=True`` the data is serialized in the
+  calling thread and compressed and written by one background thread, so
+  the pipeline does not block on disk. ``flush`` waits for pending writes
+  and raises the first error.
+
+``read_artifact`` reads any of these variants back.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, Optional, Union
+
+import numpy as np
+
+SERIALIZERS = ("json", "orjson", "msgpack")
+COMPRESSIONS = (None, "gzip", "zstd")
+_COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def atomic_write(path: str, data: Union[bytes, str]) -> str:
+    """
+    Write ``data`` to ``path`` atomically (temporary file, fsync, rename).
+
+    Args:
+        path: Final path; its folder is created if needed.
+        data: Bytes, or text written as UTF-8.
+
+    Returns:
+        str: The path written.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=folder, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _to_builtin(value):
+    """Convert numpy scalars and arrays for serializers that do not know them."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _str_keys(obj):
+    """Copy of a JSON-like object with the dict keys converted as ``json`` does."""
+    if isinstance(obj, dict):
+        return {
+            (k if isinstance(k, str) else json.dumps(_to_key(k))): _str_keys(v)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_str_keys(v) for v in obj]
+    return obj
+
+
+def _to_key(key):
+    """Builtin value of a numpy dict key (json.dumps of it gives the JSON key)."""
+    return key.item() if isinstance(key, np.generic) else key
+
+
+def serialize(obj: Any, fmt: str = "json", indent: Optional[int] = 2) -> bytes:
+    """
+    Serialize a JSON-like object.
+
+    Args:
+        obj: Dicts, lists, strings and numbers (numpy scalars allowed).
+        fmt: "json", "orjson" or "msgpack".
+        indent: JSON indentation (orjson only supports 2), None for compact.
+
+    Returns:
+        bytes: The encoded object.
+    """
+    if fmt == "json":
+        return json.dumps(obj, indent=indent, default=_to_builtin).encode("utf-8")
+    if fmt == "orjson":
+        import orjson  # pylint: disable=import-outside-toplevel
+
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_to_builtin, option=options)
+    if fmt == "msgpack":
+        import msgpack  # pylint: disable=import-outside-toplevel
+
+        return msgpack.packb(_str_keys(obj), default=_to_builtin, use_bin_type=True)
+    raise ValueError(f"Unknown serializer {fmt!r}; expected one of {SERIALIZERS}.")
+
+
+def compress(data: bytes, compression: Optional[str] = None) -> bytes:
+    """Compress bytes with gzip or zstd (None returns them unchanged)."""
+    if compression is None:
+        return data
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(
+        f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}."
+    )
+
+
+def artifact_path(path: str, fmt: str = "json", compression: Optional[str] = None):
+    """Path of an artifact written with the given serializer and compression."""
+    if fmt == "msgpack":
+        path = os.path.splitext(path)[0] + ".msgpack"
+    return path + _COMPRESSION_SUFFIXES.get(compression, "")
+
+
+def resolve_artifact(path: str) -> Optional[str]:
+    """The existing variant of ``path`` (any serializer/compression), or None."""
+    for fmt in ("json", "msgpack"):
+        for compression in COMPRESSIONS:
+            candidate = artifact_path(path, fmt, compression)
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+
+def read_artifact(path: str) -> Any:
+    """
+    Read an artifact written by ``ArtifactWriter.write_json``.
+
+    Args:
+        path: Path of the artifact, or of its plain ``.json`` variant.
+
+    Returns:
+        The deserialized object.
+    """
+    resolved = resolve_artifact(path)
+    if resolved is None:
+        raise FileNotFoundError(path)
+    with open(resolved, "rb") as f:
+        data = f.read()
+
+    if resolved.endswith(".gz"):
+        data = gzip.decompress(data)
+        resolved = resolved[:-3]
+    elif resolved.endswith(".zst"):
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        data = zstandard.ZstdDecompressor().decompress(data)
+        resolved = resolved[:-4]
+
+    if resolved.endswith(".msgpack"):
+        import msgpack  # pylint: disable=import-outside-toplevel
+
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return json.loads(data)
+
+
+class ArtifactWriter:
+    """
+    Write run artifacts atomically, optionally compressed and in the background.
+
+    Args:
+        fmt: Serializer of ``write_json``: "json", "orjson" or "msgpack".
+        compression: None, "gzip" or "zstd" (applies to ``write_json``).
+        background: Compress and write on a background thread.
+        indent: JSON indentation, None for compact output.
+    """
+
+    def __init__(
+        self,
+        fmt: str = "json",
+        compression: Optional[str] = None,
+        background: bool = False,
+        indent: Optional[int] = 2,
+    ):
+        if fmt not in SERIALIZERS:
+            raise ValueError(
+                f"Unknown serializer {fmt!r}; expected one of {SERIALIZERS}."
+            )
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}."
+            )
+        self.fmt = fmt
+        self.compression = compression
+        self.indent = indent
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer")
+            if background
+            else None
+        )
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def _submit(self, func, *args) -> None:
+        """Run ``func`` now, or queue it on the background thread."""
+        if self._executor is None:
+            func(*args)
+            return
+        with self._lock:
+            self._pending.append(self._executor.submit(func, *args))
+
+    def _write_encoded(self, path: str, data: bytes) -> None:
+        atomic_write(path, compress(data, self.compression))
+
+    def write_json(self, obj: Any, path: str) -> str:
+        """
+        Write a JSON-like object with the writer's serializer and compression.
+
+        The object is serialized before returning, so the caller may modify
+        it while the write is pending.
+
+        Args:
+            obj: Object to write.
+            path: Path of the plain JSON file; the suffix is adapted to the
+                serializer and compression.
+
+        Returns:
+            str: The path the artifact is (or will be) written to.
+        """
+        out_path = artifact_path(path, self.fmt, self.compression)
+        self._submit(
+            self._write_encoded, out_path, serialize(obj, self.fmt, self.indent)
+        )
+        return out_path
+
+    def write_text(self, text: str, path: str) -> str:
+        """Write text (e.g. markdown) atomically, uncompressed."""
+        self._submit(atomic_write, path, text)
+        return path
+
+    def flush(self) -> None:
+        """Wait for the pending background writes; raise the first error."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors = [f.exception() for f in pending]
+        errors = [e for e in errors if e is not None]
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Flush and stop the background thread."""
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+
+
+_default_writer = ArtifactWriter()
+
+
+def get_default_writer() -> ArtifactWriter:
+    """Writer used for the run artifacts when none is passed."""
+    return _default_writer
+
+
+def set_default_writer(writer: ArtifactWriter) -> None:
+    """Replace the writer used for the run artifacts by default."""
+    global _default_writer  # pylint: disable=global-statement
+    _default_writer = writer
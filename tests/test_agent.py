@@ -0,0 +1,241 @@
+"""
+Tests for src.llm.agent and src.llm.backends modules.
+
+Runs the report agent end to end on the local template backend, without
+network access or an API key.
+"""
+
+import asyncio
+import os
+import time
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.agent import LLMReportAgent
+from src.llm.usage import TokenBudgetExceeded, UsageTracker
+from src.llm.backends import (
+    LLMBackend,
+    RecordingBackend,
+    ReplayBackend,
+    TemplateBackend,
+    create_backend,
+)
+
+
+@pytest.fixture
+def agent():
+    """Fixture providing a report agent on the deterministic local backend."""
+    return LLMReportAgent(backend=TemplateBackend())
+
+
+@pytest.fixture
+def sales_summary():
+    """Fixture providing a small sales summary for two regions."""
+    return {
+        "sales_by_year": {"2020": 300, "2021": 360},
+        "sales_by_region_year": {
+            "Asia": {"2020": 200, "2021": 220},
+            "Europe": {"2020": 100, "2021": 140},
+        },
+    }
+
+
+def test_sales_trend_report_embeds_plots(agent, sales_summary, tmp_path):
+    """Test that the local backend answers with the prompt's sections and plots."""
+    report = agent.analyze_sales_trend(sales_summary, str(tmp_path))
+
+    assert "## 1. Overall Sales Trend Analysis" in report
+    assert "## 2. Regional Sales Trend Analysis" in report
+    for filename in os.listdir(tmp_path):
+        assert f"](figures/{filename})" in report
+
+
+def test_async_reports_match_sync_and_overlap(sales_summary, tmp_path):
+    """
+    Test the async variants give the sync reports and run sections concurrently.
+    """
+    corr = pd.DataFrame({"Sales_Volume": [1.0, 0.3]}, index=["Sales_Volume", "Price"])
+    agent = LLMReportAgent(backend=TemplateBackend(latency_s=1.0))
+
+    async def both_sections():
+        return await asyncio.gather(
+            agent.analyze_sales_trend_async(sales_summary, str(tmp_path / "async")),
+            agent.analyze_correlation_matrix_async(corr, str(tmp_path / "async")),
+        )
+
+    start = time.perf_counter()
+    sales_async, corr_async = asyncio.run(both_sections())
+    elapsed = time.perf_counter() - start
+
+    assert sales_async == agent.analyze_sales_trend(
+        sales_summary, str(tmp_path / "sync")
+    )
+    assert corr_async == agent.analyze_correlation_matrix(corr, str(tmp_path / "sync"))
+    # The two LLM latencies overlap instead of adding up
+    assert elapsed < 2.0
+    assert agent.usage.summary()["run"]["calls"] == 4
+
+
+def test_template_backend_is_deterministic():
+    """Test that the same prompt yields the same text and estimated usage."""
+    backend = TemplateBackend()
+    prompt = "### Sections to Produce\n1. Summary\n\n### Plot Filename\nplot.png\n"
+
+    first = backend.generate_content("model", prompt)
+    second = backend.generate_content("model", prompt)
+
+    assert first.text == second.text
+    assert "![plot](figures/plot.png)" in first.text
+    assert first.usage_metadata.prompt_token_count == backend.count_tokens(
+        "model", prompt
+    )
+
+
+def test_combine_reports_keeps_all_embeds(agent, tmp_path):
+    """Test the combine step and the unknown backend error on the local backend."""
+    corr = pd.DataFrame({"Sales_Volume": [1.0, 0.3]}, index=["Sales_Volume", "Price"])
+    section = agent.analyze_correlation_matrix(corr, str(tmp_path))
+
+    combined = agent.combine_and_summarize_reports([section])
+
+    assert "## 1. Executive Summary" in combined
+    assert "### 4.1 Africa" in combined
+    for filename in os.listdir(tmp_path):
+        assert f"](figures/{filename})" in combined
+
+    with pytest.raises(ValueError):
+        create_backend("unknown")
+
+
+def test_record_and_replay_roundtrip(sales_summary, tmp_path):
+    """Test that a replayed run returns the recorded responses and usage."""
+    archive = tmp_path / "llm_calls.jsonl"
+    recorder = RecordingBackend(TemplateBackend(), str(archive))
+    recorded = LLMReportAgent(backend=recorder).analyze_sales_trend(
+        sales_summary, str(tmp_path)
+    )
+
+    replay = ReplayBackend(str(archive))
+    replayed = LLMReportAgent(backend=replay).analyze_sales_trend(
+        sales_summary, str(tmp_path)
+    )
+
+    assert replayed == recorded
+    assert len(replay.records) == 1
+
+    # Prompts that are not in the archive fail instead of calling the API
+    with pytest.raises(RuntimeError):
+        LLMReportAgent(backend=replay).analyze_sales_trend(
+            {**sales_summary, "sales_by_year": {"2020": 1}}, str(tmp_path)
+        )
+
+
+def test_usage_is_tracked_per_section(agent, sales_summary, tmp_path):
+    """Test that each call's token usage is aggregated per section and run."""
+    agent.analyze_sales_trend(sales_summary, str(tmp_path))
+    agent.analyze_sales_trend(sales_summary, str(tmp_path))
+
+    summary = agent.usage.summary()
+    section = summary["sections"]["sales_trend"]
+
+    assert section["calls"] == 2
+    assert section["input_tokens"] > 0 and section["output_tokens"] > 0
+    assert summary["run"]["total_tokens"] == agent.usage.used_tokens
+    assert summary["run"]["cost_usd"] > 0
+
+
+def test_token_budget_compacts_or_aborts(sales_summary, tmp_path):
+    """Test that an over-budget prompt is compacted, or aborts before the call."""
+    tracker = UsageTracker(
+        budget_tokens=100, budget_mode="compact", reserve_output_tokens=10
+    )
+    long_prompt = "word " * 200
+
+    assert tracker.admit("section", long_prompt, compact=lambda: "short") == "short"
+    assert tracker.compacted == ["section"]
+    with pytest.raises(TokenBudgetExceeded):
+        tracker.admit("section", long_prompt, compact=lambda: long_prompt)
+
+    agent = LLMReportAgent(
+        backend=TemplateBackend(), usage=UsageTracker(budget_tokens=100)
+    )
+    with pytest.raises(TokenBudgetExceeded):
+        agent.analyze_sales_trend(sales_summary, str(tmp_path))
+    assert agent.usage.summary()["run"]["calls"] == 0
+
+
+def test_token_budget_reserves_concurrent_calls(sales_summary, tmp_path):
+    """Test concurrent calls cannot all be admitted against the same budget."""
+    tracker = UsageTracker(budget_tokens=100, reserve_output_tokens=40)
+    tracker.admit("a", "short prompt")
+    tracker.admit("b", "other prompt")
+    with pytest.raises(TokenBudgetExceeded):
+        tracker.admit("c", "third prompt")
+    tracker.release("other prompt")
+    assert tracker.admit("c", "third prompt") == "third prompt"
+
+    # Three concurrent sections, room for two: the calls only complete once
+    # every section has asked for its budget
+    attempts = []
+
+    class CountingTracker(UsageTracker):
+        def admit(self, section, prompt, compact=None):
+            attempts.append(section)
+            return super().admit(section, prompt, compact)
+
+    class WaitingBackend(TemplateBackend):
+        async def generate_content_async(self, model, contents, config=None):
+            for _ in range(500):
+                if len(attempts) == 3:
+                    break
+                await asyncio.sleep(0.01)
+            return await super().generate_content_async(model, contents, config)
+
+    usage = CountingTracker(budget_tokens=12000, reserve_output_tokens=5000)
+    agent = LLMReportAgent(backend=WaitingBackend(), usage=usage)
+
+    async def run_sections():
+        return await asyncio.gather(
+            *(
+                agent.analyze_sales_trend_async(sales_summary, str(tmp_path / str(i)))
+                for i in range(3)
+            ),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run_sections())
+
+    assert sum(isinstance(r, TokenBudgetExceeded) for r in results) == 1
+    assert usage.summary()["run"]["calls"] == 2
+    assert usage.used_tokens <= 12000 and usage.reserved_tokens == 0
+
+
+def test_hierarchical_combine_sends_only_digests(agent, sales_summary, tmp_path):
+    """Test that section digests keep figure references and feed the summary."""
+    section = agent.analyze_sales_trend(sales_summary, str(tmp_path))
+
+    digest = agent.digest_section_report("Sales Trend Analysis", section)
+    summary = agent.summarize_section_digests({"Sales Trend Analysis": digest})
+
+    for filename in os.listdir(tmp_path):
+        assert f"figures/{filename}" in digest
+    assert "## 1. Executive Summary" in summary
+    assert "## 3. Recommendations" in summary
+
+
+def test_backend_interface_is_abstract():
+    """Test a backend must implement generate_content and count_tokens."""
+
+    class NoTokenCount(LLMBackend):
+        def generate_content(self, model, contents, config=None):
+            return None
+
+    with pytest.raises(TypeError, match="count_tokens"):
+        NoTokenCount()
+    with pytest.raises(TypeError):
+        LLMBackend()
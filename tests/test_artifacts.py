@@ -0,0 +1,94 @@
+"""
+Tests for src.reporting.artifacts module.
+
+Identical files of different runs must share one blob, run directories must
+keep their content, and retention plus compaction must only remove expired
+runs and the blobs nothing links to any more.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.reporting.artifacts import MANIFEST_FILENAME, ArtifactStore
+
+
+def write_run(root, name, figure=b"png-bytes", report="# Report"):
+    """Write a small run directory with a figure, a summary and a report."""
+    run_dir = root / name
+    (run_dir / "figures").mkdir(parents=True)
+    (run_dir / "figures" / "sales.png").write_bytes(figure)
+    (run_dir / "sales_summary.json").write_text('{"2020": 1}')
+    (run_dir / "report.md").write_text(report)
+    return str(run_dir)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Artifact store on an empty reports root."""
+    return ArtifactStore(str(tmp_path))
+
+
+def test_ingest_deduplicates_identical_files(store, tmp_path):
+    """Test identical files of two runs become hard links to one blob."""
+    first = write_run(tmp_path, "run_2025_01_01_00_00_00")
+    second = write_run(tmp_path, "run_2025_01_02_00_00_00", report="# Other")
+
+    assert store.ingest(first)["deduplicated"] == 0
+    stats = store.ingest(second)
+
+    assert stats["files"] == 3
+    assert stats["deduplicated"] == 2
+    assert os.path.samefile(
+        os.path.join(first, "figures", "sales.png"),
+        os.path.join(second, "figures", "sales.png"),
+    )
+    assert open(os.path.join(second, "report.md")).read() == "# Other"
+    with open(os.path.join(second, MANIFEST_FILENAME)) as f:
+        manifest = json.load(f)
+    assert set(manifest) == {"figures/sales.png", "report.md", "sales_summary.json"}
+
+    usage = store.disk_usage()
+    assert usage["stored_bytes"] < usage["logical_bytes"]
+    # Ingesting again changes nothing
+    assert store.ingest(second)["deduplicated"] == 0
+
+
+def test_retention_keeps_newest_and_pinned_runs(store, tmp_path):
+    """Test expired runs are chosen by count and age, and .keep pins a run."""
+    runs = [write_run(tmp_path, f"run_2025_01_0{day}_00_00_00") for day in (1, 2, 3)]
+    (tmp_path / "run_2025_01_01_00_00_00" / ".keep").write_text("")
+    now = datetime(2025, 1, 10)
+
+    assert store.expired_runs() == []
+    assert store.expired_runs(keep_last=1, now=now) == [runs[1]]
+    assert store.expired_runs(max_age_days=7.5, now=now) == [runs[1]]
+    assert store.expired_runs(keep_last=1, max_age_days=8.5, now=now) == []
+    with pytest.raises(ValueError):
+        store.expired_runs(keep_last=0)
+
+
+def test_compact_removes_expired_runs_and_orphan_blobs(store, tmp_path):
+    """Test compaction ingests old runs and frees blobs only expired runs used."""
+    old = write_run(tmp_path, "run_2025_01_01_00_00_00", figure=b"old figure")
+    new = write_run(tmp_path, "run_2025_01_02_00_00_00")
+    store.ingest(old)
+
+    result = store.compact(keep_last=1)
+
+    assert result["removed_runs"] == [old]
+    assert not os.path.exists(old)
+    # Only the old figure was unique to the expired run
+    assert len(result["removed_blobs"]) == 1
+    assert result["after"]["runs"] == 1
+    assert open(os.path.join(new, "figures", "sales.png"), "rb").read() == (
+        b"png-bytes"
+    )
+    assert store.unreferenced_blobs() == []
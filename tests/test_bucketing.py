@@ -0,0 +1,77 @@
+"""
+Tests for src.data_processing.bucketing module.
+
+Validates the top-N / minimum-share policy that collapses the model long
+tail into an "Other" series.
+"""
+
+import os
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing.bucketing import (
+    OTHER_LABEL,
+    bucket_long_tail,
+    has_other_bucket,
+)
+
+
+@pytest.fixture
+def year_records():
+    """Fixture providing model sales by year with a long tail of small models."""
+    return {
+        "2020": [
+            {"Model": "X5", "Total_Sales": 100},
+            {"Model": "X3", "Total_Sales": 50},
+            {"Model": "i8", "Total_Sales": 5},
+            {"Model": "Z4", "Total_Sales": 3},
+        ],
+        "2021": [
+            {"Model": "X3", "Total_Sales": 120},
+            {"Model": "X5", "Total_Sales": 80},
+            {"Model": "M2", "Total_Sales": 4},
+        ],
+    }
+
+
+def test_bucket_long_tail_top_n(year_records):
+    """
+    Test the top-N models are kept and the rest summed per year into "Other".
+    """
+    result = bucket_long_tail(year_records, top_n=2)
+
+    assert result == {
+        "2020": [
+            {"Model": "X5", "Total_Sales": 100},
+            {"Model": "X3", "Total_Sales": 50},
+            {"Model": OTHER_LABEL, "Total_Sales": 8},
+        ],
+        "2021": [
+            {"Model": "X3", "Total_Sales": 120},
+            {"Model": "X5", "Total_Sales": 80},
+            {"Model": OTHER_LABEL, "Total_Sales": 4},
+        ],
+    }
+    assert has_other_bucket({"Europe": result})
+    # Total sales per year are preserved
+    for year, records in year_records.items():
+        assert sum(e["Total_Sales"] for e in result[year]) == sum(
+            e["Total_Sales"] for e in records
+        )
+
+
+def test_bucket_long_tail_min_share_and_noop(year_records):
+    """
+    Test the share threshold, and that a single small model is not renamed.
+    """
+    assert bucket_long_tail(year_records, min_share=0.02) == bucket_long_tail(
+        year_records, top_n=2
+    )
+    # Only Z4 would be collapsed
+    assert bucket_long_tail(year_records, top_n=4) is year_records
+    assert bucket_long_tail(year_records) is year_records
+    assert not has_other_bucket(year_records)
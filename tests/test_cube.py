@@ -0,0 +1,98 @@
+"""
+Tests for src.data_processing.cube module.
+
+Roll-ups and slices answered from the materialized cube must match a
+direct pandas groupby on the raw rows, and the cube must survive a
+save/load round trip.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing.cube import SalesCube
+
+
+@pytest.fixture
+def sales_df():
+    """Random sales data covering every cube dimension."""
+    rng = np.random.default_rng(2)
+    n = 500
+    return pd.DataFrame(
+        {
+            "Model": rng.choice(["X5", "X3", "i8"], n),
+            "Year": rng.choice([2020, 2021, 2022], n),
+            "Region": rng.choice(["Europe", "Asia"], n),
+            "Color": rng.choice(["Black", "White"], n),
+            "Fuel_Type": rng.choice(["Petrol", "Electric"], n),
+            "Transmission": rng.choice(["Manual", "Automatic"], n),
+            "Price_USD": rng.integers(30000, 120000, n),
+            "Sales_Volume": rng.integers(100, 10000, n),
+        }
+    )
+
+
+def test_rollup_matches_groupby(sales_df):
+    """
+    Test a two-dimension roll-up equals sum/count/mean from groupby.
+    """
+    cube = SalesCube.from_dataframe(sales_df).materialize()
+    result = cube.rollup(["Fuel_Type", "Year"])
+
+    expected = sales_df.groupby(["Fuel_Type", "Year"])["Sales_Volume"].agg(
+        ["sum", "count", "mean"]
+    )
+    assert list(result.index.names) == ["Fuel_Type", "Year"]
+    assert np.allclose(
+        result[["Sales_Volume_sum", "Sales_Volume_count", "Sales_Volume_mean"]],
+        expected,
+    )
+
+
+def test_rollup_slice(sales_df):
+    """
+    Test slicing by a dimension value before rolling up.
+    """
+    cube = SalesCube.from_dataframe(sales_df)
+    result = cube.rollup(["Transmission"], Region="Europe")
+
+    europe = sales_df[sales_df["Region"] == "Europe"]
+    expected = europe.groupby("Transmission")["Price_USD"].mean()
+    assert np.allclose(result["Price_USD_mean"], expected)
+
+
+def test_rollup_unknown_dimension(sales_df):
+    """
+    Test rolling up an unknown dimension raises ValueError.
+    """
+    cube = SalesCube.from_dataframe(sales_df)
+    with pytest.raises(ValueError, match="Unknown cube dimensions"):
+        cube.rollup(["Dealer"])
+
+
+def test_load_or_build_reuses_saved_cube(sales_df, tmp_path, monkeypatch):
+    """
+    Test the cube is persisted and reused for the same rows, even reshuffled.
+    """
+    path = str(tmp_path / "cube.pkl")
+    cube = SalesCube.load_or_build(sales_df, path)
+    assert os.path.exists(path)
+    saved_mtime = os.stat(path).st_mtime_ns
+
+    def rebuild(*args, **kwargs):
+        raise AssertionError("the saved cube was rebuilt")
+
+    monkeypatch.setattr(SalesCube, "from_dataframe", rebuild)
+    shuffled = sales_df.sample(frac=1, random_state=0)
+    reloaded = SalesCube.load_or_build(shuffled, path)
+    assert os.stat(path).st_mtime_ns == saved_mtime
+    assert reloaded.fingerprint == cube.fingerprint
+    pd.testing.assert_frame_equal(
+        reloaded.rollup(["Price_Band"]), cube.rollup(["Price_Band"])
+    )
@@ -0,0 +1,119 @@
+"""
+Tests for src.data_processing.digest module.
+
+Validates the precomputed growth, share and mover facts that replace
+the full summary tables in LLM prompts.
+"""
+
+import os
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing import digest
+
+
+@pytest.fixture
+def year_models_dict():
+    """Fixture providing model sales by year for three models."""
+    return {
+        "2020": [
+            {"Model": "X5", "Total_Sales": 100},
+            {"Model": "X3", "Total_Sales": 50},
+            {"Model": "i8", "Total_Sales": 10},
+        ],
+        "2021": [
+            {"Model": "X3", "Total_Sales": 120},
+            {"Model": "X5", "Total_Sales": 80},
+            {"Model": "i8", "Total_Sales": 20},
+        ],
+    }
+
+
+def test_digest_models_by_year(year_models_dict):
+    """
+    Test market growth, top-k and rank changes of the model digest.
+    """
+    result = digest.digest_models_by_year(year_models_dict, top_k=1)
+
+    assert result["market"]["first"] == 160
+    assert result["market"]["last"] == 220
+    assert result["market"]["yoy_pct"] == {"2021": 37.5}
+
+    assert result["top_k_last_year"] == [
+        {"Model": "X3", "Sales": 120, "Share_pct": 54.5}
+    ]
+    assert result["top_growth_cagr_pct"] == [{"Model": "X3", "CAGR_pct": 140.0}]
+    assert result["rank_climbers"] == [{"Model": "X3", "Ranks": 1}]
+    assert result["rank_fallers"] == [{"Model": "X5", "Ranks": 1}]
+
+
+def test_digest_rank_fallers_are_the_largest_drops():
+    """
+    Test the rank fallers are the models that lost the most ranks.
+    """
+    models = "ABCDEF"
+    year_models = {
+        "2020": [
+            {"Model": m, "Total_Sales": 600 - 100 * i} for i, m in enumerate(models)
+        ],
+        "2021": [
+            {"Model": m, "Total_Sales": 100 + 100 * i} for i, m in enumerate(models)
+        ],
+    }
+
+    result = digest.digest_models_by_year(year_models, top_k=2)
+
+    assert result["rank_fallers"] == [
+        {"Model": "A", "Ranks": 5},
+        {"Model": "B", "Ranks": 3},
+    ]
+    assert result["rank_climbers"] == [
+        {"Model": "F", "Ranks": 5},
+        {"Model": "E", "Ranks": 3},
+    ]
+
+
+def test_digest_sales_summary():
+    """
+    Test regional share and CAGR in the sales digest.
+    """
+    summary = {
+        "sales_by_year": {"2020": 200, "2022": 288},
+        "sales_by_region_year": {
+            "Europe": {"2020": 100, "2022": 144},
+            "Asia": {"2020": 100, "2022": 144},
+        },
+    }
+    result = digest.digest_sales_summary(summary)
+
+    assert result["overall"]["cagr_pct"] == 20.0
+    assert result["regions"]["Europe"]["share_of_all_sales_last_year_pct"] == 50.0
+
+
+def test_digest_to_text(year_models_dict):
+    """
+    Test the rendered facts list records once with their field names.
+    """
+    text = digest.digest_to_text(digest.digest_models_by_year(year_models_dict))
+    assert "top_k_last_year [Model|Sales|Share_pct]: X3|120|54.5; X5|80|36.4" in text
+    assert "market: years=2020-2021" in text
+
+
+def test_digest_models_by_year_other_bucket(year_models_dict):
+    """
+    Test the "Other" bucket counts towards shares but is not ranked as a model.
+    """
+    for records in year_models_dict.values():
+        records.append({"Model": "Other", "Total_Sales": 500})
+    result = digest.digest_models_by_year(year_models_dict, top_k=1)
+
+    assert result["n_models"] == 3
+    assert result["top_k_last_year"] == [
+        {"Model": "X3", "Sales": 120, "Share_pct": 16.7}
+    ]
+    assert result["other_share_last_year_pct"] == 69.4
+    assert result["market"]["last"] == 720
@@ -0,0 +1,136 @@
+"""
+Tests for src.data_processing.engines module.
+
+Every query engine must give the loader exactly the pandas summaries and the
+pandas correlations (up to floating-point rounding), for raw and normalized
+frames alike.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing import loader
+from src.data_processing.engines import (
+    ENGINES,
+    QueryEngine,
+    create_engine,
+    get_default_engine,
+    set_default_engine,
+)
+from src.data_processing.memory import normalize_sales_frame
+
+
+@pytest.fixture
+def sales_df():
+    """Sales rows with missing sales and a missing Region."""
+    rng = np.random.default_rng(11)
+    n = 500
+    sales = rng.integers(100, 10000, n).astype(float)
+    sales[::41] = np.nan
+    regions = rng.choice(["Europe", "Asia", "Africa"], n).astype(object)
+    regions[7] = None
+    return pd.DataFrame(
+        {
+            "Model": rng.choice(["X5", "X3", "i8", "M4", "7 Series"], n),
+            "Year": rng.choice([2020, 2021, 2022, 2023], n),
+            "Region": regions,
+            "Fuel_Type": rng.choice(["Petrol", "Electric", "Diesel"], n),
+            "Price_USD": rng.integers(30000, 120000, n),
+            "Sales_Volume": sales,
+        }
+    )
+
+
+@pytest.fixture
+def restore_engine():
+    """Restore the default engine after the test."""
+    engine = get_default_engine()
+    yield
+    set_default_engine(engine)
+
+
+def _results(df, tmp_path):
+    return (
+        loader.summarize_sales_by_region_year(df, str(tmp_path / "a.json")),
+        loader.summarize_models_by_year(df, str(tmp_path / "b.json"), top_n=3),
+        loader.summarize_models_by_region_year(df, str(tmp_path / "c.json")),
+        loader.explore_key_drivers_of_sales(df),
+    )
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("normalized", [False, True])
+def test_engines_match_pandas(sales_df, tmp_path, restore_engine, engine, normalized):
+    """Test each engine's summaries equal the pandas ones and correlations agree."""
+    df = normalize_sales_frame(sales_df) if normalized else sales_df
+    set_default_engine(create_engine("pandas"))
+    expected = _results(df, tmp_path)
+
+    set_default_engine(create_engine(engine))
+    result = _results(df, tmp_path)
+
+    assert result[:3] == expected[:3]
+    assert list(result[3].index) == list(expected[3].index)
+    np.testing.assert_allclose(
+        result[3]["Correlation_with_Sales_Volume"],
+        expected[3]["Correlation_with_Sales_Volume"],
+        atol=1e-12,
+    )
+
+
+def test_create_engine_rejects_unknown_name():
+    """Test an unknown engine name fails with the available engines listed."""
+    with pytest.raises(ValueError, match="duckdb"):
+        create_engine("spark")
+
+
+def test_engine_interface_is_abstract():
+    """Test an engine must implement the group totals and the correlations."""
+
+    class TotalsOnly(QueryEngine):
+        def _group_totals(self, df, keys):
+            return df.groupby(keys)["Sales_Volume"].sum().reset_index()
+
+    with pytest.raises(TypeError, match="sales_correlations"):
+        TotalsOnly()
+
+
+@pytest.mark.parametrize("engine", ["duckdb", "polars"])
+def test_engine_converts_each_column_once(sales_df, monkeypatch, engine):
+    """Test an engine reuses the converted columns of the same frame."""
+    engine = create_engine(engine)
+    converted = []
+    convert = engine._converted._convert
+    monkeypatch.setattr(
+        engine._converted, "_convert", lambda s: converted.append(s.name) or convert(s)
+    )
+    df = normalize_sales_frame(sales_df)
+
+    engine.group_totals(df, ["Year"])
+    engine.group_totals(df, ["Region", "Year"])
+    engine.group_totals(df, ["Region", "Year", "Model"])
+
+    assert sorted(converted) == ["Model", "Region", "Sales_Volume", "Year"]
+
+
+@pytest.mark.parametrize("engine", ["duckdb", "polars"])
+def test_engine_does_not_reuse_another_frames_data(sales_df, engine):
+    """Test an engine given a new frame aggregates its rows, not the last frame's."""
+    engine = create_engine(engine)
+    pandas = create_engine("pandas")
+    first = normalize_sales_frame(sales_df)
+    second = first.assign(Sales_Volume=first["Sales_Volume"] * 2)
+
+    for df in (first, second, first.iloc[:100]):
+        pd.testing.assert_frame_equal(
+            engine.group_totals(df, ["Region", "Year"]),
+            pandas.group_totals(df, ["Region", "Year"]),
+        )
@@ -0,0 +1,96 @@
+"""
+Tests for src.data_processing.excel module.
+
+Multi-sheet workbooks must load into one frame with a consistent schema,
+whatever the engine and the number of worker processes.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing import loader
+from src.data_processing.excel import (
+    EXCEL_ENGINES,
+    read_workbook,
+    resolve_engine,
+)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Two market sheets with reordered columns, an extra column and text sales."""
+    path = str(tmp_path / "markets.xlsx")
+    europe = pd.DataFrame(
+        {
+            "Model": ["X5", "i8"],
+            "Year": [2020, 2021],
+            "Region": ["Europe", "Europe"],
+            "Sales_Volume": [100, 200],
+        }
+    )
+    asia = pd.DataFrame(
+        {
+            " Region ": ["Asia", "Asia", "Asia"],
+            "Year": [2020, 2020, 2021],
+            "Model": ["X3", "X5", "X3"],
+            "Sales_Volume": ["300", "n/a", "500"],
+            "Color": ["Red", "Blue", "Red"],
+        }
+    )
+    with pd.ExcelWriter(path) as writer:
+        europe.to_excel(writer, sheet_name="Europe", index=False)
+        asia.to_excel(writer, sheet_name="Asia", index=False)
+        pd.DataFrame().to_excel(writer, sheet_name="Notes", index=False)
+    return path
+
+
+@pytest.mark.parametrize("engine", EXCEL_ENGINES)
+def test_sheets_concatenated_with_one_schema(workbook, engine):
+    """Test all sheets are read, aligned to the first sheet's columns and types."""
+    df = read_workbook(workbook, engine=engine, n_workers=1, sheet_column="Sheet")
+
+    assert list(df.columns) == [
+        "Model",
+        "Year",
+        "Region",
+        "Sales_Volume",
+        "Color",
+        "Sheet",
+    ]
+    assert df["Sheet"].tolist() == ["Europe"] * 2 + ["Asia"] * 3
+    assert df["Region"].tolist() == ["Europe"] * 2 + ["Asia"] * 3
+    assert pd.api.types.is_numeric_dtype(df["Sales_Volume"])
+    assert df["Sales_Volume"].tolist()[:3] == [100, 200, 300]
+    assert pd.isna(df["Sales_Volume"][3])
+    assert df["Color"].isna().sum() == 2
+
+
+def test_parallel_and_engines_give_the_same_frame(workbook):
+    """Test worker processes and both engines load identical frames."""
+    expected = read_workbook(workbook, engine="openpyxl", n_workers=1)
+
+    pd.testing.assert_frame_equal(
+        read_workbook(workbook, engine="calamine", n_workers=2), expected
+    )
+    pd.testing.assert_frame_equal(loader.load_dataset(workbook), expected)
+
+    # A selected sheet keeps its own column order
+    asia = loader.load_dataset(workbook, sheets=["Asia"])
+    assert list(asia.columns) == ["Region", "Year", "Model", "Sales_Volume", "Color"]
+    assert len(asia) == 3
+
+
+def test_invalid_engine_and_sheet_are_rejected(workbook):
+    """Test unknown engines and sheets fail with the available choices listed."""
+    assert resolve_engine("auto") in EXCEL_ENGINES
+    with pytest.raises(ValueError, match="calamine"):
+        resolve_engine("xlrd")
+    with pytest.raises(ValueError, match="Europe"):
+        read_workbook(workbook, sheets=["Americas"])
@@ -0,0 +1,137 @@
+"""
+Tests for src.llm.hedging module.
+
+Checks answer validation and that hedged calls race slow requests and
+retry invalid answers, on the local template backend.
+"""
+
+import asyncio
+import os
+import time
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.agent import LLMReportAgent
+from src.llm.backends import TemplateBackend, make_response
+from src.llm.hedging import (
+    HEDGE_LOG_FILENAME,
+    HedgePolicy,
+    alternative_prompt,
+    load_hedge_history,
+    validation_problems,
+)
+
+
+class FlakyBackend(TemplateBackend):
+    """Template backend whose first answer is empty and slow."""
+
+    def __init__(self, first_delay_s: float = 0.0):
+        super().__init__()
+        self.first_delay_s = first_delay_s
+        self.prompts = []
+
+    async def generate_content_async(self, model, contents, config=None):
+        self.prompts.append(contents)
+        if len(self.prompts) == 1:
+            await asyncio.sleep(self.first_delay_s)
+            return make_response("", 10, model)
+        return await super().generate_content_async(model, contents, config)
+
+
+@pytest.fixture
+def corr():
+    """Fixture providing a small correlation vector."""
+    return pd.DataFrame({"Sales_Volume": [1.0, 0.3]}, index=["Sales_Volume", "Price"])
+
+
+def test_validation_problems():
+    """Test empty answers, missing figure embeds and empty parts are reported."""
+    assert validation_problems("  ") == ["empty response"]
+    assert validation_problems("![a](figures/a.png)", ["a.png", "b.png"]) == [
+        "missing figure embed: b.png"
+    ]
+    assert validation_problems("![a](figures/a.png)", ["a.png"]) == []
+    assert validation_problems("## 1. A\n\n![a](figures/a.png)", (), ["1. A"]) == [
+        "empty part: 1. A"
+    ]
+
+
+def test_invalid_answer_is_retried_with_alternative_prompt(corr, tmp_path):
+    """Test an empty answer triggers an alternative prompt whose answer wins."""
+    backend = FlakyBackend()
+    agent = LLMReportAgent(backend=backend, hedge=HedgePolicy(initial_delay_s=10))
+
+    report = asyncio.run(agent.analyze_correlation_matrix_async(corr, str(tmp_path)))
+
+    assert "](figures/correlation_vector.png)" in report
+    assert "MUST embed every one of these figures" in backend.prompts[1]
+    assert agent.hedge.summary()["hedges"] == {"invalid": 1}
+    assert agent.usage.summary()["run"]["calls"] == 2
+
+
+def test_slow_call_is_raced_by_a_duplicate(corr, tmp_path):
+    """Test a call slower than the hedge delay is raced and the duplicate wins."""
+    backend = FlakyBackend(first_delay_s=5)
+    policy = HedgePolicy(initial_delay_s=0.2, min_delay_s=0, max_attempts=2)
+    agent = LLMReportAgent(backend=backend, hedge=policy)
+
+    start = time.perf_counter()
+    report = asyncio.run(agent.analyze_correlation_matrix_async(corr, str(tmp_path)))
+
+    assert time.perf_counter() - start < 4
+    assert "](figures/correlation_vector.png)" in report
+    assert backend.prompts[0] == backend.prompts[1]
+    assert policy.summary()["hedges"] == {"latency": 1}
+
+
+def test_delay_follows_each_section_latencies():
+    """Test the hedge delay of a section only uses that section's latencies."""
+    policy = HedgePolicy(min_samples=2, initial_delay_s=30, min_delay_s=0)
+    for _ in range(3):
+        policy.observe("combine", 20.0)
+        policy.observe("correlation", 2.0)
+
+    assert policy.delay("correlation") == pytest.approx(2.0)
+    assert policy.delay("combine") == pytest.approx(20.0)
+    assert policy.delay("sales_trend") == 30
+    assert policy.summary()["delay_s"] == {"combine": 20.0, "correlation": 2.0}
+
+
+def test_alternative_prompt_of_a_structured_request():
+    """Test a structured retry asks for the JSON object, not markdown embeds."""
+    prompt = alternative_prompt("p", ["a.png"], structured=True)
+
+    assert "complete JSON object" in prompt
+    assert "markdown" not in prompt and "a.png" not in prompt
+
+
+def test_delay_is_seeded_from_previous_runs(corr, tmp_path):
+    """Test a section called once per run is hedged at its latency of past runs."""
+    root = tmp_path / "reports"
+    for day in (1, 2, 3):
+        run_dir = root / f"run_2025_01_0{day}_00_00_00"
+        policy = HedgePolicy(initial_delay_s=30)
+        agent = LLMReportAgent(backend=TemplateBackend(latency_s=0.05), hedge=policy)
+        asyncio.run(agent.analyze_correlation_matrix_async(corr, str(run_dir)))
+        policy.save(str(run_dir / HEDGE_LOG_FILENAME))
+
+    current = root / "run_2025_01_04_00_00_00"
+    history = load_hedge_history(str(root), str(current))
+    assert len(history["correlation"]) == 3
+    policy = HedgePolicy(initial_delay_s=30, min_delay_s=0, max_attempts=2)
+    policy.seed(history)
+    assert policy.delay("correlation") < 1
+
+    # The slow first attempt is raced at the seeded threshold, not after 30s
+    agent = LLMReportAgent(backend=FlakyBackend(first_delay_s=5), hedge=policy)
+    start = time.perf_counter()
+    report = asyncio.run(agent.analyze_correlation_matrix_async(corr, str(current)))
+
+    assert time.perf_counter() - start < 4
+    assert "](figures/correlation_vector.png)" in report
+    assert policy.summary()["hedges"] == {"latency": 1}
@@ -0,0 +1,123 @@
+"""
+Tests for src.reporting.incremental module.
+
+A differential re-run must reuse exactly the sections and figures whose
+inputs are unchanged, and regenerate the final summary only when a
+section changed.
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.tools import PlotTool
+from src.reporting.incremental import (
+    MANIFEST_FILENAME,
+    RunCache,
+    find_previous_run,
+    fingerprint,
+)
+from src.reporting.writer import atomic_write
+
+REGIONS = {
+    "Asia": {"2020": [{"Model": "X5", "Total_Sales": 10}]},
+    "Europe": {"2020": [{"Model": "X3", "Total_Sales": 20}]},
+}
+
+
+def run_sections(run_dir, regions, previous_dir=None, figure_version="png"):
+    """One region section and the summary, reused where possible; returns the cache."""
+    cache = RunCache(run_dir, previous_dir, figure_version=figure_version)
+    plot_tool = PlotTool()
+    plot_tool.figure_cache = cache
+    key = fingerprint("settings", "models_by_region_report", regions)
+    if cache.reuse_section("models_by_region_report", key) is None:
+        paths = plot_tool.generate_region_model_plots(regions, cache.figures_dir)
+        figures = sorted(os.path.basename(p) for p in paths.values())
+        markdown = "".join(f"![{f}](figures/{f})\n" for f in figures)
+        markdown += json.dumps(regions)  # the analysis of the data
+        cache.add_section("models_by_region_report", key, markdown, figures=figures)
+    markdown = cache.manifest["sections"]["models_by_region_report"]["markdown"]
+    combine_key = fingerprint("settings", markdown)
+    if cache.reuse_combined(combine_key) is None:
+        cache.add_combined(combine_key, "summary of " + markdown)
+    atomic_write(os.path.join(run_dir, MANIFEST_FILENAME), json.dumps(cache.manifest))
+    return cache
+
+
+def test_fingerprint_depends_on_content_only():
+    """Test fingerprints ignore key order and follow DataFrame content."""
+    df = pd.DataFrame({"Feature": ["Price", "Year"], "Gain": [0.7, 0.3]})
+
+    assert fingerprint({"a": 1, "b": 2}, df) == fingerprint({"b": 2, "a": 1}, df.copy())
+    changed = df.assign(Gain=[0.6, 0.4])
+    assert fingerprint(df) != fingerprint(changed)
+    assert fingerprint(df) != fingerprint(df.rename(columns={"Gain": "Weight"}))
+
+
+def test_rerun_reuses_unchanged_sections_and_figures(tmp_path):
+    """Test unchanged inputs reuse everything, one changed region only its plot."""
+    first = run_sections(str(tmp_path / "run_1"), REGIONS)
+    assert first.reused_sections == [] and first.reused_figures == []
+
+    same = run_sections(str(tmp_path / "run_2"), REGIONS, str(tmp_path / "run_1"))
+    assert same.summary() == {
+        "previous_run": "run_1",
+        "reused_sections": ["models_by_region_report"],
+        "reused_figures": 2,
+        "reused_combined": True,
+    }
+    assert sorted(os.listdir(tmp_path / "run_2" / "figures")) == sorted(
+        os.listdir(tmp_path / "run_1" / "figures")
+    )
+    assert same.manifest["figures"] == first.manifest["figures"]
+
+    # Only Europe changed: the section and the summary are regenerated, the
+    # Asia plot is copied and the Europe plot drawn again
+    regions = dict(REGIONS, Europe={"2020": [{"Model": "X3", "Total_Sales": 25}]})
+    changed = run_sections(str(tmp_path / "run_3"), regions, str(tmp_path / "run_2"))
+    summary = changed.summary()
+    assert summary["reused_sections"] == [] and not summary["reused_combined"]
+    assert [f for f in changed.reused_figures if "Asia" in f] == changed.reused_figures
+    assert len(changed.reused_figures) == 1
+    assert len(os.listdir(tmp_path / "run_3" / "figures")) == 2
+
+
+def test_figure_settings_change_regenerates_section(tmp_path):
+    """Test a section whose figures would be drawn differently is not reused."""
+    run_sections(str(tmp_path / "run_1"), REGIONS)
+
+    svg = run_sections(
+        str(tmp_path / "run_2"), REGIONS, str(tmp_path / "run_1"), figure_version="svg"
+    )
+
+    assert svg.reused_sections == [] and svg.reused_figures == []
+    first = json.load(open(tmp_path / "run_1" / MANIFEST_FILENAME))["figures"]
+    for name, record in svg.manifest["figures"].items():
+        assert record["data"] == first[name]["data"]
+        assert record["fingerprint"] != first[name]["fingerprint"]
+
+
+def test_latest_previous_run_has_a_manifest(tmp_path):
+    """Test "latest" skips the current run and runs without a manifest."""
+    root = tmp_path / "reports"
+    for name in ("run_2025_01_01_00_00_00", "run_2025_01_02_00_00_00"):
+        os.makedirs(root / name)
+    atomic_write(str(root / "run_2025_01_01_00_00_00" / MANIFEST_FILENAME), "{}")
+    current = str(root / "run_2025_01_03_00_00_00")
+    os.makedirs(current)
+    atomic_write(os.path.join(current, MANIFEST_FILENAME), "{}")
+
+    previous = find_previous_run(str(root), current, "latest")
+
+    assert os.path.basename(previous) == "run_2025_01_01_00_00_00"
+    assert find_previous_run(str(tmp_path), current, "latest") is None
+    with pytest.raises(ValueError, match=MANIFEST_FILENAME):
+        find_previous_run(str(root), current, str(root / "run_2025_01_02_00_00_00"))
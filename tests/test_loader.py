@@ -148,3 +148,32 @@ def test_xgboost_key_drivers(sample_df):
 
     # All importance scores should be non-negative
     assert (importance_df["importance"] >= 0).all()
+
+
+def test_xgboost_key_drivers_bootstrap(sample_df):
+    """
+    Test bootstrapped XGBoost importances.
+    Checks the interval columns and that each interval brackets its mean.
+    """
+    importance_df = loader.xgboost_key_drivers_bootstrap(
+        sample_df, row_budget=3, n_bootstraps=4, n_jobs=2
+    )
+    assert isinstance(importance_df, pd.DataFrame)
+    assert not importance_df.empty
+    assert {"importance", "std", "ci_lower", "ci_upper"} <= set(importance_df.columns)
+
+    assert (importance_df["ci_lower"] <= importance_df["importance"]).all()
+    assert (importance_df["importance"] <= importance_df["ci_upper"]).all()
+    assert importance_df["importance"].is_monotonic_decreasing
+
+
+def test_allocate_rows_respects_the_budget():
+    """
+    Test the stratified allocation of the bootstrap row budget.
+    Checks the counts sum to the budget even with more strata than rows.
+    """
+    counts = loader._allocate_rows([5, 3, 2], 7)
+    assert counts.tolist() == [4, 2, 1]
+
+    counts = loader._allocate_rows([1] * 10, 3)
+    assert counts.sum() == 3 and counts.max() == 1
@@ -0,0 +1,82 @@
+"""
+Tests for src.reporting.markdown_builder module.
+
+Validates report assembly and the local splicing of full section
+reports into the LLM-written summary.
+"""
+
+import os
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.reporting.markdown_builder import build_markdown_report, splice_sections
+
+SUMMARY = (
+    "## 1. Executive Summary\n\n- Sales grew.\n\n## 3. Recommendations\n\n- Invest."
+)
+
+
+def test_splice_sections_places_analysis_before_recommendations():
+    """Test that sections are inserted in order with demoted headings."""
+    sections = {
+        "Sales Trends": "## 1. Overall\n\nText.\n\n### Detail\n\n```\n# not a heading\n```",
+        "Drivers": "Plain text without headings.",
+    }
+
+    spliced = splice_sections(SUMMARY, sections, analysis_title="2. Analysis")
+    headings = [line for line in spliced.splitlines() if line.startswith("#")]
+
+    assert headings == [
+        "## 1. Executive Summary",
+        "## 2. Analysis",
+        "### Sales Trends",
+        "#### 1. Overall",
+        "##### Detail",
+        "# not a heading",
+        "### Drivers",
+        "## 3. Recommendations",
+    ]
+
+
+def test_build_markdown_report_splices_sections(tmp_path):
+    """Test that the saved report contains summary, sections and recommendations."""
+    path = build_markdown_report(
+        [SUMMARY],
+        out_dir=str(tmp_path),
+        section_markdowns={"Sales Trends": "Sales text."},
+    )
+
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+
+    assert content.index("Sales grew.") < content.index("Sales text.")
+    assert content.index("Sales text.") < content.index("## 3. Recommendations")
+
+
+def test_figures_are_numbered_and_missing_embeds_dropped(tmp_path, capsys):
+    """Test local figure captions, LLM caption replacement and missing files."""
+    (tmp_path / "figures").mkdir()
+    (tmp_path / "figures" / "a.png").write_bytes(b"")
+    (tmp_path / "figures" / "b.png").write_bytes(b"")
+
+    markdown = (
+        "![A plot](figures/a.png)\n\nFigure 7: Old caption\n\nText about a.\n\n"
+        "![gone](figures/missing.png)\n\n"
+        "![B plot](figures/b.png)\n\n![A again](figures/a.png)"
+    )
+    path = build_markdown_report(
+        [markdown], out_dir=str(tmp_path), figure_captions={"b.png": "Caption B"}
+    )
+
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+
+    assert "*Figure 1: A plot*" in content
+    assert "*Figure 2: Caption B*" in content
+    assert content.count("*Figure 1:") == 2
+    assert "Old caption" not in content
+    assert "missing.png" not in content
+    assert "missing.png" in capsys.readouterr().out
@@ -0,0 +1,103 @@
+"""
+Tests for src.data_processing.memory module.
+
+The normalized, shared frames must give the same summaries and drivers as
+the raw data, the limit check must fail early with a clear message, and the
+stage timer must record peak memory per stage.
+"""
+
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing import loader
+from src.data_processing.memory import (
+    MemoryLimitExceeded,
+    check_memory_limit,
+    frame_bytes,
+    normalize_sales_frame,
+    projected_footprint,
+)
+from src.llm.utils import StageTimer
+
+
+@pytest.fixture
+def raw_df():
+    """Raw sales rows as loaded from Excel (text columns, float sales with gaps)."""
+    rng = np.random.default_rng(5)
+    n = 400
+    sales = rng.integers(100, 10000, n).astype(float)
+    sales[::37] = np.nan
+    return pd.DataFrame(
+        {
+            "Model": rng.choice(["X5", "X3", "i8", "M4"], n),
+            "Year": rng.choice([2020, 2021, 2022], n),
+            "Region": rng.choice(["Europe", "Asia", "Africa"], n),
+            "Fuel_Type": rng.choice(["Petrol", "Electric"], n),
+            "Price_USD": rng.integers(30000, 120000, n),
+            "Sales_Volume": sales,
+        }
+    )
+
+
+def test_normalized_frame_gives_same_results(raw_df, tmp_path):
+    """Test summaries and drivers from the shared frames match the raw data."""
+    normalized = normalize_sales_frame(raw_df)
+
+    assert frame_bytes(normalized) < frame_bytes(raw_df)
+    # The summaries use the normalized frame without copying it
+    assert loader._with_sales_types(normalized) is normalized
+    for summarize in (
+        loader.summarize_sales_by_region_year,
+        loader.summarize_models_by_year,
+        loader.summarize_models_by_region_year,
+    ):
+        assert summarize(normalized, str(tmp_path / "a.json")) == summarize(
+            raw_df, str(tmp_path / "b.json")
+        )
+
+    encoded = loader.encode_features(normalized)
+    pd.testing.assert_frame_equal(
+        loader.explore_key_drivers_of_sales(normalized, encoded=encoded),
+        loader.explore_key_drivers_of_sales(raw_df),
+    )
+
+
+def test_memory_limit_fails_early(raw_df):
+    """Test the projected peak is checked against the limit before any work."""
+    footprint = check_memory_limit(raw_df, None)
+    assert footprint["peak"] >= footprint["encoded"] + footprint["correlation"]
+    assert footprint == projected_footprint(raw_df)
+
+    with pytest.raises(MemoryLimitExceeded, match="MEMORY_LIMIT_MB=0.01"):
+        check_memory_limit(raw_df, 0.01)
+
+
+def test_stage_timer_records_peak_memory():
+    """Test the peak memory of a stage covers the memory allocated in it."""
+    timer = StageTimer(track_memory=True)
+    with timer.stage("allocate"):
+        block = np.ones(2_000_000)
+        del block
+
+    assert timer.peak_memory_mb["allocate"] >= 16.0
+    assert timer.peak_rss_mb["allocate"] > 0
+    assert "allocate" in timer.timings
+
+    # Concurrent stages are timed without touching the traced peak
+    with timer.stage("outer"):
+        block = np.ones(2_000_000)
+        del block
+        with timer.stage("concurrent", track_memory=False):
+            pass
+    assert "concurrent" in timer.timings and "concurrent" not in timer.peak_memory_mb
+    assert timer.peak_memory_mb["outer"] >= 16.0
+    tracemalloc.stop()
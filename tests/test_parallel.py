@@ -0,0 +1,94 @@
+"""
+Tests for src.data_processing.parallel module.
+
+The sharded multiprocess aggregation must return exactly the same
+summary as the serial pandas implementation in the loader.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing import loader
+from src.data_processing import parallel
+from src.data_processing.memory import normalize_sales_frame
+
+
+@pytest.fixture
+def sales_df():
+    """Random sales data with ties and a row missing its Region."""
+    rng = np.random.default_rng(1)
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "Year": rng.choice([2020, 2021, 2022], n),
+            "Region": rng.choice(["Europe", "Asia", "Africa"], n),
+            "Model": rng.choice(["X5", "X3", "i8", "M3", "7 Series"], n),
+            "Sales_Volume": rng.choice([100, 200, 300], n),
+        }
+    )
+    df.loc[0, "Region"] = None
+    return df
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_parallel_summary_matches_serial(sales_df, tmp_path, n_workers):
+    """
+    Test the parallel summary (in-process and with a process pool)
+    equals summarize_models_by_region_year, including its JSON file.
+    """
+    serial_path = tmp_path / "serial.json"
+    parallel_path = tmp_path / "parallel.json"
+
+    expected = loader.summarize_models_by_region_year(sales_df, str(serial_path))
+    result = parallel.summarize_models_by_region_year_parallel(
+        sales_df, str(parallel_path), n_workers=n_workers, min_rows_per_worker=1
+    )
+
+    assert result == expected
+    assert parallel_path.read_text() == serial_path.read_text()
+
+
+def test_parallel_summary_matches_serial_bucketed(sales_df, tmp_path):
+    """
+    Test the top-N "Other" bucketing gives the same summary on both paths.
+    """
+    expected = loader.summarize_models_by_region_year(
+        sales_df, str(tmp_path / "serial.json"), top_n=2
+    )
+    result = parallel.summarize_models_by_region_year_parallel(
+        sales_df, str(tmp_path / "parallel.json"), top_n=2
+    )
+
+    assert result == expected
+    assert all(
+        len(records) == 3 for years in result.values() for records in years.values()
+    )
+
+
+def test_sharded_totals_match_serial_with_spawned_workers(
+    sales_df, tmp_path, monkeypatch
+):
+    """
+    Test categorical keys, and workers that receive their rows (no fork).
+    """
+    expected = loader.summarize_models_by_region_year(
+        sales_df, str(tmp_path / "serial.json")
+    )
+    monkeypatch.setattr(
+        parallel.multiprocessing, "get_all_start_methods", lambda: ["spawn"]
+    )
+    result = parallel.summarize_models_by_region_year_parallel(
+        normalize_sales_frame(sales_df),
+        str(tmp_path / "parallel.json"),
+        n_workers=2,
+        min_rows_per_worker=1,
+    )
+
+    assert result == expected
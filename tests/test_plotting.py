@@ -19,6 +19,7 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.plotting import plot_functions as pf
+from src.plotting.renderer import FigureRenderer
 
 
 @pytest.fixture
@@ -170,3 +171,45 @@ def test_plot_correlation_vector_invalid_df(tmp_path):
         ValueError, match="Input DataFrame must have exactly one column"
     ):
         pf.plot_correlation_vector(df_invalid, str(tmp_path))
+
+
+def test_plot_feature_importance(tmp_path):
+    """
+    Test plot_feature_importance creates a bar plot PNG, including
+    confidence-interval error bars, and verifies the output file exists.
+    """
+    importance_df = pd.DataFrame(
+        {
+            "importance": [30.0, 20.0, 10.0],
+            "ci_lower": [25.0, 15.0, 5.0],
+            "ci_upper": [35.0, 25.0, 15.0],
+        },
+        index=["Model_X5", "Region_Asia", "Year_2021"],
+    )
+    path = pf.plot_feature_importance(importance_df, str(tmp_path))
+    assert os.path.isfile(path)
+    assert path.endswith(".png")
+    assert os.path.getsize(path) > 0
+
+
+def test_plot_feature_importance_missing_column(tmp_path):
+    """
+    Test plot_feature_importance raises ValueError when the importance column is missing.
+    """
+    with pytest.raises(ValueError, match="must have an 'importance' column"):
+        pf.plot_feature_importance(pd.DataFrame({"a": [1.0]}), str(tmp_path))
+
+
+def test_renderer_reuses_figures_and_saves_svg(tmp_path, yearly_dict):
+    """Test that plots of one kind share a figure and honor the output format."""
+    renderer = FigureRenderer(fmt="svg")
+
+    first = pf.plot_sales_by_year(yearly_dict, str(tmp_path), renderer)
+    with renderer.axes("line", (10, 5.5)) as ax:
+        # The same figure is handed out again, cleared of the previous plot
+        assert not ax.lines
+    second = pf.plot_sales_by_year(yearly_dict, str(tmp_path / "again"), renderer)
+
+    assert first.endswith(".svg") and os.path.getsize(first) > 0
+    assert os.path.getsize(second) == os.path.getsize(first)
+    assert len(renderer._figures()) == 1
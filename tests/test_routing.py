@@ -0,0 +1,130 @@
+"""
+Tests for src.llm.routing module.
+
+Calls must be routed to their section's model tier, fall back to the fast
+model while a tier's latency SLO is at risk, and be logged with their
+latency and token usage.
+"""
+
+import os
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.agent import LLMReportAgent
+from src.llm.backends import TemplateBackend
+from src.llm.routing import ModelRouter, tiered_router
+
+
+class ModelLoggingBackend(TemplateBackend):
+    """Template backend recording the model of every call."""
+
+    def __init__(self):
+        super().__init__()
+        self.models = []
+
+    def generate_content(self, model, contents, config=None):
+        self.models.append(model)
+        return super().generate_content(model, contents, config)
+
+
+def test_slo_at_risk_falls_back_to_the_fast_tier():
+    """Test strong sections use the strong model until its latency breaks the SLO."""
+    router = tiered_router("fast", "strong", strong_slo_s=1.0, min_samples=2)
+    assert router.choose("combine").model == "strong"
+    assert router.choose("sales_trend") == ("sales_trend", "fast", "fast", "policy")
+
+    # One slow sample is not enough evidence, two are
+    router.seed([{"model": "strong", "latency_s": 5.0}])
+    assert router.choose("combine").model == "strong"
+    router.seed([{"model": "strong", "latency_s": 5.0, "ok": True}])
+    assert router.choose("combine") == ("combine", "fast", "fast", "slo_fallback")
+
+    # Fast recent calls put the SLO back within reach
+    router.seed([{"model": "strong", "latency_s": 0.1}] * 20)
+    assert router.choose("combine").model == "strong"
+
+    with pytest.raises(ValueError, match="strong"):
+        ModelRouter({"fast": "m"}, routes={"combine": "strong"})
+
+
+def test_fallback_probes_the_strong_model_until_it_recovers():
+    """Test every probe_every-th fallen-back call probes the strong model."""
+    router = tiered_router(
+        "fast", "strong", strong_slo_s=1.0, min_samples=2, probe_every=3
+    )
+    router.seed([{"model": "strong", "latency_s": 5.0}] * 2)
+
+    # A probe slower than the SLO keeps the tier on the fast model
+    reasons = [router.choose("combine").reason for _ in range(3)]
+    assert reasons == ["slo_fallback", "slo_fallback", "slo_probe"]
+    router.record(router.choose("combine"), 0.2)
+    router.record(router.choose("combine"), 0.2)
+    probe = router.choose("combine")
+    assert probe == ("combine", "strong", "strong", "slo_probe")
+    router.record(probe, 4.0)
+    assert router.choose("combine").reason == "slo_fallback"
+
+    # A probe within the SLO starts the model's latencies over
+    router.choose("combine")
+    probe = router.choose("combine")
+    router.record(probe, 0.5)
+    assert router.choose("combine") == ("combine", "strong", "strong", "policy")
+    assert router.summary()["models"]["strong"]["slo_probes"] == 2
+
+
+def test_probes_are_counted_across_runs():
+    """Test the fallbacks and probes of previous routing logs are replayed."""
+    slow = {"section": "combine", "model": "strong", "tier": "strong"}
+    fallback = {"section": "combine", "model": "fast", "tier": "fast"}
+    history = [
+        {**slow, "reason": "policy", "latency_s": 5.0},
+        {**slow, "reason": "policy", "latency_s": 5.0},
+        {**fallback, "reason": "slo_fallback", "latency_s": 0.2},
+        {**fallback, "reason": "slo_fallback", "latency_s": 0.2},
+    ]
+    router = tiered_router("fast", "strong", strong_slo_s=1.0, min_samples=2)
+    router.seed(history)
+    reasons = [router.choose("combine").reason for _ in range(3)]
+    assert reasons == ["slo_fallback", "slo_fallback", "slo_probe"]
+
+    # Once a probe was within the SLO, the next run calls the strong model
+    router = tiered_router("fast", "strong", strong_slo_s=1.0, min_samples=2)
+    router.seed(history + [{**slow, "reason": "slo_probe", "latency_s": 0.5}])
+    assert router.choose("combine").reason == "policy"
+
+
+def test_agent_routes_and_logs_each_call(tmp_path):
+    """Test the agent sends sections and combine to their tiers and logs usage."""
+    backend = ModelLoggingBackend()
+    router = tiered_router("gemini-2.5-flash-lite", "gemini-2.5-pro")
+    agent = LLMReportAgent(backend=backend, router=router)
+    corr = pd.DataFrame({"Sales_Volume": [1.0, 0.3]}, index=["Sales_Volume", "Price"])
+
+    report = agent.analyze_correlation_matrix(corr, str(tmp_path))
+    agent.combine_and_summarize_reports([report])
+
+    assert backend.models == ["gemini-2.5-flash-lite", "gemini-2.5-pro"]
+    summary = router.summary()
+    assert list(summary["sections"]) == ["correlation", "combine"]
+    usage = agent.usage.summary()["sections"]
+    pro = summary["models"]["gemini-2.5-pro"]
+    assert pro["calls"] == 1 and pro["slo_fallbacks"] == 0
+    assert pro["input_tokens"] == usage["combine"]["input_tokens"]
+    assert pro["latency_p90_s"] is not None
+    # Priced with the routed model, not model_name
+    assert usage["combine"]["cost_usd"] == pytest.approx(
+        agent.usage.cost(
+            "gemini-2.5-pro",
+            usage["combine"]["input_tokens"],
+            usage["combine"]["output_tokens"],
+        ),
+        abs=1e-6,
+    )
+
+    router.save(str(tmp_path / "routing.json"))
+    assert (tmp_path / "routing.json").exists()
@@ -0,0 +1,96 @@
+"""
+Tests for src.llm.serializers module.
+
+Checks that the compact prompt formats keep every value of the
+summary payloads while using fewer tokens than pretty-printed JSON.
+"""
+
+import json
+import os
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.serializers import PayloadSerializer, compare_formats
+from src.llm.utils import estimate_tokens
+
+
+@pytest.fixture
+def year_models_dict():
+    """Fixture providing model sales by year, with a model missing in 2021."""
+    return {
+        "2020": [
+            {"Model": "X5", "Total_Sales": 23000},
+            {"Model": "X3", "Total_Sales": 18000},
+            {"Model": "i8", "Total_Sales": 9000},
+        ],
+        "2021": [
+            {"Model": "X3", "Total_Sales": 25000},
+            {"Model": "X5", "Total_Sales": 19000},
+        ],
+    }
+
+
+def test_matrix_format(year_models_dict):
+    """
+    Test the wide matrix has one row per model and one column per year,
+    keeps integers and leaves missing cells empty.
+    """
+    text = PayloadSerializer("matrix").serialize(year_models_dict, ["Year"])
+    assert text.splitlines() == [
+        "Model,2020,2021",
+        "X5,23000,19000",
+        "X3,18000,25000",
+        "i8,9000,",
+    ]
+
+
+def test_csv_format_with_branches():
+    """
+    Test differently shaped branches are emitted as titled tables.
+    """
+    summary = {
+        "sales_by_year": {"2020": 100, "2021": 200},
+        "sales_by_region_year": {"Europe": {"2020": 60}, "Asia": {"2020": 40}},
+    }
+    levels = {"sales_by_year": ["Year"], "sales_by_region_year": ["Region", "Year"]}
+    text = PayloadSerializer("csv").serialize(summary, levels)
+
+    assert "# sales_by_year\nYear,Value\n2020,100\n2021,200" in text
+    assert "# sales_by_region_year\nRegion,Year,Value\nEurope,2020,60" in text
+
+
+def test_minjson_is_lossless(year_models_dict):
+    """
+    Test minified JSON parses back to the original payload.
+    """
+    text = PayloadSerializer("minjson").serialize(year_models_dict)
+    assert json.loads(text) == year_models_dict
+    assert " " not in text
+
+
+def test_compact_formats_use_fewer_tokens(year_models_dict):
+    """
+    Test the tabular formats are smaller than pretty-printed JSON.
+    """
+    counts = compare_formats(year_models_dict, ["Year"])
+    assert counts["matrix"] < counts["csv"] < counts["json"]
+
+
+def test_unknown_format():
+    """
+    Test an unknown format name raises ValueError.
+    """
+    with pytest.raises(ValueError, match="Unknown payload format"):
+        PayloadSerializer("yaml")
+
+
+def test_estimate_tokens_counts_non_ascii_words():
+    """Test words with accented or non-Latin letters are counted like ASCII ones."""
+    assert estimate_tokens("Sales in Region") == 5
+    assert estimate_tokens("Düsseldorf") == estimate_tokens("Dusseldorf") == 3
+    assert estimate_tokens("Ventes à Zürich") == 5
+    assert estimate_tokens("東京都") == 1
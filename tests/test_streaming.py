@@ -0,0 +1,123 @@
+"""
+Tests for src.data_processing.streaming module.
+
+These tests check that the one-pass correlation accumulator reproduces
+the in-memory Pearson correlations of the loader, whether rows arrive
+in chunks, in partial accumulators merged together, or from a file.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing import loader
+from src.data_processing import streaming
+
+
+@pytest.fixture
+def sales_df():
+    """
+    Random BMW-like sales data with categorical, numeric and Year columns.
+    Rows are sorted by Region so some categories only appear in later chunks.
+    """
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame(
+        {
+            "Model": rng.choice(["X5", "X3", "i8", "M3"], n),
+            "Year": rng.choice([2020, 2021, 2022], n),
+            "Region": rng.choice(["Europe", "Asia", "Africa"], n),
+            "Price_USD": rng.integers(30000, 120000, n),
+            "Sales_Volume": rng.integers(100, 10000, n),
+        }
+    )
+    return df.sort_values("Region").reset_index(drop=True)
+
+
+def _chunks(df, size):
+    return [df.iloc[i : i + size] for i in range(0, len(df), size)]
+
+
+def test_streaming_matches_in_memory_correlation(sales_df):
+    """
+    Test chunked correlations equal explore_key_drivers_of_sales.
+    """
+    expected = loader.explore_key_drivers_of_sales(sales_df)
+    result = streaming.explore_key_drivers_of_sales_streaming(_chunks(sales_df, 37))
+
+    assert list(result.columns) == ["Correlation_with_Sales_Volume"]
+    assert set(result.index) == set(expected.index)
+
+    diff = result.iloc[:, 0] - expected.iloc[:, 0].reindex(result.index)
+    assert diff.abs().max() < 1e-10
+
+
+def test_merge_partial_accumulators(sales_df):
+    """
+    Test that merging accumulators built on disjoint chunks gives
+    the same statistics as a single accumulator over all rows.
+    """
+    single = streaming.CorrelationAccumulator()
+    left = streaming.CorrelationAccumulator()
+    right = streaming.CorrelationAccumulator()
+
+    for idx, chunk in enumerate(_chunks(sales_df, 50)):
+        single.update(chunk)
+        (left if idx % 2 else right).update(chunk)
+
+    merged = left.merge(right)
+    assert merged.n_rows == len(sales_df)
+
+    counts = merged.counts.reindex(single.counts.index)
+    assert (counts == single.counts).all()
+
+    cross = merged.cross_products.reindex(single.cross_products.index)
+    assert np.allclose(cross, single.cross_products)
+
+    corr = merged.correlation().reindex(single.correlation().index)
+    assert np.allclose(corr, single.correlation())
+
+
+def test_iter_dataset_chunks_excel(tmp_path, sales_df):
+    """
+    Test chunked Excel reading yields all rows in bounded chunks.
+    """
+    file_path = tmp_path / "sales.xlsx"
+    sales_df.to_excel(file_path, index=False)
+
+    chunks = list(streaming.iter_dataset_chunks(str(file_path), chunksize=150))
+    assert [len(c) for c in chunks] == [150, 150, 100]
+    assert list(chunks[0].columns) == list(sales_df.columns)
+
+
+def test_iter_dataset_chunks_reads_every_sheet(tmp_path, sales_df):
+    """
+    Test chunked Excel reading covers the same sheets as load_dataset.
+    """
+    file_path = str(tmp_path / "markets.xlsx")
+    with pd.ExcelWriter(file_path) as writer:
+        for region, rows in sales_df.groupby("Region"):
+            rows.to_excel(writer, sheet_name=region, index=False)
+        pd.DataFrame().to_excel(writer, sheet_name="Notes", index=False)
+
+    chunks = list(streaming.iter_dataset_chunks(file_path, chunksize=100))
+    assert sum(len(c) for c in chunks) == len(sales_df)
+    streamed = streaming.explore_key_drivers_of_sales_streaming(chunks)
+    expected = loader.explore_key_drivers_of_sales(loader.load_dataset(file_path))
+    pd.testing.assert_index_equal(
+        streamed.index.sort_values(), expected.index.sort_values()
+    )
+    np.testing.assert_allclose(
+        streamed.loc[expected.index].values, expected.values, atol=1e-10
+    )
+
+    asia = list(streaming.iter_dataset_chunks(file_path, sheets=["Asia"]))
+    assert set(pd.concat(asia)["Region"]) == {"Asia"}
+    with pytest.raises(ValueError, match="Oceania"):
+        next(streaming.iter_dataset_chunks(file_path, sheets=["Oceania"]))
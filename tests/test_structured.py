@@ -0,0 +1,173 @@
+"""
+Tests for src.llm.structured module.
+
+Structured JSON answers must render to complete section markdown locally:
+every heading and figure in place, whatever the model referenced, and the
+agent must request them with a response schema.
+"""
+
+import json
+import os
+
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.agent import LLMReportAgent
+from src.llm.backends import TemplateBackend, make_response
+from src.llm.structured import (
+    default_parts,
+    parse_answer,
+    render_section,
+    response_schema,
+    update_answer,
+)
+from src.llm.validation import Problem, validate_markdown
+
+
+@pytest.fixture
+def parts():
+    """Two headings, each with one assigned figure."""
+    return default_parts(
+        ("1. Overall Trend", "2. Regional Trend"), ("by_year.png", "by_region.png")
+    )
+
+
+def test_render_places_every_heading_and_figure(parts):
+    """Test referenced figures move, unreferenced ones stay, unknown parts drop."""
+    answer = {
+        "parts": [
+            {
+                "heading": "2. Regional Trend",
+                "summary": "Asia leads.\nEurope follows.",
+                "findings": ["Asia +10%", ""],
+                "figures": ["by_region.png", "by_year.png", "invented.png"],
+            },
+            {"heading": "3. Invented", "summary": "Dropped.", "findings": []},
+        ]
+    }
+
+    markdown = render_section(answer, parts)
+
+    assert markdown == (
+        "## 1. Overall Trend\n\n"
+        "## 2. Regional Trend\n\n"
+        "![by region](figures/by_region.png)\n\n"
+        "![by year](figures/by_year.png)\n\n"
+        "Asia leads. Europe follows.\n\n"
+        "- Asia +10%"
+    )
+    headings = [part.heading for part in parts]
+    assert not validate_markdown(markdown, headings, ("by_year.png", "by_region.png"))
+
+    # Nothing referenced: each figure under the part it is assigned to
+    markdown = render_section({"parts": []}, parts)
+    assert markdown.index("by_year.png") < markdown.index("2. Regional Trend")
+    assert markdown.index("by_region.png") > markdown.index("2. Regional Trend")
+
+
+def test_parse_answer_and_schema(parts):
+    """Test fenced answers parse, broken ones do not, and the schema has enums."""
+    answer = {"parts": [{"heading": "1. Overall Trend", "summary": "Up."}]}
+    assert parse_answer("```json\n" + json.dumps(answer) + "\n```") == answer
+    assert parse_answer('{"parts": [{"heading": "1. Ov') is None
+    assert parse_answer("[]") is None
+
+    item = response_schema(parts)["properties"]["parts"]["items"]["properties"]
+    assert item["heading"]["enum"] == ["1. Overall Trend", "2. Regional Trend"]
+    assert item["figures"]["items"]["enum"] == ["by_year.png", "by_region.png"]
+    summary_schema = response_schema(default_parts(("1. Executive Summary",), ()))
+    assert "figures" not in summary_schema["properties"]["parts"]["items"]["properties"]
+
+
+def test_agent_requests_json_and_renders_markdown(tmp_path):
+    """Test structured sections are requested with a schema and rendered locally."""
+    calls = []
+
+    class SchemaBackend(TemplateBackend):
+        def generate_content(self, model, contents, config=None):
+            calls.append((contents, config))
+            return super().generate_content(model, contents, config)
+
+    agent = LLMReportAgent(backend=SchemaBackend(), structured=True, validate=True)
+    summary = {
+        "sales_by_year": {"2020": 300, "2021": 360},
+        "sales_by_region_year": {"Asia": {"2020": 200, "2021": 220}},
+    }
+
+    report = agent.analyze_sales_trend(summary, str(tmp_path))
+    digest = agent.digest_section_report("Sales Trend Analysis", report)
+
+    (prompt, config), (_, digest_config) = calls
+    assert config.response_mime_type == "application/json"
+    assert "JSON object" in prompt and "![alt]" not in prompt
+    assert digest_config is None  # digests stay plain text
+    assert report.startswith("## 1. Overall Sales Trend Analysis\n\n![")
+    for filename in os.listdir(tmp_path):
+        assert f"](figures/{filename})" in report
+    assert agent.structured_answers["sales_trend"]["parts"][0]["figures"]
+    assert agent.validation_log == []
+    assert digest
+
+
+def test_empty_part_is_reported_and_repaired(parts):
+    """Test a part without text is a problem, and its repair updates the answer."""
+    answer = {
+        "parts": [
+            {"heading": "1. Overall Trend", "summary": "", "findings": []},
+            {"heading": "2. Regional Trend", "summary": "Asia leads.", "findings": []},
+        ]
+    }
+    markdown = render_section(answer, parts)
+    headings = [part.heading for part in parts]
+    figures = ("by_year.png", "by_region.png")
+
+    assert not validate_markdown(markdown, headings, figures)
+    assert validate_markdown(markdown, headings, figures, require_text=True) == [
+        Problem("empty_heading", "1. Overall Trend")
+    ]
+
+    repaired = markdown.replace(
+        "## 2. Regional", "Sales grew.\n\n- 2021 +20%\n\n## 2. Regional"
+    )
+    updated = update_answer(answer, repaired, parts)
+
+    assert updated["parts"][0]["summary"] == "Sales grew."
+    assert updated["parts"][0]["findings"] == ["2021 +20%"]
+    assert updated["parts"][1] == answer["parts"][1]
+    assert answer["parts"][0]["summary"] == ""
+    assert render_section(updated, parts) == repaired
+
+
+def test_agent_repairs_an_empty_structured_answer(tmp_path):
+    """Test an answer without any text is repaired and written back."""
+    prompts = []
+
+    class EmptyJsonBackend(TemplateBackend):
+        def generate_content(self, model, contents, config=None):
+            prompts.append(contents)
+            if config is not None:
+                return make_response('{"parts": []}', 10, model)
+            return make_response(
+                "## 1. Overall\nSales grew.\n\n## 2. Regional\n- Asia leads", 10, model
+            )
+
+    agent = LLMReportAgent(backend=EmptyJsonBackend(), structured=True, validate=True)
+    summary = {
+        "sales_by_year": {"2020": 300, "2021": 360},
+        "sales_by_region_year": {"Asia": {"2020": 200, "2021": 220}},
+    }
+
+    report = agent.analyze_sales_trend(summary, str(tmp_path))
+
+    assert "Write ONLY the missing parts" in prompts[1]
+    assert "Sales grew." in report and "- Asia leads" in report
+    parts = agent.structured_answers["sales_trend"]["parts"]
+    assert [(p["summary"], p["findings"]) for p in parts] == [
+        ("Sales grew.", []),
+        ("", ["Asia leads"]),
+    ]
+    assert agent.validation_log[0]["problems"][0]["kind"] == "empty_heading"
@@ -0,0 +1,120 @@
+"""
+Tests for src.llm.validation module.
+
+Checks the local validation of section markdown and that only the faulty
+parts of an answer are repaired.
+"""
+
+import os
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.agent import LLMReportAgent
+from src.llm.backends import TemplateBackend, make_response
+from src.llm.validation import (
+    Problem,
+    apply_repair,
+    fix_embeds,
+    repair_prompt,
+    validate_markdown,
+)
+
+HEADINGS = ("1. Overall Sales Trend Analysis", "2. Regional Sales Trend Analysis")
+FIGURES = ("sales_by_year_millions.png", "sales_by_region_year_millions.png")
+
+
+class OmittingBackend(TemplateBackend):
+    """Template backend whose first answer lacks section 1 and invents a figure."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def generate_content(self, model, contents, config=None):
+        self.prompts.append(contents)
+        if len(self.prompts) == 1:
+            text = (
+                "## 2. Regional Sales Trend Analysis\n\n"
+                "![Regions](figures/sales_by_region_year_millions.png)\n\n"
+                "Asia leads.\n\n![Made up](figures/made_up.png)\n"
+            )
+            return make_response(text, 100, model)
+        return super().generate_content(model, contents, config)
+
+
+@pytest.fixture
+def sales_summary():
+    """Fixture providing a small sales summary for two regions."""
+    return {
+        "sales_by_year": {"2020": 300, "2021": 360},
+        "sales_by_region_year": {
+            "Asia": {"2020": 200, "2021": 220},
+            "Europe": {"2020": 100, "2021": 140},
+        },
+    }
+
+
+def test_validate_markdown_finds_problems(tmp_path):
+    """Test missing headings, missing embeds and unresolvable embeds are found."""
+    (tmp_path / "sales_by_year_millions.png").write_bytes(b"")
+    markdown = (
+        "# overall sales trend analysis\n"
+        "![a](figures/sales_by_year_millions.png)\n"
+        "![b](plots/sales_by_region_year_millions.png)\n"
+    )
+
+    problems = validate_markdown(markdown, HEADINGS, FIGURES, str(tmp_path))
+
+    assert problems == [
+        Problem("missing_heading", "2. Regional Sales Trend Analysis"),
+        Problem("unknown_figure", "plots/sales_by_region_year_millions.png"),
+        Problem("missing_figure", "sales_by_region_year_millions.png"),
+    ]
+    # The misplaced embed is repointed locally; only the heading needs the LLM
+    fixed, remaining = fix_embeds(markdown, problems)
+    assert "![b](figures/sales_by_region_year_millions.png)" in fixed
+    assert remaining == [problems[0]]
+
+
+def test_apply_repair_inserts_parts_in_order():
+    """Test repaired headings are inserted before the next present heading."""
+    markdown = "## 3. Recommendations\n\nAct."
+    problems = [
+        Problem("missing_heading", "1. Executive Summary"),
+        Problem("missing_heading", "2. Analysis"),
+    ]
+    prompt = repair_prompt(markdown, problems)
+    assert "1. Executive Summary\n2. Analysis" in prompt
+
+    answer = "## 1. Executive Summary\nSummary.\n## 2. Analysis\nDetails."
+    repaired = apply_repair(
+        markdown,
+        problems,
+        answer,
+        ("1. Executive Summary", "2. Analysis", "3. Recommendations"),
+    )
+
+    assert repaired.index("Summary.") < repaired.index("Details.")
+    assert repaired.index("## 2. Analysis") < repaired.index("## 3. Recommendations")
+    assert validate_markdown(repaired, ("1. Executive Summary", "2. Analysis")) == []
+
+
+def test_agent_repairs_only_the_missing_section(sales_summary, tmp_path):
+    """Test the agent fixes the invented embed locally and asks only for section 1."""
+    backend = OmittingBackend()
+    agent = LLMReportAgent(backend=backend, validate=True)
+
+    report = agent.analyze_sales_trend(sales_summary, str(tmp_path))
+
+    assert validate_markdown(report, HEADINGS, FIGURES, str(tmp_path)) == []
+    assert "Asia leads." in report
+    assert len(backend.prompts) == 2
+    assert "### Sections to Produce\n1. Overall Sales Trend Analysis\n\n" in (
+        backend.prompts[1]
+    )
+    assert len(backend.prompts[1]) < len(backend.prompts[0])
+    assert agent.usage.summary()["sections"]["repairs"]["calls"] == 1
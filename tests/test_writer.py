@@ -0,0 +1,88 @@
+"""
+Tests for src.reporting.writer module.
+
+Artifacts must be replaced atomically, read back identically with every
+serializer and compression, and background writes must be complete (or
+raise) after a flush.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+# Add src path to sys.path if needed (adjust this if you run tests from a different CWD) # pylint: disable=all
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.reporting.writer import ArtifactWriter, atomic_write, read_artifact
+
+
+@pytest.fixture
+def summary():
+    """Summary with integer keys and numpy integer values, like the loader's."""
+    return {
+        "sales_by_year": {2020: np.int64(300), 2021: 360},
+        "models": [{"Model": "X5", "Total_Sales": np.int64(12)}],
+    }
+
+
+def test_atomic_write_keeps_old_file_on_failure(tmp_path):
+    """Test a failed write leaves the previous file and no temporary file."""
+    path = str(tmp_path / "report.md")
+    atomic_write(path, "# Old")
+
+    with pytest.raises(TypeError):
+        atomic_write(path, object())
+
+    assert open(path).read() == "# Old"
+    assert os.listdir(tmp_path) == ["report.md"]
+
+
+@pytest.mark.parametrize("fmt", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_write_json_round_trip(tmp_path, summary, fmt, compression):
+    """Test every serializer/compression pair reads back the same summary."""
+    writer = ArtifactWriter(fmt, compression)
+    path = str(tmp_path / "sales_summary.json")
+
+    written = writer.write_json(summary, path)
+
+    assert os.path.exists(written)
+    expected = {
+        "sales_by_year": {"2020": 300, "2021": 360},
+        "models": [{"Model": "X5", "Total_Sales": 12}],
+    }
+    assert read_artifact(path) == expected
+
+
+def test_json_output_matches_json_dump(tmp_path):
+    """Test the default and orjson writers keep the indented JSON layout."""
+    summary = {"sales_by_year": {"2020": 300}, "regions": ["Asia"]}
+    plain = open(ArtifactWriter().write_json(summary, str(tmp_path / "a.json"))).read()
+    fast = ArtifactWriter("orjson").write_json(summary, str(tmp_path / "b.json"))
+
+    assert plain == open(fast).read()
+    assert plain.startswith('{\n  "sales_by_year"')
+
+
+def test_background_writes_complete_on_flush(tmp_path, summary):
+    """Test queued writes are on disk after flush, and write errors surface."""
+    writer = ArtifactWriter(background=True)
+    paths = [
+        writer.write_json(summary, str(tmp_path / f"summary_{i}.json"))
+        for i in range(5)
+    ]
+    writer.write_text("# Report", str(tmp_path / "report.md"))
+    # The summary is serialized before returning, so later changes are not written
+    summary["sales_by_year"][2020] = 0
+
+    writer.flush()
+
+    assert all(read_artifact(p)["sales_by_year"]["2020"] == 300 for p in paths)
+    assert open(tmp_path / "report.md").read() == "# Report"
+
+    writer.write_text("# Lost", str(tmp_path / "missing" / "\0" / "report.md"))
+    with pytest.raises(ValueError):
+        writer.close()